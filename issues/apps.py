@@ -1,5 +1,17 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
+
+
+def install_fulltext_triggers(using, **kwargs):
+    from django.db import connections
+    from issues import fulltext
+
+    # SQLite drops the triggers whenever a migration remakes issues_issue, so they are put back after each migrate.
+    fulltext.restore_triggers(connections[using])
 
 
 class IssuesConfig(AppConfig):
     name = 'issues'
+
+    def ready(self):
+        post_migrate.connect(install_fulltext_triggers, sender=self)
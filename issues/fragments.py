@@ -0,0 +1,38 @@
+from typing import Iterable, List
+
+from django.conf import settings
+from django.core.cache import caches
+from django.template.loader import get_template
+from django.utils.safestring import mark_safe
+
+from issues.models import Issue
+
+FRAGMENTS_CACHE = 'fragments'
+ISSUE_TITLE_TEMPLATE = 'issues/partials/issue_title.html'
+
+
+def issue_title_key(issue: Issue) -> str:
+    # Rating and syncing an issue both move its updated_at, so a renamed or re-rated issue gets a new key
+    # and its previous fragment expires on its own. A release may change the template, so it gets new keys too.
+    return f'issue-title:{settings.RELEASE_VERSION}:{issue.pk}:{issue.updated_at.timestamp()}'
+
+
+def render_issue_titles(issues: Iterable[Issue]) -> List[str]:
+    # One multi-get for the whole page; only the missing fragments are rendered and stored back at once.
+    issues = list(issues)
+    keys = [issue_title_key(issue) for issue in issues]
+    cache = caches[FRAGMENTS_CACHE]
+    fragments = cache.get_many(keys)
+    missing = [(key, issue) for key, issue in zip(keys, issues) if key not in fragments]
+
+    if missing:
+        title_template = get_template(ISSUE_TITLE_TEMPLATE)
+        rendered = {key: title_template.render({'issue': issue}) for key, issue in missing}
+        fragments.update(rendered)
+        cache.set_many(rendered)
+
+    return [mark_safe(fragments[key]) for key in keys]
+
+
+def render_issue_title(issue: Issue) -> str:
+    return render_issue_titles([issue])[0]
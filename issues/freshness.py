@@ -0,0 +1,59 @@
+import hashlib
+from datetime import datetime
+
+from django.conf import settings
+from django.contrib.messages.storage.cookie import CookieStorage
+
+from issues.models import Issue
+from issues.rendering import RENDERER_VERSION
+from issues.sitemaps import index_lastmod, section_lastmod
+
+
+def has_pending_messages(request) -> bool:
+    return CookieStorage.cookie_name in request.COOKIES
+
+
+def build_etag(resource: str, updated_at: datetime) -> str:
+    fingerprint = f'{settings.RELEASE_VERSION}|{RENDERER_VERSION}|{resource}|{updated_at.isoformat()}'
+    return hashlib.sha1(fingerprint.encode()).hexdigest()
+
+
+def issue_etag(request, owner: str, repository: str, number: int):
+    updated_at = _issue_updated_at(request, owner, repository, number)
+
+    if updated_at is None or has_pending_messages(request):
+        return None
+
+    return build_etag(f'issue:{owner}/{repository}/{number}', updated_at)
+
+
+def issue_last_modified(request, owner: str, repository: str, number: int):
+    if has_pending_messages(request):
+        return None
+
+    return _issue_updated_at(request, owner, repository, number)
+
+
+def _issue_updated_at(request, owner: str, repository: str, number: int):
+    if not hasattr(request, '_issue_updated_at'):
+        request._issue_updated_at = Issue.objects.filter(
+            repository__owner__owner=owner,
+            repository__name=repository,
+            number=number
+        ).values_list('updated_at', flat=True).first()
+
+    return request._issue_updated_at
+
+
+def sitemap_index_last_modified(request):
+    if not hasattr(request, '_sitemap_lastmod'):
+        request._sitemap_lastmod = index_lastmod()
+
+    return request._sitemap_lastmod
+
+
+def sitemap_section_last_modified(request, number: int):
+    if not hasattr(request, '_sitemap_lastmod'):
+        request._sitemap_lastmod = section_lastmod(number)
+
+    return request._sitemap_lastmod
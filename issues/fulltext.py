@@ -0,0 +1,120 @@
+import re
+
+from django.db.models import FloatField
+from django.db.models.expressions import RawSQL
+
+MAX_TERMS = 8
+
+# SQLite keeps an external content FTS5 table over issues_issue, Postgres a tsvector column with a GIN index.
+# Both are maintained by triggers, so bulk_create and bulk_update keep the index fresh as well.
+SQLITE_INSTALL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS issues_issue_fts USING fts5("
+    "name, body, content='issues_issue', content_rowid='id', tokenize='porter unicode61')",
+    "CREATE TRIGGER IF NOT EXISTS issues_issue_fts_insert AFTER INSERT ON issues_issue BEGIN "
+    "INSERT INTO issues_issue_fts(rowid, name, body) VALUES (new.id, new.name, new.body); END",
+    "CREATE TRIGGER IF NOT EXISTS issues_issue_fts_delete AFTER DELETE ON issues_issue BEGIN "
+    "INSERT INTO issues_issue_fts(issues_issue_fts, rowid, name, body) VALUES ('delete', old.id, old.name, old.body); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS issues_issue_fts_update AFTER UPDATE OF name, body ON issues_issue BEGIN "
+    "INSERT INTO issues_issue_fts(issues_issue_fts, rowid, name, body) VALUES ('delete', old.id, old.name, old.body); "
+    "INSERT INTO issues_issue_fts(rowid, name, body) VALUES (new.id, new.name, new.body); END",
+]
+SQLITE_REBUILD = "INSERT INTO issues_issue_fts(issues_issue_fts) VALUES ('rebuild')"
+SQLITE_UNINSTALL = [
+    "DROP TRIGGER IF EXISTS issues_issue_fts_insert",
+    "DROP TRIGGER IF EXISTS issues_issue_fts_delete",
+    "DROP TRIGGER IF EXISTS issues_issue_fts_update",
+    "DROP TABLE IF EXISTS issues_issue_fts",
+]
+
+POSTGRES_SEARCH_VECTOR = (
+    "setweight(to_tsvector('pg_catalog.english', coalesce({row}name, '')), 'A') || "
+    "setweight(to_tsvector('pg_catalog.english', coalesce({row}body, '')), 'B')"
+)
+POSTGRES_INSTALL = [
+    "ALTER TABLE issues_issue ADD COLUMN IF NOT EXISTS search_vector tsvector",
+    "CREATE OR REPLACE FUNCTION issues_issue_search_vector() RETURNS trigger AS $$ BEGIN "
+    f"NEW.search_vector := {POSTGRES_SEARCH_VECTOR.format(row='NEW.')}; RETURN NEW; END $$ LANGUAGE plpgsql",
+    "DROP TRIGGER IF EXISTS issues_issue_search_vector ON issues_issue",
+    "CREATE TRIGGER issues_issue_search_vector BEFORE INSERT OR UPDATE OF name, body ON issues_issue "
+    "FOR EACH ROW EXECUTE PROCEDURE issues_issue_search_vector()",
+    "CREATE INDEX IF NOT EXISTS issue_search_vector_idx ON issues_issue USING GIN (search_vector)",
+]
+POSTGRES_REBUILD = f"UPDATE issues_issue SET search_vector = {POSTGRES_SEARCH_VECTOR.format(row='')}"
+POSTGRES_UNINSTALL = [
+    "DROP TRIGGER IF EXISTS issues_issue_search_vector ON issues_issue",
+    "DROP FUNCTION IF EXISTS issues_issue_search_vector()",
+    "DROP INDEX IF EXISTS issue_search_vector_idx",
+    "ALTER TABLE issues_issue DROP COLUMN IF EXISTS search_vector",
+]
+
+INSTALL = {'sqlite': SQLITE_INSTALL, 'postgresql': POSTGRES_INSTALL}
+REBUILD = {'sqlite': SQLITE_REBUILD, 'postgresql': POSTGRES_REBUILD}
+UNINSTALL = {'sqlite': SQLITE_UNINSTALL, 'postgresql': POSTGRES_UNINSTALL}
+
+
+class FullTextNotSupportedException(Exception):
+    def __init__(self, vendor: str):
+        self.vendor = vendor
+        super()
+
+
+def search_terms(query: str) -> list:
+    return re.findall(r'\w+', (query or '').lower())[:MAX_TERMS]
+
+
+def install(connection, rebuild: bool = True):
+    if connection.vendor not in INSTALL:
+        return
+
+    with connection.cursor() as cursor:
+        for statement in INSTALL[connection.vendor]:
+            cursor.execute(statement)
+
+        if rebuild:
+            cursor.execute(REBUILD[connection.vendor])
+
+
+def restore_triggers(connection):
+    if connection.vendor != 'sqlite' or 'issues_issue_fts' not in connection.introspection.table_names():
+        return
+
+    install(connection, rebuild=False)
+
+
+def uninstall(connection):
+    if connection.vendor not in UNINSTALL:
+        return
+
+    with connection.cursor() as cursor:
+        for statement in UNINSTALL[connection.vendor]:
+            cursor.execute(statement)
+
+
+def search(queryset, terms: list, vendor: str):
+    if vendor == 'sqlite':
+        match = ' '.join(f'"{term}"' for term in terms)
+
+        # bm25 is lower for better matches, and a match in the title weighs ten times one in the body.
+        return queryset.filter(
+            id__in=RawSQL('SELECT rowid FROM issues_issue_fts WHERE issues_issue_fts MATCH %s', (match,))
+        ).annotate(search_rank=RawSQL(
+            'SELECT -bm25(issues_issue_fts, 10.0, 1.0) FROM issues_issue_fts '
+            'WHERE issues_issue_fts MATCH %s AND rowid = issues_issue.id',
+            (match,),
+            output_field=FloatField()
+        ))
+
+    if vendor == 'postgresql':
+        text = ' '.join(terms)
+
+        return queryset.extra(
+            where=["issues_issue.search_vector @@ plainto_tsquery('pg_catalog.english', %s)"],
+            params=[text]
+        ).annotate(search_rank=RawSQL(
+            "ts_rank_cd(issues_issue.search_vector, plainto_tsquery('pg_catalog.english', %s))",
+            (text,),
+            output_field=FloatField()
+        ))
+
+    raise FullTextNotSupportedException(vendor)
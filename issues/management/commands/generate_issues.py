@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from testing.catalog import CatalogGenerator
+
+
+class Command(BaseCommand):
+    help = 'Adds synthetic owners, repositories and issues, e.g. to try the app or a query plan at scale.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('issues', type=int)
+        parser.add_argument('--seed', type=int, default=0, help='The same seed always generates the same catalog.')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--prefix', default='generated-', help='Prefix of the generated owners and repositories.')
+
+    def handle(self, *args, **options):
+        generator = CatalogGenerator(seed=options['seed'], batch_size=options['batch_size'], prefix=options['prefix'])
+        report = generator.generate(options['issues'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Generated {report.issues} issues over {report.repositories} repositories of {report.owners} owners '
+            f'in {report.elapsed:.1f}s ({report.issues_per_minute:.0f} issues/min)'
+        ))
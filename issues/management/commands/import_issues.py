@@ -0,0 +1,39 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from issues.services.github_client import GithubClient
+from issues.services.import_issues_service import ImportIssuesService, ImportProgress
+
+
+class Command(BaseCommand):
+    help = 'Imports the Github issue URLs listed one per line in a file, or in stdin given "-".'
+
+    def add_arguments(self, parser):
+        parser.add_argument('input', help='File with one Github issue URL per line, or "-" for stdin.')
+        parser.add_argument('--workers', type=int, default=8, help='Concurrent Github requests.')
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--progress-file', help='Stores how many lines were imported, to resume an import.')
+        parser.add_argument('--github-url', help='Github API URL. Defaults to the GITHUB_API_URL setting.')
+
+    def handle(self, *args, **options):
+        service = ImportIssuesService(
+            github=GithubClient(base_url=options['github_url'], pool_size=options['workers']),
+            workers=options['workers'],
+            batch_size=options['batch_size'],
+            progress=ImportProgress(options['progress_file']),
+            on_error=lambda url, error: self.stderr.write(f'{type(error).__name__}: {url}'),
+        )
+
+        if options['input'] == '-':
+            report = service.import_urls(sys.stdin)
+        else:
+            with open(options['input']) as lines:
+                report = service.import_urls(lines)
+
+        failures = ', '.join(f'{name}: {count}' for name, count in sorted(report.failures.items()))
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {report.imported} issues in {report.elapsed:.2f}s '
+            f'({report.throughput:.1f} issues/s). Failed: {report.failed}' + (f' ({failures})' if failures else '')
+        ))
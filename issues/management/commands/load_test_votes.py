@@ -0,0 +1,85 @@
+import os
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client, override_settings
+
+from issues.models import Issue, Owner, Repository
+from issues.services.vote_buffer_service import get_vote_buffer
+from triage.lookups import languages
+
+LOAD_TEST_OWNER = 'vote-load-test'
+
+
+class Command(BaseCommand):
+    help = 'Sends concurrent votes for one issue through the rate view, with and without the vote buffer, ' \
+           'in a separate database.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--votes', type=int, default=500)
+        parser.add_argument('--concurrency', type=int, default=8)
+
+    def handle(self, *args, **options):
+        # The votes go to a throwaway database, the flush of the vote buffer would merge the real pending votes too.
+        old_name = connection.settings_dict['NAME']
+        old_test_settings = connection.settings_dict.get('TEST') or {}
+        connection.settings_dict['TEST'] = dict(old_test_settings, NAME=f'load_test_{os.path.basename(str(old_name))}')
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+
+        try:
+            owner = Owner.objects.create(owner=LOAD_TEST_OWNER)
+
+            for name, buffered in [('direct', False), ('buffered', True)]:
+                issue = Issue.objects.create(
+                    repository=Repository.objects.create(owner=owner, name=name),
+                    number=1,
+                    name='Vote load test',
+                    body='',
+                    state=Issue.CLOSED,
+                    main_language=languages.get_or_create('Other'),
+                )
+
+                with override_settings(RATE_BUFFER_ENABLED=buffered):
+                    self._run(name, issue, options['votes'], options['concurrency'], buffered)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            connection.settings_dict['TEST'] = old_test_settings
+
+    def _run(self, name: str, issue: Issue, votes: int, concurrency: int, buffered: bool):
+        url = issue.get_rate_url()
+
+        def vote(number):
+            client = Client(raise_request_exception=False)
+            started_at = time.perf_counter()
+
+            try:
+                response = client.post(url, {'rate': number % 5 + 1})
+            finally:
+                # Like the server with CONN_MAX_AGE = 0, every request gets its own connection.
+                connection.close()
+
+            return response.status_code, time.perf_counter() - started_at
+
+        started_at = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(vote, range(votes)))
+
+        if buffered:
+            get_vote_buffer().flush()
+
+        elapsed = time.perf_counter() - started_at
+        statuses = Counter(status for status, _ in results)
+        latencies = sorted(seconds for _, seconds in results)
+        issue.refresh_from_db()
+
+        self.stdout.write(
+            f'{name:<9} {len(results):>6} votes  {elapsed:8.2f}s  {len(results) / elapsed:8.1f} votes/s  '
+            f'p50 {latencies[len(latencies) // 2] * 1000:7.1f}ms  '
+            f'p99 {latencies[int(len(latencies) * 0.99)] * 1000:7.1f}ms  '
+            f'{issue.rate_votes} counted  '
+            f'statuses: ' + ', '.join(f'{status}: {count}' for status, count in sorted(statuses.items()))
+        )
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from issues.services.issue_webhook_service import merge_pending_issue_events
+
+
+class Command(BaseCommand):
+    help = 'Merges the webhook events left in the event buffer into the issues, e.g. after a deploy.'
+
+    def handle(self, *args, **options):
+        updated = merge_pending_issue_events()
+        self.stdout.write(self.style.SUCCESS(f'{updated} issues updated from pending webhook events'))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from issues.services.vote_buffer_service import merge_pending_votes
+
+
+class Command(BaseCommand):
+    help = 'Merges the votes left in the vote buffer into the issue aggregates, e.g. after a deploy.'
+
+    def handle(self, *args, **options):
+        merged = merge_pending_votes()
+        self.stdout.write(self.style.SUCCESS(f'{merged} pending votes merged'))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from issues.services.issue_job_queue import IssueJobQueue, IssueJobWorker
+
+
+class Command(BaseCommand):
+    help = 'Processes the queued issue creation jobs.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=1, help='Jobs processed at the same time.')
+        parser.add_argument('--max-attempts', type=int, help='Defaults to the ISSUE_JOBS_MAX_ATTEMPTS setting.')
+        parser.add_argument('--backoff', type=float, help='Seconds before the first retry, doubled on each attempt.')
+        parser.add_argument('--poll-interval', type=float, default=1.0)
+        parser.add_argument('--once', action='store_true', help='Exit once the queue is empty.')
+
+    def handle(self, *args, **options):
+        worker = IssueJobWorker(
+            queue=IssueJobQueue(max_attempts=options['max_attempts'], backoff_seconds=options['backoff']),
+            concurrency=options['concurrency'],
+            poll_interval=options['poll_interval'],
+        )
+
+        if options['once']:
+            processed = worker.run_until_empty()
+            self.stdout.write(self.style.SUCCESS(f'{processed} jobs processed'))
+            return
+
+        try:
+            worker.run_forever()
+        except KeyboardInterrupt:
+            worker.stop()
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from issues.sitemaps import refresh_sections
+
+
+class Command(BaseCommand):
+    help = 'Updates the sitemap sections of the issues added or changed since the last refresh.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rebuild', action='store_true',
+                            help='Rebuilds every section, e.g. after changing SITEMAP_SECTION_SIZE.')
+
+    def handle(self, *args, **options):
+        changed = refresh_sections(rebuild=options['rebuild'])
+        self.stdout.write(self.style.SUCCESS(f'{changed} sitemap sections updated'))
@@ -0,0 +1,54 @@
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from issues.models import Issue
+from issues.rendering import RENDERER_VERSION, render_markdown
+
+
+class Command(BaseCommand):
+    help = 'Re-renders the markdown of issues whose stored HTML was rendered by another renderer version.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument('--all', action='store_true', help='Re-render every issue, even the up to date ones.')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        workers = options['workers']
+
+        issues = Issue.objects.order_by('id')
+
+        if not options['all']:
+            issues = issues.exclude(body_html_version=RENDERER_VERSION)
+
+        executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+        rendered = 0
+        last_id = 0
+
+        try:
+            while True:
+                batch = list(issues.filter(id__gt=last_id).only('id', 'body')[:batch_size])
+
+                if not batch:
+                    break
+
+                bodies = [issue.body for issue in batch]
+                htmls = executor.map(render_markdown, bodies, chunksize=max(1, len(bodies) // workers)) \
+                    if executor else map(render_markdown, bodies)
+
+                for issue, html in zip(batch, htmls):
+                    issue.body_html = html
+                    issue.body_html_version = RENDERER_VERSION
+
+                Issue.objects.bulk_update(batch, ['body_html', 'body_html_version'])
+
+                rendered += len(batch)
+                last_id = batch[-1].id
+                self.stdout.write(f'{rendered} issues rendered')
+        finally:
+            if executor:
+                executor.shutdown()
+
+        self.stdout.write(self.style.SUCCESS(f'Done. {rendered} issues rendered with {RENDERER_VERSION}'))
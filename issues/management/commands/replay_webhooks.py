@@ -0,0 +1,86 @@
+import json
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from requests.adapters import HTTPAdapter
+
+from issues.services.issue_webhook_service import sign
+
+
+class Command(BaseCommand):
+    help = 'Replays recorded Github webhook deliveries, one JSON per line, against the webhook endpoint.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('input', help='File with one delivery per line, or "-" for stdin. A delivery is either '
+                                          'an issues payload or {"event": ..., "payload": ...}.')
+        parser.add_argument('--url', default='http://localhost:8000/issues/webhook')
+        parser.add_argument('--secret', help='Defaults to the GITHUB_WEBHOOK_SECRET setting.')
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--repeat', type=int, default=1, help='Sends the whole recording this many times.')
+
+    def handle(self, *args, **options):
+        secret = options['secret'] or settings.GITHUB_WEBHOOK_SECRET
+
+        if not secret:
+            raise CommandError('A webhook secret is required, use --secret or GITHUB_WEBHOOK_SECRET.')
+
+        if options['input'] == '-':
+            deliveries = self._read(sys.stdin)
+        else:
+            with open(options['input']) as lines:
+                deliveries = self._read(lines)
+
+        session = requests.Session()
+        session.mount(options['url'], HTTPAdapter(pool_maxsize=options['concurrency']))
+
+        def send(delivery):
+            event, body = delivery
+            started_at = time.perf_counter()
+            response = session.post(options['url'], data=body, headers={
+                'Content-Type': 'application/json',
+                'X-GitHub-Event': event,
+                'X-Hub-Signature-256': sign(secret, body),
+            })
+            return response.status_code, time.perf_counter() - started_at
+
+        started_at = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as executor:
+            results = list(executor.map(send, deliveries * options['repeat']))
+
+        elapsed = time.perf_counter() - started_at
+        statuses = Counter(status for status, _ in results)
+        latencies = sorted(seconds for _, seconds in results)
+
+        if not latencies:
+            self.stdout.write('Nothing to replay')
+            return
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Sent {len(results)} deliveries in {elapsed:.2f}s ({len(results) / elapsed:.1f}/s). '
+            f'p50 {latencies[len(latencies) // 2] * 1000:.1f}ms, '
+            f'p99 {latencies[int(len(latencies) * 0.99)] * 1000:.1f}ms. '
+            f'Statuses: ' + ', '.join(f'{status}: {count}' for status, count in sorted(statuses.items()))
+        ))
+
+    @staticmethod
+    def _read(lines):
+        deliveries = []
+
+        for line in lines:
+            if not line.strip():
+                continue
+
+            delivery = json.loads(line)
+
+            if 'payload' in delivery and 'event' in delivery:
+                deliveries.append((delivery['event'], json.dumps(delivery['payload']).encode()))
+            else:
+                deliveries.append(('issues', json.dumps(delivery).encode()))
+
+        return deliveries
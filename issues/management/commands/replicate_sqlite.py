@@ -0,0 +1,32 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from iwannacontrib.replicas import PRIMARY, copy_sqlite_database
+
+
+class Command(BaseCommand):
+    help = 'Copies the SQLite primary into the SQLite replicas every --lag seconds, to try the replicas locally.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lag', type=float, default=2, help='Seconds between two copies.')
+        parser.add_argument('--once', action='store_true', help='Copy once and exit.')
+
+    def handle(self, *args, **options):
+        if not settings.DATABASE_REPLICAS:
+            raise CommandError('No replica configured, set DATABASE_REPLICA_URLS.')
+
+        while True:
+            for alias in settings.DATABASE_REPLICAS:
+                try:
+                    copy_sqlite_database(PRIMARY, alias)
+                except ValueError as e:
+                    raise CommandError(e)
+
+            self.stdout.write(f'{len(settings.DATABASE_REPLICAS)} replicas updated')
+
+            if options['once']:
+                return
+
+            time.sleep(options['lag'])
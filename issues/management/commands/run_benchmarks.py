@@ -0,0 +1,82 @@
+import os
+import time
+from unittest import mock
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+
+from testing.benchmark import SCENARIOS, BASELINES_PATH, BenchmarkSuite, seed_catalog, load_baselines, \
+    save_baselines, find_regressions, unexpected_statuses
+from iwannacontrib.staticfiles import UNCOLLECTED_STORAGE
+from testing.fake_github import FakeGithub
+
+
+class Command(BaseCommand):
+    help = 'Seeds a catalog of issues in a separate database and benchmarks the main views against a fake Github. ' \
+           'Fails when a result regresses past the stored baselines.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', type=int, default=10000, help='Issues in the catalog, e.g. 10000 to 1000000.')
+        parser.add_argument('--requests', type=int, default=200, help='Requests per scenario.')
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--scenario', action='append', choices=SCENARIOS, help='Defaults to every scenario.')
+        parser.add_argument('--baselines', default=BASELINES_PATH)
+        parser.add_argument('--tolerance', type=float, default=0.25,
+                            help='How much slower or bigger than the baseline a result may be.')
+        parser.add_argument('--update-baselines', action='store_true')
+        parser.add_argument('--keepdb', action='store_true',
+                            help='Keeps the benchmark database, so the next run does not seed it again.')
+
+    def handle(self, *args, **options):
+        old_name = connection.settings_dict['NAME']
+        connection.settings_dict['TEST'] = dict(
+            connection.settings_dict.get('TEST') or {},
+            NAME=f'benchmark_{os.path.basename(str(old_name))}'
+        )
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=options['keepdb'])
+
+        try:
+            started_at = time.perf_counter()
+            seeded = seed_catalog(options['size'])
+            self.stdout.write(f'Seeded {seeded} issues in {time.perf_counter() - started_at:.1f}s')
+
+            results = self._run(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options['keepdb'])
+
+        for result in results:
+            self.stdout.write(
+                f'{result.name:<13} {len(result.latencies):>6} requests  {result.requests_per_second:8.1f} req/s  '
+                f'p50 {result.latency_ms(0.5):7.1f}ms  p95 {result.latency_ms(0.95):7.1f}ms  '
+                f'p99 {result.latency_ms(0.99):7.1f}ms  {result.queries_per_request:5.1f} queries  '
+                f'peak {result.peak_memory / 1024:8.1f} KiB  '
+                f'statuses: ' + ', '.join(f'{status}: {count}' for status, count in sorted(result.statuses.items()))
+            )
+
+        if options['update_baselines']:
+            errors = unexpected_statuses(results)
+
+            if errors:
+                raise CommandError('Baselines not saved:\n' + '\n'.join(errors))
+
+            save_baselines(results, options['size'], options['baselines'])
+            self.stdout.write(self.style.SUCCESS(f'Baselines saved to {options["baselines"]}'))
+            return
+
+        regressions = find_regressions(results, load_baselines(options['baselines']), options['size'],
+                                       options['tolerance'])
+
+        if regressions:
+            raise CommandError('Regressed past the baselines:\n' + '\n'.join(regressions))
+
+        self.stdout.write(self.style.SUCCESS('No regressions'))
+
+    @staticmethod
+    def _run(options):
+        benchmark_settings = override_settings(ISSUE_JOBS_EAGER=True, STATICFILES_STORAGE=UNCOLLECTED_STORAGE)
+
+        with FakeGithub() as fake, benchmark_settings, \
+                mock.patch('issues.services.issue_job_queue.get_github_client', return_value=fake.client()):
+            suite = BenchmarkSuite(fake, requests=options['requests'], concurrency=options['concurrency'])
+            return suite.run(options['scenario'])
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from issues.models import Repository
+from issues.services.github_client import GithubClient
+from issues.services.sync_issues_service import SyncIssuesService
+
+
+class Command(BaseCommand):
+    help = 'Syncs the title, body and state of the stored issues with Github, one listing per repository.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('repositories', nargs='*', help='Only sync these "owner/name" repositories.')
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--github-url', help='Github API URL. Defaults to the GITHUB_API_URL setting.')
+
+    def handle(self, *args, **options):
+        service = SyncIssuesService(
+            github=GithubClient(base_url=options['github_url']),
+            batch_size=options['batch_size'],
+            on_error=lambda repository, error: self.stderr.write(
+                f'{type(error).__name__}: {repository.owner_id}/{repository.name}'
+            ),
+        )
+
+        repositories = None
+
+        if options['repositories']:
+            repositories = Repository.objects.none()
+
+            for path in options['repositories']:
+                owner, name = path.split('/', 1)
+                repositories |= Repository.objects.filter(owner_id=owner, name=name)
+
+        report = service.sync(repositories)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Synced {report.repositories} repositories in {report.elapsed:.2f}s. '
+            f'Scanned {report.scanned} issues, updated {report.updated}. Failed: {report.failed}'
+        ))
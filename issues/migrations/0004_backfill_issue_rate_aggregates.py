@@ -0,0 +1,42 @@
+from django.db import migrations
+from django.db.models import Count, Q, Sum
+
+COMPLEXITY_LEVELS = [1, 2, 3, 4, 5]
+AGGREGATE_RATE_FIELDS = ['rate_sum', 'rate_votes'] + [f'rate_{level}_votes' for level in COMPLEXITY_LEVELS]
+BATCH_SIZE = 500
+
+
+def backfill_rate_aggregates(apps, schema_editor):
+    Issue = apps.get_model('issues', 'Issue')
+    IssueRateRel = apps.get_model('issues', 'IssueRateRel')
+
+    aggregates = IssueRateRel.objects.values('issue_id').annotate(
+        rate_sum=Sum('rate__rate'),
+        rate_votes=Count('id'),
+        **{
+            f'rate_{level}_votes': Count('id', filter=Q(rate__rate=level))
+            for level in COMPLEXITY_LEVELS
+        }
+    ).order_by('issue_id')
+
+    batch = []
+
+    for aggregate in aggregates.iterator():
+        batch.append(Issue(id=aggregate['issue_id'], **{field: aggregate[field] for field in AGGREGATE_RATE_FIELDS}))
+
+        if len(batch) == BATCH_SIZE:
+            Issue.objects.bulk_update(batch, AGGREGATE_RATE_FIELDS)
+            batch = []
+
+    Issue.objects.bulk_update(batch, AGGREGATE_RATE_FIELDS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('issues', '0003_issue_rate_aggregates'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_rate_aggregates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 3.1 on 2026-10-18 07:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('issues', '0004_backfill_issue_rate_aggregates'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='issue',
+            name='body_html',
+            field=models.TextField(default=''),
+        ),
+        migrations.AddField(
+            model_name='issue',
+            name='body_html_version',
+            field=models.CharField(default='', max_length=100),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 3.1 on 2026-10-18 07:03
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_current_rate_level(apps, schema_editor):
+    Issue = apps.get_model('issues', 'Issue')
+
+    for level in [1, 2, 3, 4, 5]:
+        Issue.objects.filter(current_rate__rate=level).update(current_rate_level=level)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('triage', '0001_initial'),
+        ('issues', '0005_issue_body_html'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='issue',
+            name='current_rate_level',
+            field=models.PositiveSmallIntegerField(choices=[(1, 'Very Easy'), (2, 'Easy'), (3, 'Medium'), (4, 'Hard'), (5, 'Very Hard')], default=None, null=True),
+        ),
+        migrations.RunPython(backfill_current_rate_level, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='issue',
+            name='main_language',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='triage.programminglanguage'),
+        ),
+        migrations.AddIndex(
+            model_name='issue',
+            index=models.Index(fields=['main_language', '-created_at', '-id'], name='issue_language_recency_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='issue',
+            index=models.Index(fields=['main_language', 'current_rate_level', '-created_at', '-id'], name='issue_language_rate_idx'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 3.1 on 2026-10-18 07:10
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('issues', '0007_issue_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IssueCreationJob',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.CharField(max_length=500)),
+                ('owner', models.CharField(max_length=200)),
+                ('repository', models.CharField(max_length=200)),
+                ('number', models.IntegerField()),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now)),
+                ('locked_at', models.DateTimeField(default=None, null=True)),
+                ('last_error', models.TextField(default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('issue', models.ForeignKey(default=None, null=True, on_delete=django.db.models.deletion.SET_NULL, to='issues.issue')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='issuecreationjob',
+            index=models.Index(fields=['status', 'run_after'], name='issue_job_queue_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='issuecreationjob',
+            unique_together={('owner', 'repository', 'number')},
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 3.1 on 2026-10-18 07:12
+
+from django.db import migrations, models
+
+
+def open_issues_without_state(apps, schema_editor):
+    Issue = apps.get_model('issues', 'Issue')
+    Issue.objects.filter(state='').update(state='open')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('issues', '0008_issue_creation_job'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='issue',
+            name='issue_recency_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='issue',
+            name='issue_language_recency_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='issue',
+            name='issue_language_rate_idx',
+        ),
+        migrations.AddField(
+            model_name='repository',
+            name='synced_at',
+            field=models.DateTimeField(default=None, null=True),
+        ),
+        migrations.AlterField(
+            model_name='issue',
+            name='state',
+            field=models.CharField(default='open', max_length=60),
+        ),
+        migrations.RunPython(open_issues_without_state, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='issue',
+            index=models.Index(fields=['state', '-created_at', '-id'], name='issue_recency_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='issue',
+            index=models.Index(fields=['state', 'main_language', '-created_at', '-id'], name='issue_language_recency_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='issue',
+            index=models.Index(fields=['state', 'main_language', 'current_rate_level', '-created_at', '-id'], name='issue_language_rate_idx'),
+        ),
+    ]
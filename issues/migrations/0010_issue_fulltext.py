@@ -0,0 +1,22 @@
+from django.db import migrations
+
+from issues import fulltext
+
+
+def install_fulltext(apps, schema_editor):
+    fulltext.install(schema_editor.connection)
+
+
+def uninstall_fulltext(apps, schema_editor):
+    fulltext.uninstall(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('issues', '0009_issue_state_sync'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_fulltext, uninstall_fulltext),
+    ]
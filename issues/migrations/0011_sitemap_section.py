@@ -0,0 +1,20 @@
+# Generated by Django 3.1 on 2026-10-18 07:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('issues', '0010_issue_fulltext'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SitemapSection',
+            fields=[
+                ('number', models.PositiveIntegerField(primary_key=True, serialize=False)),
+                ('lastmod', models.DateTimeField()),
+            ],
+        ),
+    ]
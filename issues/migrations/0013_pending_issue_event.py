@@ -0,0 +1,25 @@
+# Generated by Django 3.1 on 2026-10-18 08:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('issues', '0012_pending_vote'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PendingIssueEvent',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('owner', models.CharField(max_length=200)),
+                ('repository', models.CharField(max_length=200)),
+                ('number', models.IntegerField()),
+                ('github_issue', models.JSONField()),
+                ('batch', models.CharField(default=None, max_length=32, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
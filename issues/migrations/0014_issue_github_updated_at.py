@@ -0,0 +1,18 @@
+# Generated by Django 3.1 on 2026-10-18 08:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('issues', '0013_pending_issue_event'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='issue',
+            name='github_updated_at',
+            field=models.DateTimeField(default=None, null=True),
+        ),
+    ]
@@ -1,9 +1,16 @@
-import markdown
-from django.db import models
+from django.db import models, transaction, connections
+from django.db.models import F
 from django.urls import reverse
+from django.utils import timezone
 
+from issues import fulltext
+from issues.rendering import RENDERER_VERSION, render_markdown
+from triage.facets import FacetCounts
+from triage.lookups import rates
 from triage.models import ProgrammingLanguage, IssueRate, COMPLEXITY_LEVEL
 
+AGGREGATE_RATE_FIELDS = ['rate_sum', 'rate_votes'] + [f'rate_{level}_votes' for level, _ in COMPLEXITY_LEVEL]
+
 
 class Owner(models.Model):
     owner = models.CharField(max_length=200, primary_key=True, null=False)
@@ -12,26 +19,72 @@ class Owner(models.Model):
 class Repository(models.Model):
     owner = models.ForeignKey(Owner, on_delete=models.CASCADE, null=False)
     name = models.CharField(max_length=200, null=False)
+    synced_at = models.DateTimeField(null=True, default=None)
 
     class Meta:
         unique_together = (("owner", "name"),)
 
 
+class IssueQuerySet(models.QuerySet):
+    def open(self):
+        return self.filter(state=Issue.OPEN)
+
+    def with_relations(self):
+        return self.select_related('repository__owner', 'main_language', 'current_rate')
+
+    def search(self, query: str):
+        terms = fulltext.search_terms(query)
+
+        if not terms:
+            return self.none()
+
+        return fulltext.search(self, terms, connections[self.db].vendor)
+
+
 class Issue(models.Model):
+    OPEN = 'open'
+    CLOSED = 'closed'
+
     repository = models.ForeignKey(Repository, null=False, on_delete=models.CASCADE)
     number = models.IntegerField(null=False)
     name = models.CharField(max_length=200)
     body = models.TextField()
-    state = models.CharField(max_length=60)
+    body_html = models.TextField(default='')
+    body_html_version = models.CharField(max_length=100, default='')
+    state = models.CharField(max_length=60, default=OPEN)
     main_language = models.ForeignKey(
         ProgrammingLanguage,
         on_delete=models.CASCADE,
+        db_index=False,
     )
     current_rate = models.ForeignKey(IssueRate, null=True, default=None, on_delete=models.CASCADE)
+    current_rate_level = models.PositiveSmallIntegerField(null=True, default=None, choices=COMPLEXITY_LEVEL)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    # GitHub's updated_at of the version applied last, so an older delivery or listing never overwrites it.
+    github_updated_at = models.DateTimeField(null=True, default=None)
+    rate_sum = models.PositiveIntegerField(default=0)
+    rate_votes = models.PositiveIntegerField(default=0)
+    rate_1_votes = models.PositiveIntegerField(default=0)
+    rate_2_votes = models.PositiveIntegerField(default=0)
+    rate_3_votes = models.PositiveIntegerField(default=0)
+    rate_4_votes = models.PositiveIntegerField(default=0)
+    rate_5_votes = models.PositiveIntegerField(default=0)
+
+    objects = IssueQuerySet.as_manager()
 
     class Meta:
         unique_together = (("repository", "number"),)
+        indexes = [
+            models.Index(fields=['state', '-created_at', '-id'], name='issue_recency_idx'),
+            models.Index(fields=['state', 'main_language', '-created_at', '-id'], name='issue_language_recency_idx'),
+            models.Index(
+                fields=['state', 'main_language', 'current_rate_level', '-created_at', '-id'],
+                name='issue_language_rate_idx'
+            ),
+            models.Index(fields=['-updated_at'], name='issue_freshness_idx'),
+            models.Index(fields=['main_language', '-updated_at'], name='issue_language_freshness_idx'),
+        ]
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -65,33 +118,138 @@ class Issue(models.Model):
 
     @property
     def html(self):
-        return markdown.markdown(self.body, extensions=['fenced_code'])
+        if self.body_html_version != RENDERER_VERSION:
+            return render_markdown(self.body)
+
+        return self.body_html
+
+    def render_body(self):
+        self.body_html = render_markdown(self.body)
+        self.body_html_version = RENDERER_VERSION
 
     @property
     def external_url(self):
         return f'https://github.com/{self.repository.owner.owner}/{self.repository.name}/issues/{self.number}'
 
+    @property
+    def rate_histogram(self) -> dict:
+        return {level: getattr(self, Issue.rate_votes_field(level)) for level, _ in COMPLEXITY_LEVEL}
+
+    @staticmethod
+    def rate_votes_field(rate_number: int) -> str:
+        if rate_number not in dict(COMPLEXITY_LEVEL):
+            raise ValueError(f'Unknown complexity level: {rate_number}')
+
+        return f'rate_{rate_number}_votes'
+
+    @staticmethod
+    def votes_update(votes: dict) -> dict:
+        # Maps each complexity level to how many votes it got, so a whole batch is added in one UPDATE.
+        update = {
+            'rate_sum': F('rate_sum') + sum(level * count for level, count in votes.items()),
+            'rate_votes': F('rate_votes') + sum(votes.values()),
+        }
+
+        for level, count in votes.items():
+            votes_field = Issue.rate_votes_field(level)
+            update[votes_field] = F(votes_field) + count
+
+        return update
+
     def rate(self, rate_number: int):
-        rate = IssueRate.objects.get_or_create(rate=rate_number)[0]
-        issue_rate = IssueRateRel.objects.create(issue=self, rate=rate)
-        self.rates.add(issue_rate)
+        update = Issue.votes_update({rate_number: 1})
+        rate = rates.get_or_create(rate_number)
 
-        self.current_rate = IssueRate.objects.get_or_create(
-            rate=round(self._calculate_rate_sum() / self._total_rates())
-        )[0]
+        with transaction.atomic():
+            Issue.objects.filter(pk=self.pk).update(**update)
+            IssueRateRel.objects.create(issue=self, rate=rate)
 
-    def _calculate_rate_sum(self) -> int:
-        total = 0
+            # Read after the UPDATE, so the row lock makes the previous level the one this vote moves away from.
+            self.refresh_from_db(fields=AGGREGATE_RATE_FIELDS + ['current_rate_level', 'state'])
+            facets = FacetCounts()
+            self.refresh_current_rate(facets)
+            Issue.objects.filter(pk=self.pk).update(
+                current_rate=self.current_rate,
+                current_rate_level=self.current_rate_level,
+                updated_at=self.updated_at
+            )
+            facets.save()
 
-        for rate in self.rates.all():
-            total += rate.rate.rate
+    def refresh_current_rate(self, facets: FacetCounts):
+        # Expects the aggregates to be read after their last UPDATE, returns the level the issue moved away from.
+        previous_rate_level = self.current_rate_level
+        self.current_rate = rates.get_or_create(round(self.rate_sum / self.rate_votes))
+        self.current_rate_level = self.current_rate.rate
+        self.updated_at = timezone.now()
 
-        return total
+        if self.state == Issue.OPEN and previous_rate_level != self.current_rate_level:
+            facets.move(self.main_language_id, previous_rate_level, self.current_rate_level)
 
-    def _total_rates(self) -> int:
-        return len(self.rates.all())
+        return previous_rate_level
 
 
 class IssueRateRel(models.Model):
     issue = models.ForeignKey(Issue, on_delete=models.CASCADE, related_name='rates')
     rate = models.ForeignKey(IssueRate, on_delete=models.CASCADE)
+
+
+class PendingVote(models.Model):
+    # Votes appended in the buffered rate mode, until issues.services.vote_buffer_service merges them.
+    issue = models.ForeignKey(Issue, on_delete=models.CASCADE, related_name='+')
+    rate = models.PositiveSmallIntegerField(choices=COMPLEXITY_LEVEL)
+    batch = models.CharField(max_length=32, null=True, default=None)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+
+class PendingIssueEvent(models.Model):
+    # Webhook deliveries are stored before they are acknowledged, until issues.services.issue_webhook_service
+    # merges them into the issues.
+    owner = models.CharField(max_length=200)
+    repository = models.CharField(max_length=200)
+    number = models.IntegerField()
+    github_issue = models.JSONField()
+    batch = models.CharField(max_length=32, null=True, default=None)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+
+class IssueCreationJob(models.Model):
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+
+    STATUSES = [
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+
+    url = models.CharField(max_length=500)
+    owner = models.CharField(max_length=200)
+    repository = models.CharField(max_length=200)
+    number = models.IntegerField()
+    status = models.CharField(max_length=20, choices=STATUSES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, default=None)
+    last_error = models.TextField(default='')
+    issue = models.ForeignKey(Issue, null=True, default=None, on_delete=models.SET_NULL)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = (("owner", "repository", "number"),)
+        indexes = [
+            models.Index(fields=['status', 'run_after'], name='issue_job_queue_idx'),
+        ]
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in (IssueCreationJob.DONE, IssueCreationJob.FAILED)
+
+
+class SitemapSection(models.Model):
+    # Section n lists the issues with n * SITEMAP_SECTION_SIZE <= id < (n + 1) * SITEMAP_SECTION_SIZE.
+    number = models.PositiveIntegerField(primary_key=True)
+    lastmod = models.DateTimeField()
@@ -0,0 +1,15 @@
+import markdown
+
+from iwannacontrib.metrics import timed
+
+MARKDOWN_EXTENSIONS = ['fenced_code']
+
+# Bump the revision whenever the rendering output changes for reasons the markdown version and extensions
+# don't capture. Rows tagged with another version are re-rendered by the render_issue_bodies command.
+RENDERER_REVISION = 1
+RENDERER_VERSION = f'{RENDERER_REVISION}:markdown-{markdown.__version__}:{",".join(MARKDOWN_EXTENSIONS)}'
+
+
+def render_markdown(body: str) -> str:
+    with timed('markdown'):
+        return markdown.markdown(body, extensions=MARKDOWN_EXTENSIONS)
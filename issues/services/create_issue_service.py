@@ -1,8 +1,12 @@
 import re
 
-from github import Github
+from django.db import transaction
 
 from issues.models import Issue, Repository, Owner
+from issues.services.github_client import GithubClient, GithubRequestException, parse_github_datetime
+from triage.cache import SearchResultsCache
+from triage.facets import FacetCounts
+from triage.lookups import languages
 from triage.models import ProgrammingLanguage
 
 
@@ -53,7 +57,7 @@ class IssueToBeCreated:
 
 
 class CreateIssueService:
-    def create_issue(self, github: Github, issue_to_be_created: IssueToBeCreated) -> Issue:
+    def create_issue(self, github: GithubClient, issue_to_be_created: IssueToBeCreated) -> Issue:
         github_issue = self._get_github_issue(github, issue_to_be_created)
 
         repository = Repository.objects.get_or_create(
@@ -66,22 +70,42 @@ class CreateIssueService:
 
         issue = Issue(
             number=issue_to_be_created.number,
-            name=github_issue.title,
-            body=github_issue.body,
+            name=github_issue['title'],
+            body=github_issue['body'] or '',
+            state=github_issue['state'],
+            github_updated_at=parse_github_datetime(github_issue.get('updated_at')),
             repository=repository,
-            main_language=self._get_main_language(github_issue)
+            main_language=self._get_main_language(github, issue_to_be_created)
         )
-        issue.save()
+        issue.render_body()
+
+        # On SQLite a transaction opened by the full-text insert trigger cannot wait for the write lock,
+        # so the counter is written first.
+        with transaction.atomic():
+            if issue.state == Issue.OPEN:
+                facets = FacetCounts()
+                facets.add(issue.main_language_id, issue.current_rate_level)
+                facets.save()
+
+            issue.save()
+
+        SearchResultsCache().invalidate_issue(issue.main_language_id, issue.current_rate_level)
         return issue
 
-    def _get_main_language(self, github_issue):
-        languages = iter(github_issue.repository.get_languages().keys())
-        main_language_name = next(languages)
-        return ProgrammingLanguage.objects.get_or_create(name=main_language_name)[0]
+    def _get_main_language(self, github: GithubClient, issue_to_be_created: IssueToBeCreated):
+        try:
+            main_language_name = github.get_main_language(issue_to_be_created.owner, issue_to_be_created.repository)
+        except GithubRequestException:
+            raise IssueNotFoundException(issue_to_be_created.url)
+
+        if main_language_name is None:
+            return ProgrammingLanguage.get_other_default_language()
+
+        return languages.get_or_create(main_language_name)
 
-    def _get_github_issue(self, github: Github, issue_to_be_created: IssueToBeCreated):
+    def _get_github_issue(self, github: GithubClient, issue_to_be_created: IssueToBeCreated) -> dict:
         try:
-            repo = github.get_repo(issue_to_be_created.get_repo_path(), lazy=True)
-            return repo.get_issue(issue_to_be_created.number)
-        except Exception:
+            return github.get_issue(issue_to_be_created.owner, issue_to_be_created.repository,
+                                    issue_to_be_created.number)
+        except GithubRequestException:
             raise IssueNotFoundException(issue_to_be_created.url)
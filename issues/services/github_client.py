@@ -0,0 +1,208 @@
+import atexit
+import hashlib
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+
+import requests
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.dateparse import parse_datetime
+from requests.adapters import HTTPAdapter
+
+from iwannacontrib.metrics import ProcessSnapshots, timed
+
+GITHUB_CACHE = 'github'
+
+
+def parse_github_datetime(value: str = None):
+    return parse_datetime(value) if value else None
+
+
+class GithubRequestException(Exception):
+    def __init__(self, url: str, status: int = None):
+        self.url = url
+        self.status = status
+        super()
+
+
+class GithubMetrics:
+    # Given snapshots, the metrics are also written for collect() to sum them over every process.
+    def __init__(self, snapshots: ProcessSnapshots = None):
+        self._lock = threading.Lock()
+        self._snapshots = snapshots
+        self._endpoints = defaultdict(lambda: dict(
+            requests=0,
+            errors=0,
+            not_modified=0,
+            cache_hits=0,
+            total_seconds=0.0,
+            max_seconds=0.0,
+        ))
+
+    def observe(self, endpoint: str, seconds: float, status: int):
+        with self._lock:
+            metrics = self._endpoints[endpoint]
+            metrics['requests'] += 1
+            metrics['total_seconds'] += seconds
+            metrics['max_seconds'] = max(metrics['max_seconds'], seconds)
+
+            if status == 304:
+                metrics['not_modified'] += 1
+            elif status >= 400:
+                metrics['errors'] += 1
+
+        self._write_if_due()
+
+    def cache_hit(self, endpoint: str):
+        with self._lock:
+            self._endpoints[endpoint]['cache_hits'] += 1
+
+        self._write_if_due()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return self._with_averages(self._endpoints)
+
+    def write(self):
+        if self._snapshots is not None:
+            self._snapshots.write(self._raw_snapshot)
+
+    def collect(self) -> dict:
+        if self._snapshots is None:
+            return self.snapshot()
+
+        self.write()
+        endpoints = {}
+
+        for snapshot in self._snapshots.read():
+            for endpoint, metrics in snapshot.items():
+                if endpoint not in endpoints:
+                    endpoints[endpoint] = dict(metrics)
+                    continue
+
+                summed = endpoints[endpoint]
+                for name, value in metrics.items():
+                    summed[name] = max(summed[name], value) if name == 'max_seconds' else summed[name] + value
+
+        return self._with_averages(endpoints)
+
+    def _write_if_due(self):
+        if self._snapshots is not None and self._snapshots.due():
+            self.write()
+
+    def _raw_snapshot(self) -> dict:
+        with self._lock:
+            return {endpoint: dict(metrics) for endpoint, metrics in self._endpoints.items()}
+
+    @staticmethod
+    def _with_averages(endpoints: dict) -> dict:
+        return {
+            endpoint: dict(
+                metrics,
+                average_seconds=metrics['total_seconds'] / metrics['requests'] if metrics['requests'] else 0.0
+            )
+            for endpoint, metrics in endpoints.items()
+        }
+
+
+class GithubClient:
+    def __init__(self, base_url: str = None, token: str = None, pool_size: int = None,
+                 languages_ttl: int = None, timeout: float = None, metrics: GithubMetrics = None):
+        self.base_url = (base_url or settings.GITHUB_API_URL).rstrip('/')
+        self.languages_ttl = settings.GITHUB_LANGUAGES_TTL if languages_ttl is None else languages_ttl
+        self.timeout = timeout or settings.GITHUB_TIMEOUT
+        self.metrics = metrics or GithubMetrics()
+        self.cache = caches[GITHUB_CACHE]
+        self.session = requests.Session()
+
+        pool_size = pool_size or settings.GITHUB_POOL_SIZE
+        self.session.mount(self.base_url, HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+        self.session.headers['Accept'] = 'application/vnd.github.v3+json'
+
+        token = token or settings.GITHUB_TOKEN
+        if token:
+            self.session.headers['Authorization'] = f'token {token}'
+
+    def get_issue(self, owner: str, repository: str, number: int) -> dict:
+        return self.get('issue', f'/repos/{owner}/{repository}/issues/{number}')
+
+    def list_repository_issues(self, owner: str, repository: str, since: datetime = None, per_page: int = 100):
+        params = dict(state='all', sort='updated', direction='asc', per_page=per_page)
+
+        if since is not None:
+            params['since'] = since.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+        page = 1
+
+        while True:
+            issues = self.get('repository_issues', f'/repos/{owner}/{repository}/issues', dict(params, page=page))
+
+            for issue in issues:
+                if 'pull_request' not in issue:
+                    yield issue
+
+            if len(issues) < per_page:
+                return
+
+            page += 1
+
+    def get_languages(self, owner: str, repository: str) -> dict:
+        key = f'github-languages:{owner}/{repository}'.lower()
+        languages = self.cache.get(key)
+
+        if languages is not None:
+            self.metrics.cache_hit('languages')
+            return languages
+
+        languages = self.get('languages', f'/repos/{owner}/{repository}/languages')
+        self.cache.set(key, languages, self.languages_ttl)
+        return languages
+
+    def get_main_language(self, owner: str, repository: str):
+        return next(iter(self.get_languages(owner, repository)), None)
+
+    def get(self, endpoint: str, path: str, params: dict = None):
+        url = f'{self.base_url}{path}'
+        etag_key = 'github-etag:' + hashlib.sha1(f'{url}?{sorted((params or {}).items())}'.encode()).hexdigest()
+        cached = self.cache.get(etag_key)
+        headers = {'If-None-Match': cached[0]} if cached else {}
+
+        started_at = time.perf_counter()
+        try:
+            with timed('github'):
+                response = self.session.get(url, params=params, headers=headers, timeout=self.timeout)
+        except requests.RequestException:
+            self.metrics.observe(endpoint, time.perf_counter() - started_at, 599)
+            raise GithubRequestException(url)
+        self.metrics.observe(endpoint, time.perf_counter() - started_at, response.status_code)
+
+        if response.status_code == 304 and cached:
+            self.metrics.cache_hit(endpoint)
+            return cached[1]
+
+        if response.status_code != 200:
+            raise GithubRequestException(url, response.status_code)
+
+        payload = response.json()
+
+        if response.headers.get('ETag'):
+            self.cache.set(etag_key, (response.headers['ETag'], payload), None)
+
+        return payload
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_github_client() -> GithubClient:
+    global _client
+
+    with _client_lock:
+        if _client is None:
+            _client = GithubClient(metrics=GithubMetrics(ProcessSnapshots('github')))
+            atexit.register(_client.metrics.write)
+
+    return _client
@@ -0,0 +1,269 @@
+import os
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from functools import reduce
+from itertools import islice
+from operator import or_
+from typing import Callable, Iterable, Iterator, List, Optional
+
+from django.db import transaction
+from django.db.models import Q
+
+from issues.models import Issue, Repository, Owner
+from issues.services.create_issue_service import IssueToBeCreated, InvalidGithubUrlException, \
+    IssueNotFoundException, IssueAlreadyExists
+from issues.services.github_client import GithubClient, GithubRequestException, parse_github_datetime
+from triage.cache import SearchResultsCache
+from triage.facets import FacetCounts
+from triage import lookups
+from triage.models import ProgrammingLanguage
+
+OTHER_LANGUAGE = 'Other'
+
+
+class FetchedIssue:
+    def __init__(self, issue_to_be_created: IssueToBeCreated, title: str, body: str, state: str, language: str,
+                 github_updated_at=None):
+        self.issue_to_be_created = issue_to_be_created
+        self.title = title
+        self.body = body
+        self.state = state
+        self.language = language
+        self.github_updated_at = github_updated_at
+
+
+class ImportProgress:
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self.offset = self._read()
+
+    def skip(self, lines: Iterable[str]) -> Iterator[str]:
+        return islice(lines, self.offset, None)
+
+    def advance(self, lines: int):
+        self.offset += lines
+
+        if self.path is None:
+            return
+
+        with open(f'{self.path}.tmp', 'w') as progress_file:
+            progress_file.write(str(self.offset))
+
+        os.replace(f'{self.path}.tmp', self.path)
+
+    def _read(self) -> int:
+        if self.path is None or not os.path.exists(self.path):
+            return 0
+
+        with open(self.path) as progress_file:
+            return int(progress_file.read().strip() or 0)
+
+
+class ImportReport:
+    def __init__(self):
+        self.imported = 0
+        self.failures = Counter()
+        self.started_at = time.monotonic()
+        self.finished_at = None
+
+    @property
+    def failed(self) -> int:
+        return sum(self.failures.values())
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+    @property
+    def throughput(self) -> float:
+        return self.imported / self.elapsed if self.elapsed else 0.0
+
+
+class ImportIssuesService:
+    def __init__(self, github: GithubClient, workers: int = 8, batch_size: int = 100,
+                 progress: ImportProgress = None, on_error: Callable[[str, Exception], None] = None):
+        self.github = github
+        self.workers = workers
+        self.batch_size = batch_size
+        self.progress = progress or ImportProgress(None)
+        self.on_error = on_error or (lambda url, error: None)
+        self._languages = {}
+
+    def import_urls(self, lines: Iterable[str]) -> ImportReport:
+        report = ImportReport()
+        lines = self.progress.skip(lines)
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            while True:
+                batch = list(islice(lines, self.batch_size))
+
+                if not batch:
+                    break
+
+                self._import_batch(executor, batch, report)
+                self.progress.advance(len(batch))
+
+        report.finished_at = time.monotonic()
+        return report
+
+    def _import_batch(self, executor: ThreadPoolExecutor, lines: List[str], report: ImportReport):
+        to_be_created = self._new_issues(self._parse(lines, report), report)
+        repo_paths = {issue.get_repo_path() for issue in to_be_created} - self._languages.keys()
+
+        github_issues = executor.map(self._fetch_issue, to_be_created)
+        languages = dict(zip(repo_paths, executor.map(self._fetch_main_language, repo_paths)))
+        # A failed lookup is not kept, the next batch asks again.
+        self._languages.update((path, language) for path, language in languages.items() if language is not None)
+
+        fetched = []
+
+        for issue_to_be_created, github_issue in zip(to_be_created, github_issues):
+            language = self._languages.get(issue_to_be_created.get_repo_path())
+
+            if github_issue is None or language is None:
+                self._fail(report, issue_to_be_created.url, IssueNotFoundException(issue_to_be_created.url))
+                continue
+
+            fetched.append(FetchedIssue(
+                issue_to_be_created, github_issue['title'], github_issue['body'] or '', github_issue['state'], language,
+                parse_github_datetime(github_issue.get('updated_at'))
+            ))
+
+        if fetched:
+            report.imported += self._write(fetched)
+
+    def _parse(self, lines: List[str], report: ImportReport) -> List[IssueToBeCreated]:
+        parsed = {}
+
+        for line in lines:
+            url = line.strip()
+
+            if not url:
+                continue
+
+            try:
+                issue_to_be_created = IssueToBeCreated(url)
+            except InvalidGithubUrlException as e:
+                self._fail(report, url, e)
+                continue
+
+            key = self._key(issue_to_be_created)
+
+            if key in parsed:
+                self._fail(report, url, IssueAlreadyExists(url))
+                continue
+
+            parsed[key] = issue_to_be_created
+
+        return list(parsed.values())
+
+    def _new_issues(self, issues: List[IssueToBeCreated], report: ImportReport) -> List[IssueToBeCreated]:
+        if not issues:
+            return []
+
+        existing = set(
+            Issue.objects.filter(reduce(or_, [
+                Q(repository__owner__owner=issue.owner, repository__name=issue.repository, number=issue.number)
+                for issue in issues
+            ])).values_list('repository__owner__owner', 'repository__name', 'number')
+        )
+
+        new_issues = []
+
+        for issue in issues:
+            if self._key(issue) in existing:
+                self._fail(report, issue.url, IssueAlreadyExists(issue.url))
+            else:
+                new_issues.append(issue)
+
+        return new_issues
+
+    def _fetch_issue(self, issue_to_be_created: IssueToBeCreated) -> Optional[dict]:
+        try:
+            return self.github.get_issue(issue_to_be_created.owner, issue_to_be_created.repository,
+                                         issue_to_be_created.number)
+        except GithubRequestException:
+            return None
+
+    def _fetch_main_language(self, repo_path: str) -> Optional[str]:
+        try:
+            return self.github.get_main_language(*repo_path.split('/')) or OTHER_LANGUAGE
+        except GithubRequestException:
+            return None
+
+    @transaction.atomic
+    def _write(self, fetched: List[FetchedIssue]) -> int:
+        owners = {issue.issue_to_be_created.owner for issue in fetched}
+        repository_keys = {(issue.issue_to_be_created.owner, issue.issue_to_be_created.repository)
+                           for issue in fetched}
+        language_names = {issue.language for issue in fetched}
+
+        Owner.objects.bulk_create([Owner(owner=owner) for owner in owners], ignore_conflicts=True)
+        Repository.objects.bulk_create(
+            [Repository(owner_id=owner, name=name) for owner, name in repository_keys],
+            ignore_conflicts=True
+        )
+
+        # Known languages come from the lookup cache, only new ones are written and read back.
+        languages = lookups.languages.get_many(language_names)
+        missing_languages = language_names - languages.keys()
+
+        if missing_languages:
+            ProgrammingLanguage.objects.bulk_create(
+                [ProgrammingLanguage(name=name) for name in missing_languages],
+                ignore_conflicts=True
+            )
+            languages.update(
+                (language.name, language)
+                for language in ProgrammingLanguage.objects.filter(name__in=missing_languages)
+            )
+            lookups.languages.invalidate()
+
+        repositories = {
+            (repository.owner_id, repository.name): repository
+            for repository in Repository.objects.filter(
+                owner_id__in=owners,
+                name__in={name for _, name in repository_keys}
+            )
+        }
+
+        issues = []
+
+        for fetched_issue in fetched:
+            issue_to_be_created = fetched_issue.issue_to_be_created
+            issue = Issue(
+                number=issue_to_be_created.number,
+                name=fetched_issue.title,
+                body=fetched_issue.body,
+                state=fetched_issue.state,
+                github_updated_at=fetched_issue.github_updated_at,
+                repository=repositories[(issue_to_be_created.owner, issue_to_be_created.repository)],
+                main_language=languages[fetched_issue.language]
+            )
+            issue.render_body()
+            issues.append(issue)
+
+        Issue.objects.bulk_create(issues, ignore_conflicts=True)
+
+        # The batch was filtered against the existing issues, a concurrent import racing it is left to
+        # reconcile_facet_counts.
+        facets = FacetCounts()
+        for issue in issues:
+            if issue.state == Issue.OPEN:
+                facets.add(issue.main_language_id, issue.current_rate_level)
+        facets.save()
+
+        search_cache = SearchResultsCache()
+        for language in languages.values():
+            search_cache.invalidate_issue(language.id, None)
+
+        return len(issues)
+
+    def _fail(self, report: ImportReport, url: str, error: Exception):
+        report.failures[type(error).__name__] += 1
+        self.on_error(url, error)
+
+    @staticmethod
+    def _key(issue: IssueToBeCreated):
+        return issue.owner, issue.repository, issue.number
@@ -0,0 +1,170 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import timedelta
+from typing import Optional
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import F, Q
+from django.utils import timezone
+
+from issues.models import IssueCreationJob, Issue
+from issues.services.create_issue_service import IssueToBeCreated, CreateIssueService, IssueAlreadyExists, \
+    IssueNotFoundException
+from issues.services.github_client import GithubClient, GithubRequestException, get_github_client
+
+LEASE_EXPIRED_ERROR = 'The worker processing the job stopped before finishing it'
+
+
+class IssueJobQueue:
+    def __init__(self, max_attempts: int = None, backoff_seconds: float = None, lease_seconds: float = None):
+        self.max_attempts = max_attempts or settings.ISSUE_JOBS_MAX_ATTEMPTS
+        self.backoff_seconds = settings.ISSUE_JOBS_BACKOFF_SECONDS if backoff_seconds is None else backoff_seconds
+        self.lease_seconds = lease_seconds or settings.ISSUE_JOBS_LEASE_SECONDS
+
+    def enqueue(self, issue_to_be_created: IssueToBeCreated) -> IssueCreationJob:
+        job, created = IssueCreationJob.objects.get_or_create(
+            owner=issue_to_be_created.owner,
+            repository=issue_to_be_created.repository,
+            number=issue_to_be_created.number,
+            defaults=dict(url=issue_to_be_created.url)
+        )
+
+        is_orphan = job.status == IssueCreationJob.DONE and job.issue_id is None
+
+        if not created and (job.status == IssueCreationJob.FAILED or is_orphan):
+            job.status = IssueCreationJob.PENDING
+            job.attempts = 0
+            job.run_after = timezone.now()
+            job.last_error = ''
+            job.save()
+
+        return job
+
+    def claim(self) -> Optional[IssueCreationJob]:
+        now = timezone.now()
+        pending = Q(status=IssueCreationJob.PENDING, run_after__lte=now)
+        expired = Q(status=IssueCreationJob.RUNNING, locked_at__lt=now - timedelta(seconds=self.lease_seconds))
+
+        # The worker that let a lease expire crashed or hung on the job, which uses up an attempt. A job doing so
+        # on its last attempt fails instead of being run again.
+        IssueCreationJob.objects.filter(expired, attempts__gte=self.max_attempts - 1).update(
+            status=IssueCreationJob.FAILED,
+            attempts=F('attempts') + 1,
+            locked_at=None,
+            last_error=LEASE_EXPIRED_ERROR,
+            updated_at=now,
+        )
+
+        candidates = IssueCreationJob.objects.filter(pending | expired).order_by('run_after').values_list(
+            'id', flat=True
+        )
+
+        for job_id in candidates[:10]:
+            claimed = IssueCreationJob.objects.filter(pending, id=job_id).update(
+                status=IssueCreationJob.RUNNING,
+                locked_at=now,
+                updated_at=now,
+            ) or IssueCreationJob.objects.filter(expired, id=job_id).update(
+                status=IssueCreationJob.RUNNING,
+                attempts=F('attempts') + 1,
+                locked_at=now,
+                updated_at=now,
+            )
+
+            if claimed:
+                return IssueCreationJob.objects.get(id=job_id)
+
+        return None
+
+    def complete(self, job: IssueCreationJob, issue: Issue):
+        job.status = IssueCreationJob.DONE
+        job.issue = issue
+        job.locked_at = None
+        job.last_error = ''
+        job.save()
+
+    def fail(self, job: IssueCreationJob, error: Exception, permanent: bool = False):
+        job.attempts += 1
+        job.locked_at = None
+        job.last_error = f'{type(error).__name__}: {error}'
+
+        if permanent or job.attempts >= self.max_attempts:
+            job.status = IssueCreationJob.FAILED
+        else:
+            job.status = IssueCreationJob.PENDING
+            job.run_after = timezone.now() + timedelta(seconds=self.backoff_seconds * 2 ** (job.attempts - 1))
+
+        job.save()
+
+
+class IssueJobWorker:
+    def __init__(self, queue: IssueJobQueue = None, github: GithubClient = None, concurrency: int = 1,
+                 poll_interval: float = 1.0):
+        self.queue = queue or IssueJobQueue()
+        self.github = github or get_github_client()
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self._stopped = threading.Event()
+
+    def process(self, job: IssueCreationJob):
+        issue_to_be_created = IssueToBeCreated(job.url)
+
+        try:
+            issue = CreateIssueService().create_issue(self.github, issue_to_be_created)
+        except IssueAlreadyExists:
+            self.queue.complete(job, Issue.objects.get(
+                repository__owner__owner=job.owner,
+                repository__name=job.repository,
+                number=job.number
+            ))
+        except IssueNotFoundException as e:
+            self.queue.fail(job, e, permanent=self._is_missing_on_github(e))
+        except Exception as e:
+            self.queue.fail(job, e)
+        else:
+            self.queue.complete(job, issue)
+
+    def run_until_empty(self) -> int:
+        processed = 0
+
+        while True:
+            job = self.queue.claim()
+
+            if job is None:
+                return processed
+
+            self.process(job)
+            processed += 1
+
+    def run_forever(self):
+        if self.concurrency == 1:
+            return self._poll()
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            futures = [executor.submit(self._poll) for _ in range(self.concurrency)]
+
+            try:
+                # A thread that dies stops the others and its error ends the process, so the dyno is restarted
+                # instead of sitting idle.
+                for future in as_completed(futures):
+                    future.result()
+            finally:
+                self.stop()
+
+    def stop(self):
+        self._stopped.set()
+
+    def _poll(self):
+        try:
+            while not self._stopped.is_set():
+                if not self.run_until_empty():
+                    time.sleep(self.poll_interval)
+        finally:
+            connection.close()
+
+    @staticmethod
+    def _is_missing_on_github(error: IssueNotFoundException) -> bool:
+        cause = error.__context__
+        return isinstance(cause, GithubRequestException) and cause.status == 404
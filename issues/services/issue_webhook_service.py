@@ -0,0 +1,219 @@
+import atexit
+import hashlib
+import hmac
+import threading
+import uuid
+from collections import Counter
+from functools import reduce
+from operator import or_
+from typing import List, Optional
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from issues.models import Issue, PendingIssueEvent, Repository
+from issues.services.sync_issues_service import invalidate_search, write_github_issues
+
+SIGNATURE_PREFIX = 'sha256='
+ISSUE_ACTIONS = {'opened', 'edited', 'closed', 'reopened'}
+
+
+def sign(secret: str, body: bytes) -> str:
+    return SIGNATURE_PREFIX + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+def verify_signature(secret: str, body: bytes, signature: Optional[str]) -> bool:
+    if not secret or not signature:
+        return False
+
+    return hmac.compare_digest(sign(secret, body), signature)
+
+
+class IssueEvent:
+    def __init__(self, owner: str, repository: str, number: int, github_issue: dict):
+        self.owner = owner
+        self.repository = repository
+        self.number = number
+        self.github_issue = github_issue
+
+    @property
+    def key(self):
+        return self.owner, self.repository, self.number
+
+    @property
+    def updated_at(self) -> str:
+        return self.github_issue.get('updated_at') or ''
+
+    @classmethod
+    def from_payload(cls, payload: dict) -> Optional['IssueEvent']:
+        issue = payload.get('issue') or {}
+
+        if payload.get('action') not in ISSUE_ACTIONS or 'pull_request' in issue:
+            return None
+
+        return cls(
+            owner=payload['repository']['owner']['login'],
+            repository=payload['repository']['name'],
+            number=issue['number'],
+            github_issue=issue,
+        )
+
+
+def merge_pending_issue_events(stats: Counter = None) -> int:
+    stats = Counter() if stats is None else stats
+    batch = uuid.uuid4().hex
+
+    with transaction.atomic():
+        # Claimed first like the pending votes, so two processes merging at the same time never apply an event twice.
+        if not PendingIssueEvent.objects.filter(batch__isnull=True).update(batch=batch):
+            return 0
+
+        events = {}
+
+        for pending in PendingIssueEvent.objects.filter(batch=batch).order_by('id'):
+            event = IssueEvent(pending.owner, pending.repository, pending.number, pending.github_issue)
+            current = events.get(event.key)
+
+            # A burst usually carries several events for one issue; only the latest one is written.
+            if current is not None:
+                stats['coalesced'] += 1
+
+            if current is None or current.updated_at <= event.updated_at:
+                events[event.key] = event
+
+        changed = _write(list(events.values()), stats)
+        PendingIssueEvent.objects.filter(batch=batch).delete()
+
+    if changed:
+        invalidate_search(changed)
+
+    return len(changed)
+
+
+def _write(events: List[IssueEvent], stats: Counter) -> List[Issue]:
+    repositories = dict(
+        ((owner, name), repository_id)
+        for repository_id, owner, name in Repository.objects.filter(reduce(or_, [
+            Q(owner_id=owner, name=name) for owner, name in {(event.owner, event.repository) for event in events}
+        ])).values_list('id', 'owner_id', 'name')
+    )
+
+    events_by_issue = {
+        (repositories[(event.owner, event.repository)], event.number): event
+        for event in events
+        if (event.owner, event.repository) in repositories
+    }
+
+    stats['dropped'] += len(events) - len(events_by_issue)
+
+    if not events_by_issue:
+        return []
+
+    numbers_by_repository = {}
+    for repository_id, number in events_by_issue:
+        numbers_by_repository.setdefault(repository_id, []).append(number)
+
+    changed = write_github_issues(
+        (
+            (issue, events_by_issue[(issue.repository_id, issue.number)].github_issue)
+            for issue in Issue.objects.filter(reduce(or_, [
+                Q(repository_id=repository_id, number__in=numbers)
+                for repository_id, numbers in numbers_by_repository.items()
+            ]))
+        ),
+        timezone.now()
+    )
+
+    stats['updated'] += len(changed)
+    return changed
+
+
+class IssueEventBuffer:
+    # Every delivery is stored in PendingIssueEvent before the webhook answers, so an acknowledged event survives
+    # a restart or a failed flush. The events are merged once batch_size of them came through this process or
+    # flush_seconds after the first one, and the leftovers by whichever process merges next.
+    def __init__(self, batch_size: int = None, flush_seconds: float = None):
+        self.batch_size = batch_size or settings.ISSUE_WEBHOOK_BATCH_SIZE
+        self.flush_seconds = settings.ISSUE_WEBHOOK_FLUSH_SECONDS if flush_seconds is None else flush_seconds
+        self.stats = Counter()
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._timer = None
+
+    def add(self, event: IssueEvent) -> bool:
+        # Events of repositories outside the catalog are dropped before anything is stored, through the unique
+        # (owner, name) index, so no one's hook can grow the table.
+        if not Repository.objects.filter(owner_id=event.owner, name=event.repository).exists():
+            with self._lock:
+                self.stats['dropped'] += 1
+
+            return False
+
+        PendingIssueEvent.objects.create(
+            owner=event.owner, repository=event.repository, number=event.number, github_issue=event.github_issue
+        )
+
+        with self._lock:
+            self.stats['received'] += 1
+            self._pending += 1
+            due = self._pending >= self.batch_size
+
+            if due:
+                self._take()
+            elif self._timer is None and self.flush_seconds:
+                self._timer = threading.Timer(self.flush_seconds, self._flush_in_background)
+                self._timer.daemon = True
+                self._timer.start()
+
+        if due:
+            self._merge()
+
+        return True
+
+    def flush(self) -> int:
+        with self._lock:
+            self._take()
+
+        return self._merge()
+
+    def close(self):
+        # Run at exit, so a worker only merges when events came through it since its last merge.
+        with self._lock:
+            pending = self._pending
+
+        if pending:
+            self.flush()
+
+    def _take(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        self._pending = 0
+
+    def _merge(self) -> int:
+        self.stats['flushes'] += 1
+        return merge_pending_issue_events(self.stats)
+
+    def _flush_in_background(self):
+        try:
+            self.flush()
+        finally:
+            connection.close()
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_issue_event_buffer() -> IssueEventBuffer:
+    global _buffer
+
+    with _buffer_lock:
+        if _buffer is None:
+            _buffer = IssueEventBuffer()
+            atexit.register(_buffer.close)
+
+    return _buffer
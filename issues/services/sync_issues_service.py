@@ -0,0 +1,162 @@
+import time
+from datetime import timedelta
+from typing import Callable, List
+
+from django.db import transaction
+from django.utils import timezone
+
+from issues.models import Issue, Repository
+from issues.services.github_client import GithubClient, GithubRequestException, parse_github_datetime
+from triage.cache import SearchResultsCache
+from triage.facets import FacetCounts
+
+# GitHub compares `since` with second precision, so overlap a little with the previous run.
+SINCE_OVERLAP = timedelta(minutes=1)
+SYNCED_FIELDS = ['name', 'body', 'body_html', 'body_html_version', 'state', 'updated_at', 'github_updated_at']
+
+
+def is_outdated(issue: Issue, github_issue: dict) -> bool:
+    # Deliveries and listings can come out of order, one older than the version applied last is ignored.
+    github_updated_at = parse_github_datetime(github_issue.get('updated_at'))
+    return None not in (github_updated_at, issue.github_updated_at) and github_updated_at < issue.github_updated_at
+
+
+def apply_github_issue(issue: Issue, github_issue: dict, updated_at, facets: FacetCounts) -> bool:
+    title, body, state = github_issue['title'], github_issue['body'] or '', github_issue['state']
+    issue.github_updated_at = parse_github_datetime(github_issue.get('updated_at')) or issue.github_updated_at
+
+    if (issue.name, issue.body, issue.state) == (title, body, state):
+        return False
+
+    if issue.state != state:
+        facets.add(issue.main_language_id, issue.current_rate_level,
+                   (state == Issue.OPEN) - (issue.state == Issue.OPEN))
+
+    if issue.body != body:
+        issue.body = body
+        issue.render_body()
+
+    issue.name = title
+    issue.state = state
+    issue.updated_at = updated_at
+    return True
+
+
+def write_github_issues(pairs, updated_at, batch_size: int = None) -> List[Issue]:
+    # Applies each GitHub payload to its issue and writes them, returns the issues whose shown fields changed.
+    facets = FacetCounts()
+    changed = []
+    seen = []
+
+    for issue, github_issue in pairs:
+        if is_outdated(issue, github_issue):
+            continue
+
+        github_updated_at = issue.github_updated_at
+
+        if apply_github_issue(issue, github_issue, updated_at, facets):
+            changed.append(issue)
+        elif issue.github_updated_at != github_updated_at:
+            seen.append(issue)
+
+    if changed:
+        Issue.objects.bulk_update(changed, SYNCED_FIELDS, batch_size=batch_size)
+        facets.save()
+
+    if seen:
+        # Only GitHub's version moved, the pages showing these issues did not change.
+        Issue.objects.bulk_update(seen, ['github_updated_at'], batch_size=batch_size)
+
+    return changed
+
+
+def invalidate_search(issues: List[Issue]):
+    search_cache = SearchResultsCache()
+
+    for language_id in {issue.main_language_id for issue in issues}:
+        rates = {issue.current_rate_level for issue in issues if issue.main_language_id == language_id}
+        search_cache.invalidate_issue(language_id, *rates)
+
+
+class SyncReport:
+    def __init__(self):
+        self.repositories = 0
+        self.scanned = 0
+        self.updated = 0
+        self.failed = 0
+        self.started_at = time.monotonic()
+        self.finished_at = None
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+
+class SyncIssuesService:
+    def __init__(self, github: GithubClient, batch_size: int = 500,
+                 on_error: Callable[[Repository, Exception], None] = None):
+        self.github = github
+        self.batch_size = batch_size
+        self.on_error = on_error or (lambda repository, error: None)
+
+    def sync(self, repositories=None) -> SyncReport:
+        report = SyncReport()
+        repositories = (Repository.objects.all() if repositories is None else repositories).select_related('owner').order_by('pk')
+        last_pk = 0
+
+        while True:
+            batch = list(repositories.filter(pk__gt=last_pk)[:self.batch_size])
+
+            if not batch:
+                break
+
+            for repository in batch:
+                self._sync_repository(repository, report)
+
+            last_pk = batch[-1].pk
+
+        report.finished_at = time.monotonic()
+        return report
+
+    def _sync_repository(self, repository: Repository, report: SyncReport):
+        started_at = timezone.now()
+
+        try:
+            github_issues = {
+                github_issue['number']: github_issue
+                for github_issue in self.github.list_repository_issues(
+                    repository.owner.owner, repository.name, self._since(repository)
+                )
+            }
+        except GithubRequestException as e:
+            report.failed += 1
+            self.on_error(repository, e)
+            return
+
+        report.repositories += 1
+        report.scanned += len(github_issues)
+        report.updated += self._write(repository, github_issues, started_at)
+
+    @transaction.atomic
+    def _write(self, repository: Repository, github_issues: dict, synced_at) -> int:
+        # Stamped with the write time, synced_at is taken before the listing and a vote may have come in since.
+        changed = write_github_issues(
+            ((issue, github_issues[issue.number])
+             for issue in Issue.objects.filter(repository=repository, number__in=github_issues.keys())),
+            timezone.now(),
+            self.batch_size
+        )
+
+        if changed:
+            invalidate_search(changed)
+
+        Repository.objects.filter(pk=repository.pk).update(synced_at=synced_at)
+        return len(changed)
+
+    @staticmethod
+    def _since(repository: Repository):
+        # The first sync lists every issue, one closed on GitHub before we added it was last updated before then.
+        if repository.synced_at is None:
+            return None
+
+        return repository.synced_at - SINCE_OVERLAP
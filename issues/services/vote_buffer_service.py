@@ -0,0 +1,138 @@
+import atexit
+import threading
+import uuid
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from issues.models import AGGREGATE_RATE_FIELDS, Issue, IssueRateRel, PendingVote
+from triage.cache import SearchResultsCache
+from triage.facets import FacetCounts
+from triage.lookups import rates
+
+
+def merge_pending_votes() -> int:
+    batch = uuid.uuid4().hex
+    previous_rate_levels = {}
+
+    with transaction.atomic():
+        # Claiming the rows first means two processes merging at the same time never count a vote twice.
+        claimed = PendingVote.objects.filter(batch__isnull=True).update(batch=batch)
+
+        if not claimed:
+            return 0
+
+        votes = defaultdict(Counter)
+        for issue_id, rate_number in PendingVote.objects.filter(batch=batch).values_list('issue_id', 'rate'):
+            votes[issue_id][rate_number] += 1
+
+        # Issues are always updated in the same order, so concurrent merges cannot deadlock on them.
+        for issue_id, issue_votes in sorted(votes.items()):
+            Issue.objects.filter(pk=issue_id).update(**Issue.votes_update(issue_votes))
+
+        facets = FacetCounts()
+        issues = list(Issue.objects.filter(pk__in=votes.keys()).only(
+            *AGGREGATE_RATE_FIELDS, 'current_rate_level', 'state', 'main_language'
+        ))
+
+        for issue in issues:
+            previous_rate_levels[issue.pk] = issue.refresh_current_rate(facets)
+
+        Issue.objects.bulk_update(issues, ['current_rate', 'current_rate_level', 'updated_at'])
+
+        rate_rows = {level: rates.get_or_create(level) for issue_votes in votes.values() for level in issue_votes}
+        IssueRateRel.objects.bulk_create([
+            IssueRateRel(issue_id=issue_id, rate=rate_rows[level])
+            for issue_id, issue_votes in votes.items()
+            for level, count in issue_votes.items()
+            for _ in range(count)
+        ])
+        PendingVote.objects.filter(batch=batch).delete()
+        facets.save()
+
+    search_cache = SearchResultsCache()
+    for issue in issues:
+        search_cache.invalidate_issue(issue.main_language_id, previous_rate_levels[issue.pk], issue.current_rate_level)
+
+    return claimed
+
+
+class VoteBuffer:
+    # Votes are appended to PendingVote, which only inserts, instead of every vote updating the issue row.
+    # They are merged once batch_size votes came through this process or flush_seconds after the first one.
+    # The pending rows survive a restart and are merged by whichever process merges next.
+    def __init__(self, batch_size: int = None, flush_seconds: float = None):
+        self.batch_size = batch_size or settings.RATE_BUFFER_BATCH_SIZE
+        self.flush_seconds = settings.RATE_BUFFER_FLUSH_SECONDS if flush_seconds is None else flush_seconds
+        self.stats = Counter()
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._timer = None
+
+    def add(self, issue: Issue, rate_number: int):
+        Issue.rate_votes_field(rate_number)
+        PendingVote.objects.create(issue=issue, rate=rate_number)
+
+        with self._lock:
+            self.stats['received'] += 1
+            self._pending += 1
+            due = self._pending >= self.batch_size
+
+            if due:
+                self._take()
+            elif self._timer is None and self.flush_seconds:
+                self._timer = threading.Timer(self.flush_seconds, self._flush_in_background)
+                self._timer.daemon = True
+                self._timer.start()
+
+        if due:
+            self._merge()
+
+    def flush(self) -> int:
+        with self._lock:
+            self._take()
+
+        return self._merge()
+
+    def close(self):
+        # Run at exit, so a worker only merges when votes came through it since its last merge.
+        with self._lock:
+            pending = self._pending
+
+        if pending:
+            self.flush()
+
+    def _take(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        self._pending = 0
+
+    def _merge(self) -> int:
+        merged = merge_pending_votes()
+        self.stats['merges'] += 1
+        self.stats['merged'] += merged
+        return merged
+
+    def _flush_in_background(self):
+        try:
+            self.flush()
+        finally:
+            connection.close()
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_vote_buffer() -> VoteBuffer:
+    global _buffer
+
+    with _buffer_lock:
+        if _buffer is None:
+            _buffer = VoteBuffer()
+            atexit.register(_buffer.close)
+
+    return _buffer
@@ -0,0 +1,156 @@
+from datetime import timedelta, timezone as dt_timezone
+from functools import wraps
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.db.models import Max
+from django.urls import reverse
+from django.utils import timezone
+
+from issues.models import Issue, SitemapSection
+
+SITEMAP_CACHE = 'sitemaps'
+REFRESH_LOCK_KEY = 'sitemap-refresh'
+SITEMAP_NAMESPACE = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+CHUNK_SIZE = 1000
+
+
+def section_of(issue_id: int) -> int:
+    return issue_id // settings.SITEMAP_SECTION_SIZE
+
+
+def sitemap_base_url() -> str:
+    if not settings.SITEMAP_BASE_URL:
+        raise ImproperlyConfigured('Set SITEMAP_BASE_URL to the public URL of the site, e.g. https://iwannacontrib.com')
+
+    return settings.SITEMAP_BASE_URL.rstrip('/')
+
+
+def w3c_datetime(value) -> str:
+    return value.astimezone(dt_timezone.utc).strftime('%Y-%m-%dT%H:%M:%S+00:00')
+
+
+@transaction.atomic
+def refresh_sections(rebuild: bool = False) -> int:
+    if rebuild:
+        SitemapSection.objects.all().delete()
+
+    # Only the issues changed since the newest section lastmod are read, through the freshness index.
+    # The first build walks the whole table in key order instead.
+    now = timezone.now()
+    watermark = SitemapSection.objects.aggregate(lastmod=Max('lastmod'))['lastmod']
+
+    if watermark is None:
+        issues = Issue.objects.order_by('id')
+    else:
+        # updated_at is stamped before the write commits, so a slow transaction can commit a row stamped behind the
+        # watermark after the refresh that set it. The rows of a window behind the watermark are read again.
+        since = watermark - timedelta(seconds=settings.SITEMAP_REFRESH_WINDOW_SECONDS)
+        issues = Issue.objects.filter(updated_at__gte=since).order_by('-updated_at')
+
+    lastmods = {}
+    behind_watermark = set()
+
+    for issue_id, updated_at in issues.values_list('id', 'updated_at').iterator(chunk_size=CHUNK_SIZE):
+        number = section_of(issue_id)
+
+        if number not in lastmods or lastmods[number] < updated_at:
+            lastmods[number] = updated_at
+
+        if watermark is not None and updated_at < watermark:
+            behind_watermark.add(number)
+
+    sections = SitemapSection.objects.in_bulk(lastmods.keys())
+    created = [SitemapSection(number=number, lastmod=lastmod)
+               for number, lastmod in lastmods.items() if number not in sections]
+    updated = []
+
+    for number, section in sections.items():
+        if section.lastmod < lastmods[number]:
+            section.lastmod = lastmods[number]
+        elif number in behind_watermark:
+            # The section may have been rendered before one of these rows committed, a new lastmod renders it again.
+            section.lastmod = now
+        else:
+            continue
+
+        updated.append(section)
+
+    SitemapSection.objects.bulk_create(created)
+    SitemapSection.objects.bulk_update(updated, ['lastmod'])
+
+    return len(created) + len(updated)
+
+
+def refresh_sections_if_due():
+    if caches[SITEMAP_CACHE].add(REFRESH_LOCK_KEY, True, settings.SITEMAP_REFRESH_SECONDS):
+        refresh_sections()
+
+
+def refreshes_sitemap(view):
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        refresh_sections_if_due()
+        return view(request, *args, **kwargs)
+
+    return wrapper
+
+
+def index_lastmod():
+    return SitemapSection.objects.aggregate(lastmod=Max('lastmod'))['lastmod']
+
+
+def section_lastmod(number: int):
+    return SitemapSection.objects.filter(number=number).values_list('lastmod', flat=True).first()
+
+
+def cached_xml(key: str, render):
+    # Rendered chunks are streamed to the first client and kept, so the next ones get the whole document at once.
+    cache = caches[SITEMAP_CACHE]
+    xml = cache.get(key)
+
+    if xml is not None:
+        yield xml
+        return
+
+    chunks = []
+
+    for chunk in render():
+        chunks.append(chunk)
+        yield chunk
+
+    cache.set(key, ''.join(chunks), settings.SITEMAP_CACHE_SECONDS)
+
+
+def render_index(base_url: str):
+    yield f'<?xml version="1.0" encoding="UTF-8"?>\n<sitemapindex xmlns="{SITEMAP_NAMESPACE}">\n'
+
+    sections = SitemapSection.objects.order_by('number').values_list('number', 'lastmod')
+
+    for number, lastmod in sections.iterator(chunk_size=CHUNK_SIZE):
+        location = escape(base_url + reverse('sitemap_section', kwargs={'number': number}))
+        yield f'<sitemap><loc>{location}</loc><lastmod>{w3c_datetime(lastmod)}</lastmod></sitemap>\n'
+
+    yield '</sitemapindex>\n'
+
+
+def render_section(base_url: str, number: int):
+    yield f'<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="{SITEMAP_NAMESPACE}">\n'
+
+    size = settings.SITEMAP_SECTION_SIZE
+    issues = Issue.objects.filter(id__gte=number * size, id__lt=(number + 1) * size).order_by('id').values_list(
+        'repository__owner_id', 'repository__name', 'number', 'updated_at'
+    )
+
+    for owner, repository, issue_number, updated_at in issues.iterator(chunk_size=CHUNK_SIZE):
+        location = escape(base_url + reverse('issues:show', kwargs={
+            'owner': owner,
+            'repository': repository,
+            'number': issue_number,
+        }))
+        yield f'<url><loc>{location}</loc><lastmod>{w3c_datetime(updated_at)}</lastmod></url>\n'
+
+    yield '</urlset>\n'
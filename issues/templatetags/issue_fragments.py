@@ -0,0 +1,8 @@
+from django import template
+
+from issues.fragments import render_issue_title, render_issue_titles
+
+register = template.Library()
+
+register.filter('issue_titles', render_issue_titles)
+register.simple_tag(render_issue_title, name='issue_title')
@@ -1,13 +1,52 @@
+import importlib
+import io
+import json
+import os
+import re
+import tempfile
+import time
 import unittest
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone as dt_timezone
+from unittest import mock
 
-from django.test import TestCase
-from github import Github
+from django.apps import apps as django_apps
+from django.core.cache import caches
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import OperationalError, connection, connections
+from django.db.models import Min
+from django.test import Client, TestCase, TransactionTestCase, LiveServerTestCase, override_settings
+from django.utils import timezone
 
 from issues.forms import CreateIssueForm
-from issues.models import Issue, Repository, Owner
+from issues.fragments import FRAGMENTS_CACHE, issue_title_key, render_issue_titles
+from issues.models import Issue, Repository, Owner, IssueRateRel, IssueCreationJob, SitemapSection, PendingVote, \
+    PendingIssueEvent
+from issues.rendering import RENDERER_VERSION
+from issues.sitemaps import SITEMAP_CACHE, refresh_sections
 from issues.services.create_issue_service import IssueToBeCreated, InvalidGithubUrlException, CreateIssueService, \
     IssueNotFoundException, IssueAlreadyExists
-from triage.models import ProgrammingLanguage
+from issues.services.github_client import GithubClient, GithubMetrics, GithubRequestException
+from issues.services.issue_job_queue import LEASE_EXPIRED_ERROR, IssueJobQueue, IssueJobWorker
+from issues.services.issue_webhook_service import IssueEventBuffer, sign
+from issues.services.sync_issues_service import SyncIssuesService
+from issues.services.vote_buffer_service import VoteBuffer, merge_pending_votes
+from issues.testing.test_fixture import IssueFixture
+from iwannacontrib.metrics import ProcessSnapshots
+from iwannacontrib.profiling import profiling_token
+from iwannacontrib.replicas import PRIMARY_UNTIL_COOKIE, copy_sqlite_database
+from testing.benchmark import BenchmarkSuite, ScenarioResult, seed_catalog, find_regressions
+from testing.catalog import CatalogGenerator
+from testing.fake_github import FakeGithub
+from testing.query_budget import QueryBudgetTestCase
+from triage.cache import SEARCH_RESULTS_CACHE
+from triage.facets import reconcile_facet_counts
+from triage.lookups import languages
+from triage.models import ProgrammingLanguage, IssueRate, IssueFacetCount, NOT_RATED
 
 
 class IssueToBeCreatedTestCase(unittest.TestCase):
@@ -62,7 +101,7 @@ class IssueToBeCreatedTestCase(unittest.TestCase):
 
 class CreateIssueServiceIntegrationTest(TestCase):
     def setUp(self) -> None:
-        self.github = Github()
+        self.github = GithubClient()
 
     def test_it_creates_an_issue(self) -> None:
         issue_to_be_created = IssueToBeCreated("https://github.com/carlosmaniero/iwannacontrib-issues-test"
@@ -77,6 +116,8 @@ class CreateIssueServiceIntegrationTest(TestCase):
         self.assertEquals(issue.repository.name, "iwannacontrib-issues-test-integration-test")
         self.assertEquals(issue.repository.owner.owner, "carlosmaniero")
         self.assertEquals(issue.main_language.name, "Python")
+        self.assertEquals(issue.body_html, "<p>This issue is used at project integration tests.</p>")
+        self.assertEquals(issue.body_html_version, RENDERER_VERSION)
 
     def test_is_saves_the_issue(self) -> None:
         issue_to_be_created = IssueToBeCreated("https://github.com/carlosmaniero/iwannacontrib-issues-test"
@@ -195,3 +236,1319 @@ class IssueModel(TestCase):
         self.issue.rate(5)
         self.issue.rate(4)
         self.assertEquals(self.issue.rate_label, 'Very Hard')
+
+
+class ShowIssueQueryBudget(QueryBudgetTestCase):
+    SHOW_ISSUE_QUERY_BUDGET = 2
+
+    def test_show_issue_fits_the_query_budget(self):
+        issue = IssueFixture().add()
+        issue.rate(3)
+        issue.save()
+
+        with self.assertQueryBudget(self.SHOW_ISSUE_QUERY_BUDGET):
+            response = self.client.get(issue.get_url())
+
+        self.assertContains(response, 'Medium')
+
+
+class IssueRateAggregates(TestCase):
+    def setUp(self) -> None:
+        self.issue = IssueFixture().add()
+
+    def test_it_keeps_the_running_sum_count_and_histogram(self):
+        for rate_number in [5, 5, 4, 1]:
+            self.issue.rate(rate_number)
+
+        issue = Issue.objects.get(id=self.issue.id)
+
+        self.assertEquals(issue.rate_sum, 15)
+        self.assertEquals(issue.rate_votes, 4)
+        self.assertEquals(issue.rate_histogram, {1: 1, 2: 0, 3: 0, 4: 1, 5: 2})
+        self.assertEquals(issue.rate_label, 'Hard')
+
+    def test_the_rate_view_rejects_unknown_rates(self):
+        for data in [{'rate': 6}, {'rate': 'hard'}, {}]:
+            self.assertEquals(self.client.post(self.issue.get_rate_url(), data).status_code, 400)
+
+        self.assertEquals(Issue.objects.get(id=self.issue.id).rate_votes, 0)
+
+    def test_it_persists_the_current_rate_without_saving_the_issue(self):
+        self.issue.rate(2)
+
+        self.assertEquals(Issue.objects.get(id=self.issue.id).rate_label, 'Easy')
+
+    def test_it_does_not_read_previous_votes(self):
+        for i in range(10):
+            self.issue.rate(3)
+
+        with self.assertNumQueries(8):
+            self.issue.rate(3)
+
+    def test_it_rejects_unknown_levels(self):
+        with self.assertRaises(ValueError):
+            self.issue.rate(6)
+
+        self.assertEquals(Issue.objects.get(id=self.issue.id).rate_votes, 0)
+
+    def test_backfill_migration_rebuilds_the_aggregates_from_the_votes(self):
+        backfill = importlib.import_module('issues.migrations.0004_backfill_issue_rate_aggregates')
+
+        for rate_number in [1, 2, 2, 5]:
+            IssueRateRel.objects.create(issue=self.issue, rate=IssueRate.objects.get_or_create(rate=rate_number)[0])
+
+        backfill.backfill_rate_aggregates(django_apps, None)
+
+        issue = Issue.objects.get(id=self.issue.id)
+        self.assertEquals(issue.rate_sum, 10)
+        self.assertEquals(issue.rate_votes, 4)
+        self.assertEquals(issue.rate_histogram, {1: 1, 2: 2, 3: 0, 4: 0, 5: 1})
+
+
+class VoteBufferTest(TestCase):
+    def setUp(self) -> None:
+        self.issue = IssueFixture().add()
+        self.buffer = VoteBuffer(batch_size=3, flush_seconds=0)
+
+    def test_votes_are_not_applied_until_merged(self):
+        self.buffer.add(self.issue, 5)
+        self.buffer.add(self.issue, 4)
+
+        issue = Issue.objects.get(id=self.issue.id)
+        self.assertEquals(issue.rate_votes, 0)
+        self.assertEquals(issue.rate_label, 'Not rated yet')
+        self.assertEquals(PendingVote.objects.count(), 2)
+
+    def test_merging_applies_the_votes_as_one_update(self):
+        for rate_number in [5, 5]:
+            self.buffer.add(self.issue, rate_number)
+
+        self.assertEquals(self.buffer.flush(), 2)
+
+        issue = Issue.objects.get(id=self.issue.id)
+        self.assertEquals(issue.rate_sum, 10)
+        self.assertEquals(issue.rate_votes, 2)
+        self.assertEquals(issue.rate_histogram, {1: 0, 2: 0, 3: 0, 4: 0, 5: 2})
+        self.assertEquals(issue.rate_label, 'Very Hard')
+        self.assertEquals(IssueRateRel.objects.filter(issue=issue).count(), 2)
+        self.assertEquals(PendingVote.objects.count(), 0)
+        self.assertEquals(
+            IssueFacetCount.objects.get(language=issue.main_language, rate_level=5).count, 1
+        )
+
+    def test_it_merges_once_the_batch_is_full(self):
+        for rate_number in [1, 2, 3]:
+            self.buffer.add(self.issue, rate_number)
+
+        self.assertEquals(Issue.objects.get(id=self.issue.id).rate_label, 'Easy')
+        self.assertEquals(self.buffer.stats['merges'], 1)
+
+    def test_votes_left_by_a_stopped_worker_are_merged_by_the_next_one(self):
+        PendingVote.objects.create(issue=self.issue, rate=1)
+
+        self.assertEquals(VoteBuffer(flush_seconds=0).flush(), 1)
+        self.assertEquals(Issue.objects.get(id=self.issue.id).rate_votes, 1)
+
+    def test_votes_claimed_by_another_merge_are_not_counted_twice(self):
+        PendingVote.objects.create(issue=self.issue, rate=1, batch='another-merge')
+        PendingVote.objects.create(issue=self.issue, rate=3)
+
+        self.assertEquals(merge_pending_votes(), 1)
+        self.assertEquals(Issue.objects.get(id=self.issue.id).rate_sum, 3)
+
+    def test_it_rejects_unknown_levels(self):
+        with self.assertRaises(ValueError):
+            self.buffer.add(self.issue, 6)
+
+        self.assertEquals(PendingVote.objects.count(), 0)
+
+    @override_settings(RATE_BUFFER_ENABLED=True)
+    def test_the_rate_view_appends_to_the_buffer(self):
+        with mock.patch('issues.views.get_vote_buffer', return_value=self.buffer):
+            response = self.client.post(self.issue.get_rate_url(), {'rate': 2})
+
+        self.assertRedirects(response, self.issue.get_url(), fetch_redirect_response=False)
+        self.assertEquals(PendingVote.objects.get().rate, 2)
+        self.assertEquals(Issue.objects.get(id=self.issue.id).rate_votes, 0)
+
+
+class LoadTestVotesCommandTest(TransactionTestCase):
+    def test_it_reports_the_throughput_of_both_modes(self):
+        stdout = io.StringIO()
+        call_command('load_test_votes', votes=4, concurrency=1, stdout=stdout)
+
+        self.assertRegex(stdout.getvalue(), r'direct +4 votes .* 4 counted')
+        self.assertRegex(stdout.getvalue(), r'buffered +4 votes .* 4 counted')
+        self.assertFalse(Owner.objects.exists())
+
+    def test_it_leaves_the_configured_database_alone(self):
+        issue = IssueFixture().add()
+        PendingVote.objects.create(issue=issue, rate=3)
+
+        call_command('load_test_votes', votes=2, concurrency=1, stdout=io.StringIO())
+
+        issue.refresh_from_db()
+        self.assertEquals(issue.rate_votes, 0)
+        self.assertEquals(PendingVote.objects.count(), 1)
+        self.assertFalse(Repository.objects.filter(owner_id='vote-load-test').exists())
+
+
+class IssueConcurrentRating(TransactionTestCase):
+    VOTERS = 8
+    VOTES_PER_VOTER = 5
+
+    def test_parallel_votes_are_not_lost(self):
+        issue = IssueFixture().add()
+        IssueRate.objects.get_or_create(rate=2)
+        IssueRate.objects.get_or_create(rate=3)
+        IssueRate.objects.get_or_create(rate=4)
+
+        def vote(rate_number):
+            try:
+                voter_issue = Issue.objects.get(id=issue.id)
+                for i in range(self.VOTES_PER_VOTER):
+                    voter_issue.rate(rate_number)
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=self.VOTERS) as executor:
+            list(executor.map(vote, [2, 4] * (self.VOTERS // 2)))
+
+        issue = Issue.objects.get(id=issue.id)
+        total_votes = self.VOTERS * self.VOTES_PER_VOTER
+
+        self.assertEquals(issue.rate_votes, total_votes)
+        self.assertEquals(issue.rate_sum, 3 * total_votes)
+        self.assertEquals(issue.rate_histogram, {1: 0, 2: total_votes // 2, 3: 0, 4: total_votes // 2, 5: 0})
+        self.assertEquals(issue.rates.count(), total_votes)
+        self.assertEquals(issue.rate_label, 'Medium')
+
+
+class IssueBodyRendering(TestCase):
+    def test_it_renders_the_stored_html_without_running_markdown(self):
+        issue = IssueFixture().add(body='# Title')
+        issue.render_body()
+        issue.save()
+
+        with mock.patch('issues.models.render_markdown') as render_markdown:
+            response = self.client.get(issue.get_url())
+
+        render_markdown.assert_not_called()
+        self.assertContains(response, '<h1>Title</h1>')
+
+    def test_it_renders_stale_html_on_the_fly(self):
+        issue = IssueFixture().add(body='# Title', body_html='<p>old</p>', body_html_version='0:old')
+
+        self.assertEquals(issue.html, '<h1>Title</h1>')
+
+    def test_command_re_renders_stale_issues_in_batches(self):
+        fixture = IssueFixture()
+        stale_issues = [fixture.add(body=f'`code {i}`', body_html_version='0:old') for i in range(5)]
+        fresh_issue = fixture.add(body='fresh')
+        fresh_issue.body_html = '<p>kept</p>'
+        fresh_issue.body_html_version = RENDERER_VERSION
+        fresh_issue.save()
+
+        call_command('render_issue_bodies', batch_size=2, workers=2, stdout=io.StringIO())
+
+        for issue in stale_issues:
+            issue.refresh_from_db()
+            self.assertEquals(issue.body_html_version, RENDERER_VERSION)
+            self.assertEquals(issue.body_html, f'<p><code>code {issue.body[6]}</code></p>')
+
+        fresh_issue.refresh_from_db()
+        self.assertEquals(fresh_issue.body_html, '<p>kept</p>')
+
+
+class ShowIssueConditionalGet(TestCase):
+    def setUp(self) -> None:
+        self.issue = IssueFixture().add()
+
+    def test_it_sends_strong_validators(self):
+        response = self.client.get(self.issue.get_url())
+
+        self.assertRegex(response['ETag'], '^"[0-9a-f]{40}"$')
+        self.assertIn('Last-Modified', response)
+
+    def test_it_returns_not_modified_after_a_single_query(self):
+        etag = self.client.get(self.issue.get_url())['ETag']
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.issue.get_url(), HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEquals(response.status_code, 304)
+        self.assertEquals(response.content, b'')
+
+    def test_it_returns_not_modified_given_last_modified(self):
+        last_modified = self.client.get(self.issue.get_url())['Last-Modified']
+
+        response = self.client.get(self.issue.get_url(), HTTP_IF_MODIFIED_SINCE=last_modified)
+
+        self.assertEquals(response.status_code, 304)
+
+    def test_rating_changes_the_validators(self):
+        etag = self.client.get(self.issue.get_url())['ETag']
+
+        self.issue.rate(2)
+        response = self.client.get(self.issue.get_url(), HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEquals(response.status_code, 200)
+        self.assertNotEquals(response['ETag'], etag)
+
+    def test_it_renders_the_page_given_pending_messages(self):
+        etag = self.client.get(self.issue.get_url())['ETag']
+
+        self.client.cookies['messages'] = 'pending'
+        response = self.client.get(self.issue.get_url(), HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEquals(response.status_code, 200)
+
+    def test_issue_updated_at_changes_when_rated(self):
+        updated_at = self.issue.updated_at
+
+        self.issue.rate(4)
+
+        self.assertGreater(Issue.objects.get(id=self.issue.id).updated_at, updated_at)
+
+
+class ImportIssuesCommandTest(TestCase):
+    def setUp(self) -> None:
+        self.github = FakeGithub().start()
+        self.github.add_issue('carlosmaniero', 'jigjs', 1, title='First', body='# First', languages={'TypeScript': 10})
+        self.github.add_issue('carlosmaniero', 'jigjs', 2, title='Second', languages={'TypeScript': 10})
+        self.github.add_issue('django', 'django', 3, title='Third', state='closed', languages={'Python': 10, 'C': 1})
+
+    def tearDown(self) -> None:
+        self.github.stop()
+
+    def test_it_imports_the_issues_of_a_file(self):
+        stdout, stderr = self.import_issues([
+            'https://github.com/carlosmaniero/jigjs/issues/1',
+            'https://github.com/carlosmaniero/jigjs/issues/2',
+            'https://github.com/django/django/issues/3',
+        ])
+
+        self.assertEquals(Issue.objects.count(), 3)
+        first = Issue.objects.get(number=1)
+        self.assertEquals(first.name, 'First')
+        self.assertEquals(first.html, '<h1>First</h1>')
+        self.assertEquals(first.main_language.name, 'TypeScript')
+        self.assertEquals(first.get_repository_name(), 'carlosmaniero/jigjs')
+        self.assertEquals(Issue.objects.get(number=3).state, 'closed')
+        self.assertEquals(Issue.objects.get(number=3).main_language.name, 'Python')
+        self.assertIn('Imported 3 issues', stdout)
+        self.assertIn('issues/s', stdout)
+        self.assertEquals(stderr, '')
+
+    def test_it_fetches_the_languages_once_per_repository(self):
+        self.import_issues([
+            'https://github.com/carlosmaniero/jigjs/issues/1',
+            'https://github.com/carlosmaniero/jigjs/issues/2',
+        ])
+
+        self.assertEquals(self.github.requests['/repos/carlosmaniero/jigjs/languages'], 1)
+
+    def test_it_reports_each_failed_url(self):
+        IssueFixture().add(
+            number=2,
+            repository=Repository.objects.create(name='jigjs', owner=Owner.objects.create(owner='carlosmaniero'))
+        )
+
+        stdout, stderr = self.import_issues([
+            'https://bitbucket.com/carlosmaniero/jigjs/issues/1',
+            'https://github.com/carlosmaniero/jigjs/issues/404',
+            'https://github.com/carlosmaniero/jigjs/issues/2',
+            'https://github.com/carlosmaniero/jigjs/issues/1',
+        ])
+
+        self.assertEquals(stderr.splitlines(), [
+            'InvalidGithubUrlException: https://bitbucket.com/carlosmaniero/jigjs/issues/1',
+            'IssueNotFoundException: https://github.com/carlosmaniero/jigjs/issues/404',
+            'IssueAlreadyExists: https://github.com/carlosmaniero/jigjs/issues/2',
+        ])
+        self.assertIn(
+            'Failed: 3 (InvalidGithubUrlException: 1, IssueAlreadyExists: 1, IssueNotFoundException: 1)',
+            stdout
+        )
+        self.assertEquals(Issue.objects.count(), 2)
+
+    def test_a_failed_language_lookup_is_retried_by_the_next_batch(self):
+        get_main_language = GithubClient.get_main_language
+        failed = []
+
+        def unavailable_once(client, owner, repository):
+            if repository == 'jigjs' and not failed:
+                failed.append(repository)
+                raise GithubRequestException(f'{owner}/{repository}', 502)
+
+            return get_main_language(client, owner, repository)
+
+        with mock.patch.object(GithubClient, 'get_main_language', autospec=True, side_effect=unavailable_once):
+            stdout, stderr = self.import_issues([
+                'https://github.com/carlosmaniero/jigjs/issues/1',
+                'https://github.com/django/django/issues/3',
+                'https://github.com/carlosmaniero/jigjs/issues/2',
+            ])
+
+        self.assertEquals(stderr.splitlines(),
+                          ['IssueNotFoundException: https://github.com/carlosmaniero/jigjs/issues/1'])
+        self.assertEquals(sorted(Issue.objects.values_list('number', flat=True)), [2, 3])
+
+    def test_it_resumes_from_the_saved_progress(self):
+        urls = [
+            'https://github.com/carlosmaniero/jigjs/issues/1',
+            'https://github.com/carlosmaniero/jigjs/issues/2',
+            'https://github.com/django/django/issues/3',
+        ]
+
+        with tempfile.TemporaryDirectory() as directory:
+            progress_file = os.path.join(directory, 'progress')
+
+            with open(progress_file, 'w') as progress:
+                progress.write('2')
+
+            stdout, stderr = self.import_issues(urls, progress_file=progress_file)
+
+            with open(progress_file) as progress:
+                self.assertEquals(progress.read(), '3')
+
+        self.assertEquals(list(Issue.objects.values_list('number', flat=True)), [3])
+
+    def test_it_reads_urls_from_stdin(self):
+        stdout = io.StringIO()
+
+        with mock.patch('sys.stdin', io.StringIO('https://github.com/django/django/issues/3\n')):
+            call_command('import_issues', '-', github_url=self.github.base_url, stdout=stdout, stderr=io.StringIO())
+
+        self.assertEquals(Issue.objects.get().name, 'Third')
+
+    def import_issues(self, urls, **options):
+        stdout = io.StringIO()
+        stderr = io.StringIO()
+
+        with tempfile.NamedTemporaryFile('w', suffix='.txt') as input_file:
+            input_file.write('\n'.join(urls))
+            input_file.flush()
+
+            call_command(
+                'import_issues',
+                input_file.name,
+                github_url=self.github.base_url,
+                workers=4,
+                batch_size=2,
+                stdout=stdout,
+                stderr=stderr,
+                **options
+            )
+
+        return stdout.getvalue(), stderr.getvalue()
+
+
+class GithubClientTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.github = FakeGithub().start()
+        self.github.add_issue('carlosmaniero', 'jigjs', 1, title='First', languages={'TypeScript': 10, 'CSS': 1})
+        self.client = self.github.client()
+
+    def tearDown(self) -> None:
+        self.github.stop()
+
+    def test_it_fetches_an_issue(self):
+        issue = self.client.get_issue('carlosmaniero', 'jigjs', 1)
+
+        self.assertEquals(issue['title'], 'First')
+        self.assertEquals(issue['number'], 1)
+
+    def test_it_raises_given_a_not_found_issue(self):
+        with self.assertRaises(GithubRequestException) as context:
+            self.client.get_issue('carlosmaniero', 'jigjs', 404)
+
+        self.assertEquals(context.exception.status, 404)
+
+    def test_it_revalidates_with_the_cached_etag(self):
+        self.client.get_issue('carlosmaniero', 'jigjs', 1)
+        issue = self.client.get_issue('carlosmaniero', 'jigjs', 1)
+
+        self.assertEquals(issue['title'], 'First')
+        self.assertEquals(self.github.not_modified, 1)
+        self.assertEquals(self.client.metrics.snapshot()['issue']['not_modified'], 1)
+        self.assertEquals(self.client.metrics.snapshot()['issue']['cache_hits'], 1)
+
+    def test_it_fetches_the_new_version_given_a_changed_issue(self):
+        self.client.get_issue('carlosmaniero', 'jigjs', 1)
+        self.github.add_issue('carlosmaniero', 'jigjs', 1, title='Renamed')
+
+        self.assertEquals(self.client.get_issue('carlosmaniero', 'jigjs', 1)['title'], 'Renamed')
+        self.assertEquals(self.github.not_modified, 0)
+
+    def test_it_caches_the_repository_languages(self):
+        self.assertEquals(self.client.get_main_language('carlosmaniero', 'jigjs'), 'TypeScript')
+        self.assertEquals(self.client.get_main_language('carlosmaniero', 'jigjs'), 'TypeScript')
+
+        self.assertEquals(self.github.requests['/repos/carlosmaniero/jigjs/languages'], 1)
+        self.assertEquals(self.client.metrics.snapshot()['languages']['cache_hits'], 1)
+
+    def test_it_fetches_the_languages_again_after_the_ttl(self):
+        client = self.github.client(languages_ttl=0.01)
+
+        client.get_languages('carlosmaniero', 'jigjs')
+        time.sleep(0.02)
+        client.get_languages('carlosmaniero', 'jigjs')
+
+        self.assertEquals(self.github.requests['/repos/carlosmaniero/jigjs/languages'], 2)
+
+    def test_it_measures_the_latency_per_endpoint(self):
+        self.client.get_issue('carlosmaniero', 'jigjs', 1)
+        self.client.get_languages('carlosmaniero', 'jigjs')
+
+        metrics = self.client.metrics.snapshot()
+
+        self.assertEquals(set(metrics.keys()), {'issue', 'languages'})
+        self.assertEquals(metrics['issue']['requests'], 1)
+        self.assertGreater(metrics['issue']['total_seconds'], 0)
+
+    def test_the_shared_metrics_sum_every_worker_process(self):
+        with tempfile.TemporaryDirectory() as metrics_dir, override_settings(METRICS_DIR=metrics_dir):
+            workers = [self.github.client(metrics=GithubMetrics(ProcessSnapshots('github'))) for _ in range(2)]
+
+            for worker in workers:
+                worker.get_issue('carlosmaniero', 'jigjs', 1)
+                worker.metrics.write()
+
+            metrics = workers[0].metrics.collect()
+
+        self.assertEquals(metrics['issue']['requests'], 2)
+        self.assertEquals(metrics['issue']['max_seconds'],
+                          max(worker.metrics.snapshot()['issue']['max_seconds'] for worker in workers))
+        self.assertEquals(metrics['issue']['average_seconds'], metrics['issue']['total_seconds'] / 2)
+
+    def test_the_stats_endpoint_requires_a_profiling_token(self):
+        self.assertEquals(Client().get('/issues/github-stats').status_code, 403)
+        self.assertEquals(Client().get('/issues/github-stats', {'token': profiling_token()}).status_code, 200)
+
+
+class CreateIssueServiceFakeGithubTest(TestCase):
+    def setUp(self) -> None:
+        self.github = FakeGithub().start()
+        self.github.add_issue('carlosmaniero', 'jigjs', 1, title='First', body='First body')
+        self.github.add_issue('carlosmaniero', 'jigjs', 2, title='Second', body='Second body')
+        self.client = self.github.client()
+
+    def tearDown(self) -> None:
+        self.github.stop()
+
+    def test_it_creates_an_issue(self):
+        issue = CreateIssueService().create_issue(
+            self.client, IssueToBeCreated('https://github.com/carlosmaniero/jigjs/issues/1')
+        )
+
+        self.assertEquals(issue.name, 'First')
+        self.assertEquals(issue.main_language.name, 'Python')
+        self.assertEquals(IssueFacetCount.objects.get(language=issue.main_language, rate_level=NOT_RATED).count, 1)
+
+    def test_issues_of_a_known_repository_skip_the_languages_call(self):
+        service = CreateIssueService()
+
+        service.create_issue(self.client, IssueToBeCreated('https://github.com/carlosmaniero/jigjs/issues/1'))
+        service.create_issue(self.client, IssueToBeCreated('https://github.com/carlosmaniero/jigjs/issues/2'))
+
+        self.assertEquals(self.github.requests['/repos/carlosmaniero/jigjs/languages'], 1)
+
+    def test_it_creates_an_issue_without_a_body(self):
+        self.github.add_issue('carlosmaniero', 'jigjs', 3, title='No body', body=None)
+
+        issue = CreateIssueService().create_issue(
+            self.client, IssueToBeCreated('https://github.com/carlosmaniero/jigjs/issues/3')
+        )
+
+        self.assertEquals(issue.body, '')
+        self.assertEquals(issue.body_html, '')
+
+    def test_it_throws_an_exception_given_a_not_found_issue(self):
+        with self.assertRaises(IssueNotFoundException):
+            CreateIssueService().create_issue(
+                self.client, IssueToBeCreated('https://github.com/carlosmaniero/jigjs/issues/404')
+            )
+
+
+class IssueCreationJobTest(TestCase):
+    URL = 'https://github.com/carlosmaniero/jigjs/issues/1'
+
+    def setUp(self) -> None:
+        self.github = FakeGithub().start()
+        self.github.add_issue('carlosmaniero', 'jigjs', 1, title='First')
+        self.worker = IssueJobWorker(queue=IssueJobQueue(max_attempts=3, backoff_seconds=10),
+                                     github=self.github.client())
+
+    def tearDown(self) -> None:
+        self.github.stop()
+
+    def test_create_issue_enqueues_a_job_and_shows_a_pending_page(self):
+        response = self.client.post('/issues/create', {'url': self.URL}, follow=True)
+
+        job = IssueCreationJob.objects.get()
+        self.assertEquals(response.redirect_chain, [(f'/issues/jobs/{job.id}', 302)])
+        self.assertContains(response, 'We are fetching your issue from Github')
+        self.assertContains(response, '<meta http-equiv="refresh" content="2">')
+        self.assertEquals(Issue.objects.count(), 0)
+        self.assertEquals(self.github.requests, {})
+
+    def test_the_pending_page_redirects_to_the_issue_once_processed(self):
+        self.client.post('/issues/create', {'url': self.URL})
+
+        self.assertEquals(self.worker.run_until_empty(), 1)
+
+        response = self.client.get(f'/issues/jobs/{IssueCreationJob.objects.get().id}')
+        self.assertRedirects(response, '/issues/carlosmaniero/jigjs/1')
+
+    def test_it_deduplicates_jobs_by_issue(self):
+        self.client.post('/issues/create', {'url': self.URL})
+        self.client.post('/issues/create', {'url': 'http://github.com/carlosmaniero/jigjs/issues/1'})
+
+        self.assertEquals(IssueCreationJob.objects.count(), 1)
+        self.assertEquals(self.worker.run_until_empty(), 1)
+
+    def test_it_links_already_existing_issues(self):
+        issue = IssueFixture().add(
+            number=1,
+            repository=Repository.objects.create(name='jigjs', owner=Owner.objects.create(owner='carlosmaniero'))
+        )
+        job = IssueJobQueue().enqueue(IssueToBeCreated(self.URL))
+
+        self.worker.run_until_empty()
+
+        job.refresh_from_db()
+        self.assertEquals(job.status, IssueCreationJob.DONE)
+        self.assertEquals(job.issue, issue)
+
+    def test_issues_not_found_on_github_fail_without_retries(self):
+        job = IssueJobQueue().enqueue(IssueToBeCreated('https://github.com/carlosmaniero/jigjs/issues/404'))
+
+        self.worker.run_until_empty()
+
+        job.refresh_from_db()
+        self.assertEquals(job.status, IssueCreationJob.FAILED)
+        self.assertEquals(job.attempts, 1)
+        self.assertContains(self.client.get(f'/issues/jobs/{job.id}'), "We couldn't publish this issue")
+
+    def test_unavailable_github_is_retried_with_backoff(self):
+        worker = IssueJobWorker(queue=IssueJobQueue(max_attempts=3, backoff_seconds=10),
+                                github=GithubClient(base_url='http://127.0.0.1:9', timeout=1))
+        job = IssueJobQueue().enqueue(IssueToBeCreated(self.URL))
+
+        worker.run_until_empty()
+
+        job.refresh_from_db()
+        self.assertEquals(job.status, IssueCreationJob.PENDING)
+        self.assertEquals(job.attempts, 1)
+        self.assertGreater(job.run_after, timezone.now() + timedelta(seconds=9))
+        self.assertIsNone(IssueJobQueue().claim())
+
+        for attempt in range(2):
+            IssueCreationJob.objects.update(run_after=timezone.now())
+            worker.run_until_empty()
+
+        job.refresh_from_db()
+        self.assertEquals(job.status, IssueCreationJob.FAILED)
+        self.assertEquals(job.attempts, 3)
+
+    def test_jobs_of_crashed_workers_are_claimed_again_after_the_lease(self):
+        job = IssueJobQueue().enqueue(IssueToBeCreated(self.URL))
+        IssueJobQueue().claim()
+
+        self.assertIsNone(IssueJobQueue().claim())
+
+        IssueCreationJob.objects.update(locked_at=timezone.now() - timedelta(hours=1))
+        self.assertEquals(IssueJobQueue().claim(), job)
+        self.assertEquals(IssueCreationJob.objects.get().attempts, 1)
+
+    def test_a_job_that_keeps_crashing_its_worker_fails(self):
+        queue = IssueJobQueue(max_attempts=2)
+        job = queue.enqueue(IssueToBeCreated(self.URL))
+        queue.claim()
+
+        for crash in range(2):
+            IssueCreationJob.objects.update(locked_at=timezone.now() - timedelta(hours=1))
+            queue.claim()
+
+        job.refresh_from_db()
+        self.assertEquals(job.status, IssueCreationJob.FAILED)
+        self.assertEquals(job.attempts, 2)
+        self.assertEquals(job.last_error, LEASE_EXPIRED_ERROR)
+
+    def test_an_error_in_a_worker_thread_ends_the_worker(self):
+        worker = IssueJobWorker(github=self.github.client(), concurrency=2, poll_interval=0.01)
+
+        with mock.patch.object(worker.queue, 'claim', side_effect=OperationalError('database is locked')), \
+                self.assertRaises(OperationalError):
+            worker.run_forever()
+
+    def test_failed_jobs_are_retried_when_submitted_again(self):
+        job = IssueJobQueue().enqueue(IssueToBeCreated('https://github.com/carlosmaniero/jigjs/issues/2'))
+        self.worker.run_until_empty()
+
+        self.github.add_issue('carlosmaniero', 'jigjs', 2, title='Second')
+        IssueJobQueue().enqueue(IssueToBeCreated('https://github.com/carlosmaniero/jigjs/issues/2'))
+        self.worker.run_until_empty()
+
+        job.refresh_from_db()
+        self.assertEquals(job.status, IssueCreationJob.DONE)
+        self.assertEquals(job.issue.name, 'Second')
+
+    @override_settings(ISSUE_JOBS_EAGER=True)
+    def test_eager_mode_creates_the_issue_within_the_request(self):
+        with mock.patch('issues.services.issue_job_queue.get_github_client', return_value=self.github.client()):
+            response = self.client.post('/issues/create', {'url': self.URL}, follow=True)
+
+        self.assertContains(response, 'First')
+        self.assertEquals(response.redirect_chain[-1], ('/issues/carlosmaniero/jigjs/1', 302))
+
+    def test_issues_created_by_the_worker_process_reach_the_cached_search_results(self):
+        languages.get_or_create('Python')
+        caches[SEARCH_RESULTS_CACHE].clear()
+        self.assertNotContains(self.client.get('/', {'language': 'Python', 'rate': 'all'}), 'First')
+
+        IssueJobQueue().enqueue(IssueToBeCreated(self.URL))
+
+        # The worker runs in its own process, with its own cached pages.
+        with mock.patch('triage.cache.caches', {SEARCH_RESULTS_CACHE: LocMemCache('job-worker', {})}):
+            self.worker.run_until_empty()
+
+        self.assertContains(self.client.get('/', {'language': 'Python', 'rate': 'all'}), 'First')
+
+
+class IssueJobWorkerConcurrencyTest(TransactionTestCase):
+    JOBS = 12
+
+    def test_concurrent_workers_process_each_job_once(self):
+        with FakeGithub(latency=0.01) as github:
+            for number in range(1, self.JOBS + 1):
+                github.add_issue('carlosmaniero', 'jigjs', number)
+                IssueJobQueue().enqueue(IssueToBeCreated(f'https://github.com/carlosmaniero/jigjs/issues/{number}'))
+
+            worker = IssueJobWorker(github=github.client(), concurrency=4, poll_interval=0.01)
+
+            def stop_when_done():
+                while IssueCreationJob.objects.exclude(status=IssueCreationJob.DONE).exists():
+                    time.sleep(0.01)
+                worker.stop()
+                connection.close()
+
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                executor.submit(stop_when_done)
+                worker.run_forever()
+
+            issue_requests = [count for path, count in github.requests.items() if '/issues/' in path]
+
+        self.assertEquals(Issue.objects.count(), self.JOBS)
+        self.assertEquals(issue_requests, [1] * self.JOBS)
+
+
+class SyncIssuesServiceTest(TestCase):
+    OWNER = 'carlosmaniero'
+    REPOSITORY = 'iwannacontrib-issues-test-integration-test'
+
+    def setUp(self) -> None:
+        caches[SEARCH_RESULTS_CACHE].clear()
+        self.github = FakeGithub().start()
+        self.fixture = IssueFixture()
+        self.issues = [self.fixture.add() for _ in range(3)]
+
+        for issue in self.issues:
+            self.github.add_issue(self.OWNER, self.REPOSITORY, issue.number, title=issue.name, body=issue.body)
+
+        self.service = SyncIssuesService(self.github.client())
+
+    def tearDown(self) -> None:
+        self.github.stop()
+
+    def test_it_lists_each_repository_once(self):
+        report = self.service.sync()
+
+        self.assertEquals(report.repositories, 1)
+        self.assertEquals(report.scanned, 3)
+        self.assertEquals(self.github.requests, {f'/repos/{self.OWNER}/{self.REPOSITORY}/issues': 1})
+
+    def test_unchanged_issues_are_not_written(self):
+        updated_at = [issue.updated_at for issue in Issue.objects.order_by('number')]
+
+        report = self.service.sync()
+
+        self.assertEquals(report.updated, 0)
+        self.assertEquals([issue.updated_at for issue in Issue.objects.order_by('number')], updated_at)
+
+    def test_it_updates_the_changed_issues(self):
+        self.github.add_issue(self.OWNER, self.REPOSITORY, 2, title='New title', body='**New** body')
+        self.github.add_issue(self.OWNER, self.REPOSITORY, 3, title=self.issues[2].name, state=Issue.CLOSED)
+
+        report = self.service.sync()
+
+        self.assertEquals(report.updated, 2)
+        issue = Issue.objects.get(number=2)
+        self.assertEquals(issue.name, 'New title')
+        self.assertEquals(issue.body_html, '<p><strong>New</strong> body</p>')
+        self.assertEquals(Issue.objects.get(number=3).state, Issue.CLOSED)
+
+    def test_changed_issues_are_stamped_with_the_write_time(self):
+        list_repository_issues = self.github.client().list_repository_issues
+        self.github.add_issue(self.OWNER, self.REPOSITORY, 2, title='New title')
+
+        def list_while_voting(*args):
+            github_issues = list_repository_issues(*args)
+            self.issues[1].rate(3)
+            return github_issues
+
+        with mock.patch.object(self.service.github, 'list_repository_issues', side_effect=list_while_voting):
+            self.service.sync()
+
+        voted_at = self.issues[1].updated_at
+        issue = Issue.objects.get(number=2)
+        self.assertEquals(issue.name, 'New title')
+        self.assertGreaterEqual(issue.updated_at, voted_at)
+        self.assertLess(Repository.objects.get().synced_at, voted_at)
+
+    def test_the_first_sync_finds_issues_closed_before_they_were_added(self):
+        closed_at = Issue.objects.aggregate(added_at=Min('created_at'))['added_at'] - timedelta(days=30)
+        self.github.add_issue(self.OWNER, self.REPOSITORY, 1, title=self.issues[0].name, body=self.issues[0].body,
+                              state=Issue.CLOSED, updated_at=closed_at)
+
+        self.service.sync()
+
+        self.assertEquals(Issue.objects.get(number=1).state, Issue.CLOSED)
+
+    def test_closed_issues_leave_the_search_results(self):
+        self.client.get('/?language=Python&rate=all')
+        self.github.add_issue(self.OWNER, self.REPOSITORY, 1, title=self.issues[0].name, state=Issue.CLOSED)
+
+        self.service.sync()
+
+        response = self.client.get('/?language=Python&rate=all')
+        self.assertNotContains(response, self.issues[0].name)
+        self.assertContains(response, self.issues[1].name)
+
+    def test_the_next_sync_only_asks_for_issues_updated_since_the_last_one(self):
+        self.service.sync()
+        repository = Repository.objects.get()
+
+        self.assertIsNotNone(repository.synced_at)
+
+        self.github.add_issue(self.OWNER, self.REPOSITORY, 1, title='Renamed',
+                              updated_at=timezone.now() - timedelta(days=1))
+
+        report = self.service.sync()
+
+        self.assertEquals(report.scanned, len(self.issues) - 1)
+        self.assertEquals(Issue.objects.get(number=1).name, self.issues[0].name)
+
+
+def issue_event_payload(number: int, title='any title', body='any body', state='open', action='edited',
+                        owner='carlosmaniero', repository='iwannacontrib-issues-test-integration-test',
+                        updated_at='2020-10-18T10:00:00Z'):
+    return dict(
+        action=action,
+        issue=dict(number=number, title=title, body=body, state=state, updated_at=updated_at),
+        repository=dict(name=repository, owner=dict(login=owner)),
+    )
+
+
+@override_settings(GITHUB_WEBHOOK_SECRET='secret')
+class GithubWebhookTest(TestCase):
+    def setUp(self) -> None:
+        self.fixture = IssueFixture()
+        self.issues = [self.fixture.add() for _ in range(3)]
+        self.buffer = IssueEventBuffer(batch_size=10, flush_seconds=0)
+        patcher = mock.patch('issues.views.get_issue_event_buffer', return_value=self.buffer)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def deliver(self, payload: dict, secret='secret', event='issues'):
+        body = json.dumps(payload).encode()
+
+        return self.client.post('/issues/webhook', data=body, content_type='application/json', **{
+            'HTTP_X_GITHUB_EVENT': event,
+            'HTTP_X_HUB_SIGNATURE_256': sign(secret, body),
+        })
+
+    def test_it_rejects_deliveries_with_an_invalid_signature(self):
+        response = self.deliver(issue_event_payload(1, title='Changed'), secret='another secret')
+
+        self.assertEquals(response.status_code, 403)
+        self.assertEquals(self.buffer.stats['received'], 0)
+
+    def test_it_ignores_other_events(self):
+        response = self.deliver({'zen': 'Keep it logically awesome.'}, event='ping')
+
+        self.assertEquals(response.status_code, 204)
+
+    def test_it_updates_the_issue_once_the_buffer_is_flushed(self):
+        response = self.deliver(issue_event_payload(1, title='Changed', state=Issue.CLOSED, action='closed'))
+
+        self.assertEquals(response.status_code, 202)
+        self.assertEquals(Issue.objects.get(number=1).name, self.issues[0].name)
+
+        self.assertEquals(self.buffer.flush(), 1)
+        issue = Issue.objects.get(number=1)
+        self.assertEquals(issue.name, 'Changed')
+        self.assertEquals(issue.state, Issue.CLOSED)
+
+    def test_a_burst_is_written_in_grouped_queries_keeping_the_latest_event_of_each_issue(self):
+        for number in range(1, 4):
+            self.deliver(issue_event_payload(number, title=f'Newer {number}', updated_at='2020-10-18T10:00:02Z'))
+            self.deliver(issue_event_payload(number, title=f'Older {number}', updated_at='2020-10-18T10:00:01Z'))
+
+        # savepoint, claim, pending events, repositories, issues, bulk update, delete, release savepoint,
+        # then the search generations
+        with self.assertNumQueries(10):
+            self.assertEquals(self.buffer.flush(), 3)
+
+        self.assertEquals(list(Issue.objects.order_by('number').values_list('name', flat=True)),
+                          ['Newer 1', 'Newer 2', 'Newer 3'])
+        self.assertEquals(self.buffer.stats['coalesced'], 3)
+
+    def test_a_delivery_older_than_the_merged_one_is_ignored(self):
+        self.deliver(issue_event_payload(1, title='Closed', state=Issue.CLOSED, action='closed',
+                                         updated_at='2020-10-18T10:00:02Z'))
+        self.buffer.flush()
+
+        self.deliver(issue_event_payload(1, title='Opened', updated_at='2020-10-18T10:00:01Z'))
+
+        self.assertEquals(self.buffer.flush(), 0)
+        issue = Issue.objects.get(number=1)
+        self.assertEquals((issue.name, issue.state), ('Closed', Issue.CLOSED))
+        self.assertEquals(issue.github_updated_at, datetime(2020, 10, 18, 10, 0, 2, tzinfo=dt_timezone.utc))
+
+    def test_acknowledged_events_survive_the_process_that_received_them(self):
+        response = self.deliver(issue_event_payload(1, title='Changed'))
+
+        self.assertEquals(response.status_code, 202)
+        self.assertEquals(PendingIssueEvent.objects.count(), 1)
+
+        # Another process merges the events a restarted worker never flushed.
+        stdout = io.StringIO()
+        call_command('merge_pending_issue_events', stdout=stdout)
+
+        self.assertIn('1 issues updated', stdout.getvalue())
+        self.assertEquals(Issue.objects.get(number=1).name, 'Changed')
+        self.assertFalse(PendingIssueEvent.objects.exists())
+
+    def test_a_full_batch_is_written_without_waiting_for_the_flush(self):
+        self.buffer.batch_size = 2
+
+        self.deliver(issue_event_payload(1, title='First'))
+        self.deliver(issue_event_payload(2, title='Second'))
+
+        self.assertEquals(Issue.objects.get(number=2).name, 'Second')
+
+    def test_events_of_unknown_repositories_are_dropped_before_they_are_stored(self):
+        with self.assertNumQueries(1):
+            response = self.deliver(issue_event_payload(1, title='Changed', repository='unknown'))
+
+        self.assertEquals(response.status_code, 204)
+        self.assertFalse(PendingIssueEvent.objects.exists())
+        self.assertEquals(self.buffer.stats['dropped'], 1)
+
+    def test_events_of_repositories_removed_before_the_merge_are_dropped(self):
+        self.deliver(issue_event_payload(1, title='Changed'))
+        Repository.objects.all().delete()
+
+        # savepoint, claim, pending events, repositories, delete, release savepoint
+        with self.assertNumQueries(6):
+            self.assertEquals(self.buffer.flush(), 0)
+
+        self.assertEquals(self.buffer.stats['dropped'], 1)
+
+    def test_it_invalidates_the_cached_search_results(self):
+        caches[SEARCH_RESULTS_CACHE].clear()
+        self.client.get('/?language=Python&rate=all')
+
+        self.deliver(issue_event_payload(1, title='Changed'))
+        self.buffer.flush()
+
+        self.assertContains(self.client.get('/?language=Python&rate=all'), 'Changed')
+
+
+@override_settings(GITHUB_WEBHOOK_SECRET='secret')
+class ReplayWebhooksCommandTest(LiveServerTestCase):
+    def test_it_replays_the_recorded_deliveries(self):
+        IssueFixture().add()
+        buffer = IssueEventBuffer(batch_size=1, flush_seconds=0)
+
+        with tempfile.NamedTemporaryFile('w', suffix='.ndjson', delete=False) as recording:
+            recording.write(json.dumps(issue_event_payload(1, title='Replayed')) + '\n')
+            recording.write(json.dumps({'event': 'ping', 'payload': {'zen': 'Design for failure.'}}) + '\n')
+        self.addCleanup(os.remove, recording.name)
+
+        stdout = io.StringIO()
+        with mock.patch('issues.views.get_issue_event_buffer', return_value=buffer):
+            call_command('replay_webhooks', recording.name, url=f'{self.live_server_url}/issues/webhook',
+                         repeat=2, concurrency=1, stdout=stdout)
+
+        self.assertIn('Sent 4 deliveries', stdout.getvalue())
+        self.assertIn('202: 2, 204: 2', stdout.getvalue())
+        self.assertEquals(Issue.objects.get(number=1).name, 'Replayed')
+
+
+@override_settings(SITEMAP_SECTION_SIZE=2, SITEMAP_BASE_URL='https://iwannacontrib.example')
+class SitemapTest(TestCase):
+    def setUp(self) -> None:
+        caches[SITEMAP_CACHE].clear()
+        self.fixture = IssueFixture()
+        self.issues = [self.fixture.add() for _ in range(3)]
+
+    def section_number(self, issue: Issue) -> int:
+        return issue.id // 2
+
+    def test_the_index_lists_a_section_per_key_range(self):
+        response = self.client.get('/sitemap.xml')
+        content = b''.join(response.streaming_content).decode()
+
+        sections = sorted({self.section_number(issue) for issue in self.issues})
+        self.assertEquals(response['Content-Type'], 'application/xml')
+        self.assertEquals(
+            re.findall(r'<loc>https://iwannacontrib\.example/sitemap-issues-(\d+)\.xml</loc>', content),
+            [str(number) for number in sections]
+        )
+        self.assertIn('Last-Modified', response)
+
+    @override_settings(SITEMAP_BASE_URL=None)
+    def test_it_fails_without_a_base_url(self):
+        with self.assertRaises(ImproperlyConfigured):
+            self.client.get('/sitemap.xml')
+
+    def test_a_section_lists_its_issues_in_key_order(self):
+        self.client.get('/sitemap.xml')
+        number = self.section_number(self.issues[-1])
+
+        content = b''.join(self.client.get(f'/sitemap-issues-{number}.xml').streaming_content).decode()
+
+        expected = [issue for issue in self.issues if self.section_number(issue) == number]
+        self.assertEquals(re.findall(r'<loc>https://iwannacontrib\.example([^<]+)</loc>', content),
+                          [issue.get_url() for issue in expected])
+        self.assertIn(f'<lastmod>{expected[-1].updated_at.astimezone(dt_timezone.utc):%Y-%m-%dT%H:%M:%S}+00:00',
+                      content)
+
+    def test_it_answers_conditional_requests_and_serves_the_rendered_section_from_the_cache(self):
+        self.client.get('/sitemap.xml')
+        number = self.section_number(self.issues[0])
+        response = self.client.get(f'/sitemap-issues-{number}.xml')
+        b''.join(response.streaming_content)
+
+        not_modified = self.client.get(f'/sitemap-issues-{number}.xml',
+                                       HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+
+        with self.assertNumQueries(1):
+            cached = b''.join(self.client.get(f'/sitemap-issues-{number}.xml').streaming_content)
+
+        self.assertEquals(not_modified.status_code, 304)
+        self.assertIn(self.issues[0].get_url().encode(), cached)
+
+    @override_settings(SITEMAP_REFRESH_WINDOW_SECONDS=0)
+    def test_a_refresh_only_touches_the_sections_of_changed_issues(self):
+        refresh_sections()
+        sections = dict(SitemapSection.objects.values_list('number', 'lastmod'))
+
+        self.issues[0].rate(3)
+        new_issue = self.fixture.add()
+
+        touched = {self.section_number(self.issues[0]), self.section_number(new_issue)}
+
+        self.assertEquals(refresh_sections(), len(touched))
+
+        refreshed = dict(SitemapSection.objects.values_list('number', 'lastmod'))
+        for number in touched:
+            self.assertEquals(refreshed[number], max(
+                issue.updated_at for issue in Issue.objects.all() if self.section_number(issue) == number
+            ))
+        for number in set(sections) - touched:
+            self.assertEquals(refreshed[number], sections[number])
+        self.assertEquals(refresh_sections(), 0)
+
+    def test_a_row_committed_behind_the_watermark_renders_its_section_again(self):
+        self.client.get('/sitemap.xml')
+        number = self.section_number(self.issues[-1])
+        b''.join(self.client.get(f'/sitemap-issues-{number}.xml').streaming_content)
+
+        # A slow transaction stamped this write before the refresh, but committed it after.
+        watermark = SitemapSection.objects.order_by('-lastmod').first().lastmod
+        late = watermark - timedelta(seconds=30)
+        Issue.objects.filter(pk=self.issues[-1].pk).update(updated_at=late)
+        refresh_sections()
+
+        content = b''.join(self.client.get(f'/sitemap-issues-{number}.xml').streaming_content).decode()
+        self.assertIn(f'<lastmod>{late.astimezone(dt_timezone.utc):%Y-%m-%dT%H:%M:%S}+00:00', content)
+
+    def test_the_host_header_does_not_change_the_urls(self):
+        content = b''.join(self.client.get('/sitemap.xml', HTTP_HOST='attacker.example').streaming_content).decode()
+
+        self.assertNotIn('attacker.example', content)
+        self.assertIn('<loc>https://iwannacontrib.example/sitemap-issues-', content)
+        self.assertEquals(content, b''.join(self.client.get('/sitemap.xml').streaming_content).decode())
+
+    def test_another_process_serves_the_rendered_section(self):
+        self.client.get('/sitemap.xml')
+        number = self.section_number(self.issues[0])
+        b''.join(self.client.get(f'/sitemap-issues-{number}.xml').streaming_content)
+
+        other_process = FileBasedCache(caches[SITEMAP_CACHE]._dir, {})
+
+        with mock.patch('issues.sitemaps.caches', {SITEMAP_CACHE: other_process}), self.assertNumQueries(1):
+            cached = b''.join(self.client.get(f'/sitemap-issues-{number}.xml').streaming_content)
+
+        self.assertIn(self.issues[0].get_url().encode(), cached)
+
+    def test_an_unknown_section_is_not_found(self):
+        self.assertEquals(self.client.get('/sitemap-issues-999.xml').status_code, 404)
+
+
+class BenchmarkSuiteTest(TransactionTestCase):
+    def test_it_seeds_the_missing_issues_only(self):
+        self.assertEquals(seed_catalog(30), 30)
+        self.assertEquals(seed_catalog(30), 0)
+        self.assertEquals(seed_catalog(40), 10)
+        self.assertEquals(Issue.objects.count(), 40)
+        self.assertFalse(reconcile_facet_counts(Issue.objects.open(), fix=False))
+
+    def test_it_measures_every_scenario(self):
+        seed_catalog(30)
+
+        with FakeGithub() as fake, override_settings(ISSUE_JOBS_EAGER=True), \
+                mock.patch('issues.services.issue_job_queue.get_github_client', return_value=fake.client()):
+            results = BenchmarkSuite(fake, requests=3, concurrency=1, memory_requests=1).run()
+
+        self.assertEquals([result.name for result in results], ['home', 'show_issue', 'rate', 'create_issue'])
+        self.assertEquals(
+            [sorted(result.statuses.items()) for result in results],
+            [[(200, 3)], [(200, 3)], [(302, 3)], [(302, 3)]]
+        )
+        self.assertTrue(all(result.peak_memory > 0 for result in results))
+        self.assertEquals(Issue.objects.filter(repository__owner__owner='fake-github-owner').count(), 4)
+
+    def test_it_reports_results_past_the_baseline(self):
+        result = ScenarioResult('home', latencies=[0.01] * 10, queries=[4] * 10, statuses=Counter({200: 10}),
+                                elapsed=0.1, peak_memory=1024)
+        baselines = {'home@100': {'p95_ms': 10, 'queries_per_request': 3, 'peak_memory_kib': 1}}
+
+        self.assertEquals(find_regressions([result], baselines, 100, tolerance=0.25), [
+            'home@100 queries_per_request is 4.0, the baseline is 3',
+        ])
+        self.assertEquals(find_regressions([result], baselines, 1000, tolerance=0.25), [])
+
+    def test_it_reports_unexpected_statuses_even_without_a_baseline(self):
+        result = ScenarioResult('home', latencies=[0.001] * 10, queries=[1] * 10, statuses=Counter({200: 8, 500: 2}),
+                                elapsed=0.1, peak_memory=1024)
+
+        self.assertEquals(find_regressions([result], {}, 100, tolerance=0.25), [
+            'home answered 500 to 2 requests, it should answer 200',
+        ])
+
+
+class CatalogGeneratorTest(TestCase):
+    def test_the_same_seed_generates_the_same_catalog(self):
+        CatalogGenerator(seed=7, prefix='first-').generate(200)
+        CatalogGenerator(seed=7, prefix='second-').generate(200)
+
+        def catalog(prefix):
+            return list(Issue.objects.filter(repository__owner__owner__startswith=prefix).order_by('id').values_list(
+                'repository__name', 'number', 'name', 'main_language__name', 'rate_votes', 'state'
+            ))
+
+        self.assertEquals(
+            [(repository.replace('first-', ''), *rest) for repository, *rest in catalog('first-')],
+            [(repository.replace('second-', ''), *rest) for repository, *rest in catalog('second-')]
+        )
+
+    def test_it_generates_consistent_issues(self):
+        report = CatalogGenerator(seed=1, batch_size=100).generate(500)
+
+        issues = list(Issue.objects.all())
+        self.assertEquals(report.issues, 500)
+        self.assertEquals(len(issues), 500)
+        self.assertEquals(Repository.objects.count(), 25)
+        self.assertTrue(any(issue.rate_votes == 0 for issue in issues))
+
+        for issue in issues:
+            self.assertEquals(issue.rate_votes, sum(issue.rate_histogram.values()))
+            self.assertEquals(issue.rate_sum, sum(level * votes for level, votes in issue.rate_histogram.items()))
+            self.assertEquals(issue.current_rate_level, round(issue.rate_sum / issue.rate_votes) if issue.rate_votes
+                              else None)
+
+        self.assertFalse(reconcile_facet_counts(Issue.objects.open(), fix=False))
+
+    def test_it_grows_an_existing_catalog(self):
+        generator = CatalogGenerator(seed=3)
+        generator.generate(100)
+        generator.generate(50)
+
+        self.assertEquals(generator.existing_issues(), 150)
+
+    def test_growing_a_catalog_keeps_the_owner_of_every_repository(self):
+        generator = CatalogGenerator(seed=4, batch_size=500)
+        generator.generate(2000)
+        owners = dict(Repository.objects.values_list('name', 'owner_id'))
+
+        generator.generate(3000)
+
+        self.assertEquals(Repository.objects.count(), 250)
+        self.assertEquals(Repository.objects.values('name').distinct().count(), 250)
+        self.assertEquals(dict(Repository.objects.filter(name__in=owners).values_list('name', 'owner_id')), owners)
+
+    def test_the_command_reports_the_throughput(self):
+        stdout = io.StringIO()
+        call_command('generate_issues', 40, seed=2, stdout=stdout)
+
+        self.assertIn('Generated 40 issues over 2 repositories', stdout.getvalue())
+        self.assertEquals(Issue.objects.count(), 40)
+
+
+class IssueTitleFragmentsTest(TestCase):
+    def setUp(self) -> None:
+        caches[FRAGMENTS_CACHE].clear()
+        caches[SEARCH_RESULTS_CACHE].clear()
+        self.fixture = IssueFixture()
+        self.fixture.add()
+        self.fixture.add()
+
+    def issues(self):
+        return list(Issue.objects.with_relations().order_by('number'))
+
+    def test_each_fragment_is_rendered_once(self):
+        render_issue_titles(self.issues())
+
+        with mock.patch('issues.fragments.get_template') as get_template:
+            titles = render_issue_titles(self.issues())
+
+        get_template.assert_not_called()
+        self.assertEquals(len(titles), 2)
+        self.assertIn('any title 1', titles[0])
+        self.assertIn('any title 2', titles[1])
+
+    def test_a_page_is_read_with_one_multi_get(self):
+        render_issue_titles(self.issues())
+        issues = self.issues()
+        cache = caches[FRAGMENTS_CACHE]
+
+        with mock.patch.object(cache, 'get_many', wraps=cache.get_many) as get_many:
+            render_issue_titles(issues)
+
+        get_many.assert_called_once_with([issue_title_key(issue) for issue in issues])
+
+    def test_rating_an_issue_renders_its_fragment_again(self):
+        issue = self.issues()[0]
+        self.assertIn('Not rated yet', render_issue_titles([issue])[0])
+
+        issue.rate(5)
+
+        titles = render_issue_titles(self.issues())
+        self.assertNotIn('Not rated yet', titles[0])
+        self.assertIn(IssueRate.objects.get(rate=5).get_rate_display(), titles[0])
+        self.assertIn('Not rated yet', titles[1])
+
+    def test_syncing_an_issue_renders_its_fragment_again(self):
+        render_issue_titles(self.issues())
+        github = FakeGithub().start()
+        self.addCleanup(github.stop)
+
+        for issue in self.issues():
+            github.add_issue(issue.repository.owner.owner, issue.repository.name, issue.number, title=issue.name,
+                             body=issue.body)
+
+        github.add_issue('carlosmaniero', 'iwannacontrib-issues-test-integration-test', 2, title='Renamed')
+        SyncIssuesService(github.client()).sync()
+
+        titles = render_issue_titles(self.issues())
+        self.assertIn('any title 1', titles[0])
+        self.assertIn('Renamed', titles[1])
+
+    def test_the_pages_use_the_fragments(self):
+        issue = self.issues()[0]
+        title = render_issue_titles([issue])[0]
+
+        self.assertContains(self.client.get(issue.get_url()), title, html=False)
+        self.assertContains(self.client.get('/?language=Python&rate=all'), title, html=False)
+
+
+class ReplicaRoutingTest(TransactionTestCase):
+    REPLICA = 'replica'
+
+    def setUp(self) -> None:
+        caches[SEARCH_RESULTS_CACHE].clear()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+
+        connections.databases[self.REPLICA] = {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.path.join(directory.name, 'replica.sqlite3'),
+        }
+        self.addCleanup(self.remove_replica)
+
+        replicas = override_settings(DATABASE_REPLICAS=[self.REPLICA])
+        replicas.enable()
+        self.addCleanup(replicas.disable)
+
+        self.issue = IssueFixture().add()
+        IssueRate.objects.get_or_create(rate=5)
+        self.replicate()
+
+    def remove_replica(self):
+        connections[self.REPLICA].close()
+        del connections[self.REPLICA]
+        del connections.databases[self.REPLICA]
+
+    def replicate(self):
+        copy_sqlite_database('default', self.REPLICA)
+
+    def test_issues_and_searches_are_read_from_the_replica(self):
+        Issue.objects.filter(pk=self.issue.pk).update(name='Renamed on the primary')
+
+        self.assertContains(self.client.get(self.issue.get_url()), self.issue.name)
+        self.assertContains(self.client.get('/?language=Python&rate=all'), self.issue.name)
+
+        self.replicate()
+
+        self.assertContains(self.client.get(self.issue.get_url()), 'Renamed on the primary')
+
+    def test_votes_are_written_on_the_primary(self):
+        response = self.client.post(self.issue.get_rate_url(), {'rate': 5})
+
+        self.assertIn(PRIMARY_UNTIL_COOKIE, response.cookies)
+        self.assertEquals(IssueRateRel.objects.count(), 1)
+        self.assertEquals(IssueRateRel.objects.using(self.REPLICA).count(), 0)
+
+    def test_a_client_that_voted_reads_its_own_vote(self):
+        rate_label = IssueRate.objects.get(rate=5).get_rate_display()
+        other_client = type(self.client)()
+
+        self.client.post(self.issue.get_rate_url(), {'rate': 5})
+
+        self.assertContains(self.client.get(self.issue.get_url()), rate_label)
+        self.assertContains(other_client.get(self.issue.get_url()), 'Not rated yet')
+
+        self.replicate()
+
+        self.assertContains(other_client.get(self.issue.get_url()), rate_label)
+
+    def test_the_client_goes_back_to_the_replicas_once_they_caught_up(self):
+        self.client.post(self.issue.get_rate_url(), {'rate': 5})
+        self.client.cookies[PRIMARY_UNTIL_COOKIE] = str(time.time() - 1)
+
+        self.assertContains(self.client.get(self.issue.get_url()), 'Not rated yet')
+
+    @override_settings(REPLICA_MAX_LAG_SECONDS=0.2)
+    def test_search_pages_read_from_a_replica_are_cached_for_the_replica_lag(self):
+        rate_label = IssueRate.objects.get(rate=5).get_rate_display()
+        type(self.client)().post(self.issue.get_rate_url(), {'rate': 5})
+
+        self.assertContains(self.client.get('/?language=Python&rate=all'), 'Not rated yet')
+
+        self.replicate()
+        time.sleep(0.3)
+
+        self.assertContains(self.client.get('/?language=Python&rate=all'), rate_label)
+
+    def test_without_replicas_every_query_goes_to_the_primary(self):
+        with override_settings(DATABASE_REPLICAS=[]):
+            Issue.objects.filter(pk=self.issue.pk).update(name='Renamed on the primary')
+            response = self.client.post(self.issue.get_rate_url(), {'rate': 5})
+
+            self.assertNotIn(PRIMARY_UNTIL_COOKIE, response.cookies)
+            self.assertContains(type(self.client)().get(self.issue.get_url()), 'Renamed on the primary')
@@ -1,3 +1,4 @@
+from django.test import override_settings
 from selenium.common.exceptions import NoSuchElementException
 from selenium.webdriver.support.select import Select
 
@@ -74,6 +75,7 @@ class SearchPageObject(BasePageObject):
         self.webdriver.find_element_by_link_text(link_text).click()
 
 
+@override_settings(ISSUE_JOBS_EAGER=True)
 class CreateIssueE2E(E2ETesting):
     def test_it_shows_an_error_given_an_invalid_input(self):
         self.fetch('/issues/create')
@@ -5,6 +5,9 @@ app_name = 'issues'
 
 urlpatterns = [
     path('create', views.create_issue, name='create'),
+    path('github-stats', views.github_stats, name='github_stats'),
+    path('webhook', views.github_webhook, name='webhook'),
+    path('jobs/<int:job_id>', views.show_job, name='job'),
     path('<str:owner>/<str:repository>/<int:number>', views.show_issue, name='show'),
     path('<str:owner>/<str:repository>/<int:number>/rate', views.rate, name='rate'),
 ]
@@ -1,10 +1,25 @@
+import json
+
+from django.conf import settings
 from django.contrib import messages
-from django.shortcuts import render, redirect
-from github import Github
+from django.http import JsonResponse, HttpResponse, HttpResponseForbidden, HttpResponseBadRequest, Http404, \
+    StreamingHttpResponse
+from django.shortcuts import render, redirect, get_object_or_404
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import condition, require_POST
 
 from issues.forms import CreateIssueForm
-from issues.models import Issue
-from issues.services.create_issue_service import CreateIssueService
+from issues.freshness import issue_etag, issue_last_modified, sitemap_index_last_modified, \
+    sitemap_section_last_modified
+from issues.models import Issue, IssueCreationJob
+from issues.services.github_client import get_github_client
+from issues.services.issue_job_queue import IssueJobQueue, IssueJobWorker
+from issues.sitemaps import refreshes_sitemap, cached_xml, render_index, render_section, sitemap_base_url
+from issues.services.issue_webhook_service import IssueEvent, get_issue_event_buffer, verify_signature
+from issues.services.vote_buffer_service import get_vote_buffer
+from iwannacontrib.profiling import requires_profiling_token
+from iwannacontrib.replicas import reads_from_replica
+from triage.cache import SearchResultsCache
 
 
 def create_issue(request):
@@ -14,16 +29,34 @@ def create_issue(request):
         form = CreateIssueForm(request.POST)
 
         if form.is_valid():
-            issue = CreateIssueService().create_issue(Github(), form.cleaned_data.get('url'))
-            return redirect(issue.get_url())
+            job = IssueJobQueue().enqueue(form.cleaned_data.get('url'))
+
+            if settings.ISSUE_JOBS_EAGER and not job.is_finished:
+                IssueJobWorker().process(job)
+
+            return redirect('issues:job', job_id=job.id)
 
     return render(request, 'issues/create_issue.html', {
         "form": form
     })
 
 
+def show_job(request, job_id: int):
+    job = get_object_or_404(IssueCreationJob, id=job_id)
+
+    if job.status == IssueCreationJob.DONE and job.issue_id is not None:
+        return redirect(job.issue.get_url())
+
+    return render(request, 'issues/issue_job.html', {
+        "job": job,
+        "refresh_seconds": settings.ISSUE_JOBS_PENDING_REFRESH_SECONDS,
+    })
+
+
+@reads_from_replica
+@condition(etag_func=issue_etag, last_modified_func=issue_last_modified)
 def show_issue(request, owner: str, repository: str, number: int):
-    issue = Issue.objects.get(
+    issue = Issue.objects.with_relations().get(
         repository__owner__owner=owner,
         repository__name=repository,
         number=number
@@ -35,15 +68,78 @@ def show_issue(request, owner: str, repository: str, number: int):
 
 
 def rate(request, owner: str, repository: str, number: int):
-    issue = Issue.objects.get(
+    issue = Issue.objects.with_relations().get(
         repository__owner__owner=owner,
         repository__name=repository,
         number=number
     )
 
-    issue.rate(int(request.POST['rate']))
-    issue.save()
+    try:
+        rate_number = int(request.POST.get('rate', ''))
+        Issue.rate_votes_field(rate_number)
+    except ValueError:
+        return HttpResponseBadRequest('Unknown rate')
+
+    if settings.RATE_BUFFER_ENABLED:
+        get_vote_buffer().add(issue, rate_number)
+    else:
+        previous_rate_level = issue.current_rate_level
+        issue.rate(rate_number)
+
+        SearchResultsCache().invalidate_issue(issue.main_language_id, previous_rate_level, issue.current_rate_level)
 
     messages.add_message(request, messages.SUCCESS, 'You vote has been registered. Thank you for voting.')
 
     return redirect(issue.get_url())
+
+
+@requires_profiling_token
+def github_stats(request):
+    return JsonResponse(get_github_client().metrics.collect())
+
+
+@csrf_exempt
+@require_POST
+def github_webhook(request):
+    if not verify_signature(settings.GITHUB_WEBHOOK_SECRET, request.body, request.headers.get('X-Hub-Signature-256')):
+        return HttpResponseForbidden()
+
+    if request.headers.get('X-GitHub-Event') != 'issues':
+        return HttpResponse(status=204)
+
+    try:
+        event = IssueEvent.from_payload(json.loads(request.body))
+    except (ValueError, KeyError, TypeError):
+        return HttpResponseBadRequest()
+
+    if event is None or not get_issue_event_buffer().add(event):
+        return HttpResponse(status=204)
+
+    return HttpResponse(status=202)
+
+
+@refreshes_sitemap
+@condition(last_modified_func=sitemap_index_last_modified)
+def sitemap_index(request):
+    lastmod = sitemap_index_last_modified(request)
+    base_url = sitemap_base_url()
+    key = f'sitemap-index:{base_url}:{lastmod.timestamp() if lastmod else ""}'
+
+    return StreamingHttpResponse(cached_xml(key, lambda: render_index(base_url)), content_type='application/xml')
+
+
+@refreshes_sitemap
+@condition(last_modified_func=sitemap_section_last_modified)
+def sitemap_section(request, number: int):
+    lastmod = sitemap_section_last_modified(request, number)
+
+    if lastmod is None:
+        raise Http404()
+
+    base_url = sitemap_base_url()
+    key = f'sitemap-section:{base_url}:{number}:{lastmod.timestamp()}'
+
+    return StreamingHttpResponse(
+        cached_xml(key, lambda: render_section(base_url, number)),
+        content_type='application/xml'
+    )
@@ -0,0 +1,301 @@
+import atexit
+import json
+import os
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse
+from django.template import TemplateDoesNotExist
+from django.template.backends.django import DjangoTemplates, Template, reraise
+
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERIES_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100)
+
+# Every timed kind is a Server-Timing metric and a histogram of its own.
+TIMED_KINDS = ['db', 'template', 'markdown', 'github']
+METRICS = [
+    ('iwannacontrib_request_duration_seconds', 'Time spent answering the request.', SECONDS_BUCKETS),
+    ('iwannacontrib_request_db_queries', 'SQL queries run by the request.', QUERIES_BUCKETS),
+] + [
+    (f'iwannacontrib_request_{kind}_seconds', f'Time the request spent in {kind}.', SECONDS_BUCKETS)
+    for kind in TIMED_KINDS
+]
+
+current_timing = ContextVar('current_timing', default=None)
+
+
+class RequestTiming:
+    # Each kind gets its own time only, a query run while a template renders is not counted as template time.
+    def __init__(self):
+        self.seconds = {}
+        self.queries = 0
+        self._nested = [0.0]
+
+    def start(self):
+        self._nested.append(0.0)
+
+    def stop(self, kind: str, elapsed: float):
+        self.seconds[kind] = self.seconds.get(kind, 0.0) + elapsed - self._nested.pop()
+        self._nested[-1] += elapsed
+
+    def execute(self, execute, sql, params, many, context):
+        self.queries += 1
+
+        with timed('db'):
+            return execute(sql, params, many, context)
+
+    def observations(self, total: float) -> dict:
+        observations = {
+            'iwannacontrib_request_duration_seconds': total,
+            'iwannacontrib_request_db_queries': self.queries,
+        }
+        observations.update(
+            (f'iwannacontrib_request_{kind}_seconds', self.seconds.get(kind, 0.0)) for kind in TIMED_KINDS
+        )
+        return observations
+
+    def header(self, total: float) -> str:
+        metrics = [f'db;dur={self.seconds.get("db", 0.0) * 1000:.1f};desc="{self.queries} queries"']
+        metrics += [
+            f'{kind};dur={self.seconds[kind] * 1000:.1f}'
+            for kind in TIMED_KINDS[1:]
+            if kind in self.seconds
+        ]
+        metrics.append(f'total;dur={total * 1000:.1f}')
+        return ', '.join(metrics)
+
+
+@contextmanager
+def timed(kind: str):
+    timing = current_timing.get()
+
+    if timing is None:
+        yield
+        return
+
+    timing.start()
+    started_at = time.perf_counter()
+
+    try:
+        yield
+    finally:
+        timing.stop(kind, time.perf_counter() - started_at)
+
+
+class Histogram:
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+
+class ProcessSnapshots:
+    # Each process writes its snapshot of a family of metrics to a file of its own in METRICS_DIR, and read() returns
+    # the snapshots of every process. The files of stopped processes are kept so the counters never go back, the
+    # directory is emptied when the machine restarts.
+    def __init__(self, family: str):
+        self.family = family
+        self._lock = threading.Lock()
+        self._written_at = 0.0
+        self._pid = None
+        self._file_name = None
+
+    def due(self) -> bool:
+        return time.monotonic() - self._written_at >= settings.METRICS_WRITE_SECONDS
+
+    def write(self, snapshot):
+        # The snapshot is taken under the lock, so an older one never replaces a newer one.
+        with self._lock:
+            data = snapshot()
+            self._written_at = time.monotonic()
+
+            if self._pid != os.getpid():
+                # A worker forked from a process that already wrote gets a file of its own.
+                self._pid = os.getpid()
+                self._file_name = f'{self.family}-{self._pid}-{uuid.uuid4().hex}.json'
+
+            os.makedirs(settings.METRICS_DIR, exist_ok=True)
+            path = os.path.join(settings.METRICS_DIR, self._file_name)
+
+            with open(f'{path}.tmp', 'w') as file:
+                json.dump(data, file)
+
+            # Readers see the previous snapshot or this one, never half of it.
+            os.replace(f'{path}.tmp', path)
+
+    def read(self) -> list:
+        if not os.path.isdir(settings.METRICS_DIR):
+            return []
+
+        snapshots = []
+
+        for file_name in os.listdir(settings.METRICS_DIR):
+            if not (file_name.startswith(f'{self.family}-') and file_name.endswith('.json')):
+                continue
+
+            try:
+                with open(os.path.join(settings.METRICS_DIR, file_name)) as file:
+                    snapshots.append(json.load(file))
+            except (OSError, ValueError):
+                continue
+
+        return snapshots
+
+
+class ProcessCounters:
+    # Counted in memory, written at most every METRICS_WRITE_SECONDS and summed over every process by totals().
+    def __init__(self, family: str):
+        self._lock = threading.Lock()
+        self._counts = Counter()
+        self._snapshots = ProcessSnapshots(family)
+
+    def incr(self, name: str):
+        with self._lock:
+            self._counts[name] += 1
+
+        if self._snapshots.due():
+            self.write()
+
+    def write(self):
+        self._snapshots.write(self._snapshot)
+
+    def totals(self) -> Counter:
+        self.write()
+        totals = Counter()
+
+        for snapshot in self._snapshots.read():
+            totals.update(snapshot)
+
+        return totals
+
+    def _snapshot(self) -> dict:
+        with self._lock:
+            return dict(self._counts)
+
+
+class RequestMetrics:
+    # Requests only take the lock once to record every histogram. The histograms of every process are summed, each
+    # one writes its own at most every METRICS_WRITE_SECONDS and before rendering.
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._snapshots = ProcessSnapshots('requests')
+
+    def observe(self, view: str, observations: dict):
+        with self._lock:
+            for name, _, buckets in METRICS:
+                histogram = self._histograms.get((name, view))
+
+                if histogram is None:
+                    histogram = self._histograms[(name, view)] = Histogram(buckets)
+
+                histogram.observe(observations[name])
+
+        if self._snapshots.due():
+            self.write()
+
+    def write(self):
+        self._snapshots.write(self._snapshot)
+
+    def collect(self) -> dict:
+        self.write()
+        histograms = {}
+
+        for snapshot in self._snapshots.read():
+            for name, view, counts, total in snapshot:
+                if (name, view) in histograms:
+                    summed_counts, summed_total = histograms[(name, view)]
+                    counts = [a + b for a, b in zip(summed_counts, counts)]
+                    total += summed_total
+
+                histograms[(name, view)] = (counts, total)
+
+        return histograms
+
+    def render(self) -> str:
+        histograms = self.collect()
+        lines = []
+
+        for name, description, buckets in METRICS:
+            lines += [f'# HELP {name} {description}', f'# TYPE {name} histogram']
+
+            for (metric, view), (counts, total) in sorted(histograms.items()):
+                if metric != name:
+                    continue
+
+                cumulative = 0
+                for bound, count in zip([*map(str, buckets), '+Inf'], counts):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{view="{view}",le="{bound}"}} {cumulative}')
+
+                lines.append(f'{name}_sum{{view="{view}"}} {total}')
+                lines.append(f'{name}_count{{view="{view}"}} {cumulative}')
+
+        return '\n'.join(lines) + '\n'
+
+    def _snapshot(self) -> list:
+        with self._lock:
+            return [[name, view, list(histogram.counts), histogram.sum]
+                    for (name, view), histogram in self._histograms.items()]
+
+
+request_metrics = RequestMetrics()
+atexit.register(request_metrics.write)
+
+
+class ServerTimingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timing = RequestTiming()
+        token = current_timing.set(timing)
+        started_at = time.perf_counter()
+
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(timing.execute))
+
+                response = self.get_response(request)
+        finally:
+            current_timing.reset(token)
+
+        # A streaming response runs most of its queries after this point, only the time until then is recorded.
+        total = time.perf_counter() - started_at
+        view = request.resolver_match.view_name if request.resolver_match else 'unmatched'
+        request_metrics.observe(view, timing.observations(total))
+        response['Server-Timing'] = timing.header(total)
+        return response
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        with timed('template'):
+            return super().render(context, request)
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return TimedTemplate(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
+
+
+def metrics(request):
+    return HttpResponse(request_metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
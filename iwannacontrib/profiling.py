@@ -0,0 +1,322 @@
+import itertools
+import json
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+from functools import wraps
+
+from django.conf import settings
+from django.core import signing
+from django.http import Http404, HttpResponse, HttpResponseForbidden, JsonResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+TOKEN_HEADER = 'X-Profile-Token'
+TOKEN_SALT = 'iwannacontrib.profiling'
+PROFILE_ID = re.compile(r'\d+-[0-9a-f]+-\d+')
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def profiling_token() -> str:
+    return signing.TimestampSigner(salt=TOKEN_SALT).sign('profile')
+
+
+def valid_token(token: str) -> bool:
+    try:
+        signing.TimestampSigner(salt=TOKEN_SALT).unsign(token, max_age=settings.PROFILING_TOKEN_MAX_AGE)
+    except signing.BadSignature:
+        return False
+
+    return True
+
+
+def collapse(frame) -> str:
+    # Root first and separated by semicolons, the format flamegraph.pl and speedscope read.
+    frames = []
+
+    while frame is not None:
+        code = frame.f_code
+        filename = os.path.relpath(code.co_filename, ROOT) if code.co_filename.startswith(ROOT) else code.co_filename
+        frames.append(f'{filename}:{code.co_name}'.replace(' ', '_').replace(';', '_'))
+        frame = frame.f_back
+
+    return ';'.join(reversed(frames))
+
+
+class ProfiledRequest:
+    def __init__(self, thread_id: int, forced: bool, threshold: float = None):
+        self.thread_id = thread_id
+        self.forced = forced
+        self.started_at = time.perf_counter()
+        self.sample_after = self.started_at if forced else self.started_at + threshold
+        self.stacks = Counter()
+
+    @property
+    def samples(self) -> int:
+        return sum(self.stacks.values())
+
+
+class Profile:
+    def __init__(self, profile_id: str, method: str, path: str, view: str, status: int, seconds: float, forced: bool,
+                 stacks: Counter, created_at: datetime = None):
+        self.id = profile_id
+        self.method = method
+        self.path = path
+        self.view = view
+        self.status = status
+        self.seconds = seconds
+        self.forced = forced
+        self.stacks = stacks
+        self.samples = sum(stacks.values())
+        self.created_at = created_at or timezone.now()
+
+    @classmethod
+    def load(cls, data: dict) -> 'Profile':
+        return cls(data['id'], data['method'], data['path'], data['view'], data['status'], data['seconds'],
+                   data['forced'], Counter(dict(data['stacks'])), parse_datetime(data['created_at']))
+
+    def dump(self) -> dict:
+        return dict(self.summary(), stacks=self.stacks.most_common())
+
+    def summary(self) -> dict:
+        return dict(
+            id=self.id,
+            method=self.method,
+            path=self.path,
+            view=self.view,
+            status=self.status,
+            seconds=round(self.seconds, 4),
+            samples=self.samples,
+            forced=self.forced,
+            created_at=self.created_at.isoformat(),
+        )
+
+    def collapsed(self) -> str:
+        return ''.join(f'{stack} {count}\n' for stack, count in self.stacks.most_common())
+
+
+def profiles_dir() -> str:
+    return os.path.join(settings.METRICS_DIR, 'profiles')
+
+
+class StackSampler:
+    # One daemon thread samples every watched request once it is due, and sleeps while none is.
+    # Reading another thread's frame is what sys._current_frames is for, the request itself does no extra work.
+    # Profiles are files in profiles_dir(), so every worker lists and serves the profiles of the others, and the
+    # directory keeps the max_profiles most recent of all of them.
+    def __init__(self, interval: float, max_profiles: int):
+        self.interval = interval
+        self.max_profiles = max_profiles
+        self._requests = {}
+        self._ids = itertools.count(1)
+        self._pid = None
+        self._process_id = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def watch(self, forced: bool, threshold: float = None) -> ProfiledRequest:
+        request = ProfiledRequest(threading.get_ident(), forced, threshold)
+
+        with self._lock:
+            self._requests[request.thread_id] = request
+
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+                self._thread.start()
+
+        self._wake.set()
+        return request
+
+    def finish(self, request: ProfiledRequest, method: str, path: str, view: str, status: int):
+        seconds = time.perf_counter() - request.started_at
+
+        with self._lock:
+            self._requests.pop(request.thread_id, None)
+
+            if not request.samples:
+                return None
+
+            if self._pid != os.getpid():
+                # The pid and a random part keep the ids unique across workers, even when a pid is reused.
+                self._pid = os.getpid()
+                self._process_id = f'{self._pid}-{uuid.uuid4().hex[:8]}'
+
+            profile_id = f'{self._process_id}-{next(self._ids)}'
+
+        profile = Profile(profile_id, method, path, view, status, seconds, request.forced, request.stacks)
+        self._store(profile)
+        return profile
+
+    def get(self, profile_id: str):
+        if not PROFILE_ID.fullmatch(profile_id):
+            return None
+
+        try:
+            with open(os.path.join(profiles_dir(), f'{profile_id}.json')) as file:
+                return Profile.load(json.load(file))
+        except (OSError, ValueError):
+            return None
+
+    def recent(self) -> list:
+        profiles = []
+
+        for file_name in self._file_names():
+            profile = self.get(file_name[:-len('.json')])
+
+            if profile is not None:
+                profiles.append(profile)
+
+        return profiles
+
+    def _store(self, profile: Profile):
+        directory = profiles_dir()
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f'{profile.id}.json')
+
+        with open(f'{path}.tmp', 'w') as file:
+            json.dump(profile.dump(), file)
+
+        os.replace(f'{path}.tmp', path)
+
+        for file_name in self._file_names()[self.max_profiles:]:
+            try:
+                os.remove(os.path.join(directory, file_name))
+            except FileNotFoundError:
+                # Another worker removed it first.
+                pass
+
+    @staticmethod
+    def _file_names() -> list:
+        # The most recent first.
+        directory = profiles_dir()
+        modified_at = {}
+
+        try:
+            file_names = os.listdir(directory)
+        except FileNotFoundError:
+            return []
+
+        for file_name in file_names:
+            if file_name.endswith('.json'):
+                try:
+                    modified_at[file_name] = os.stat(os.path.join(directory, file_name)).st_mtime_ns
+                except FileNotFoundError:
+                    continue
+
+        return sorted(modified_at, key=modified_at.get, reverse=True)
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            now = time.perf_counter()
+
+            with self._lock:
+                requests = list(self._requests.values())
+
+                if not requests:
+                    self._wake.clear()
+                    continue
+
+                # Sampled under the lock, so a finished request never gets a sample after its profile was stored.
+                due = [request for request in requests if request.sample_after <= now]
+
+                if due:
+                    frames = sys._current_frames()
+
+                    for request in due:
+                        frame = frames.get(request.thread_id)
+
+                        if frame is not None:
+                            request.stacks[collapse(frame)] += 1
+
+                    del frames
+
+            if due:
+                time.sleep(self.interval)
+            else:
+                # Nothing slow yet, sleep until the first request crosses the threshold or a new one arrives.
+                self._wake.clear()
+                self._wake.wait(min(request.sample_after for request in requests) - now)
+                self._wake.set()
+
+
+_sampler = None
+_sampler_lock = threading.Lock()
+
+
+def get_stack_sampler() -> StackSampler:
+    global _sampler
+
+    with _sampler_lock:
+        if _sampler is None:
+            _sampler = StackSampler(settings.PROFILING_INTERVAL_SECONDS, settings.PROFILING_MAX_PROFILES)
+
+    return _sampler
+
+
+class ProfilingMiddleware:
+    # Requests are sampled when they carry a valid X-Profile-Token, or once they run past
+    # PROFILING_THRESHOLD_SECONDS. With no threshold set, other requests skip the profiler entirely.
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = request.headers.get(TOKEN_HEADER)
+        threshold = settings.PROFILING_THRESHOLD_SECONDS
+        forced = token is not None and valid_token(token)
+
+        if not forced and threshold is None:
+            return self.get_response(request)
+
+        sampler = get_stack_sampler()
+        profiled = sampler.watch(forced, threshold)
+        response = None
+
+        try:
+            response = self.get_response(request)
+        finally:
+            profile = sampler.finish(
+                profiled,
+                request.method,
+                request.path,
+                request.resolver_match.view_name if request.resolver_match else 'unmatched',
+                response.status_code if response is not None else 500
+            )
+
+        if profile is not None:
+            response['X-Profile-Id'] = str(profile.id)
+
+        return response
+
+
+def requires_profiling_token(view):
+    # The internal endpoints answer the holders of a profiling token only.
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not valid_token(request.headers.get(TOKEN_HEADER) or request.GET.get('token') or ''):
+            return HttpResponseForbidden()
+
+        return view(request, *args, **kwargs)
+
+    return wrapper
+
+
+@requires_profiling_token
+def profiles(request):
+    return JsonResponse({'profiles': [profile.summary() for profile in get_stack_sampler().recent()]})
+
+
+@requires_profiling_token
+def collapsed_profile(request, profile_id: str):
+    profile = get_stack_sampler().get(profile_id)
+
+    if profile is None:
+        raise Http404()
+
+    return HttpResponse(profile.collapsed(), content_type='text/plain; charset=utf-8')
@@ -0,0 +1,113 @@
+import random
+import time
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.db import connections
+
+PRIMARY = 'default'
+PRIMARY_UNTIL_COOKIE = 'primary_until'
+# Sessions are written on one request and read on the next, a replica behind would lose them.
+PRIMARY_ONLY_APPS = {'sessions'}
+
+current_routing = ContextVar('current_routing', default=None)
+
+
+class RequestRouting:
+    def __init__(self, pinned: bool):
+        self.pinned = pinned
+        self.wrote = False
+        self.replica_reads = False
+
+
+def reading_from_replica() -> bool:
+    routing = current_routing.get()
+
+    return bool(
+        settings.DATABASE_REPLICAS and routing is not None and routing.replica_reads and not routing.pinned
+        and not connections[PRIMARY].in_atomic_block
+    )
+
+
+class ReplicaRouter:
+    # Only the views marked with reads_from_replica read from a replica, everything else stays on the primary.
+    # Every query gets an explicit alias, so an instance read from a replica is still saved on the primary.
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label not in PRIMARY_ONLY_APPS and reading_from_replica():
+            return random.choice(settings.DATABASE_REPLICAS)
+
+        return PRIMARY
+
+    def db_for_write(self, model, **hints):
+        routing = current_routing.get()
+
+        if routing is not None:
+            # The rest of the request reads what it just wrote, and the client stays on the primary for a while.
+            routing.wrote = routing.pinned = True
+
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        return db == PRIMARY
+
+
+def reads_from_replica(view):
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        routing = current_routing.get()
+
+        if routing is not None:
+            routing.replica_reads = True
+
+        return view(request, *args, **kwargs)
+
+    return wrapper
+
+
+class ReplicaRoutingMiddleware:
+    # A client that wrote gets a cookie pinning it to the primary until the replicas caught up with its write.
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return self.get_response(request)
+
+        try:
+            pinned = float(request.COOKIES.get(PRIMARY_UNTIL_COOKIE, 0)) > time.time()
+        except ValueError:
+            pinned = False
+
+        routing = RequestRouting(pinned)
+        token = current_routing.set(routing)
+
+        try:
+            response = self.get_response(request)
+        finally:
+            current_routing.reset(token)
+
+        if routing.wrote:
+            response.set_cookie(
+                PRIMARY_UNTIL_COOKIE,
+                str(time.time() + settings.REPLICA_MAX_LAG_SECONDS),
+                max_age=settings.REPLICA_MAX_LAG_SECONDS,
+                httponly=True,
+                samesite='Lax'
+            )
+
+        return response
+
+
+def copy_sqlite_database(source: str, target: str):
+    # Stands in for replication between two SQLite databases, the lag is the time between two copies.
+    for alias in (source, target):
+        if connections[alias].vendor != 'sqlite':
+            raise ValueError(f'{alias} is not a SQLite database')
+
+        connections[alias].ensure_connection()
+
+    connections[source].connection.backup(connections[target].connection)
@@ -10,7 +10,9 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/3.1/ref/settings/
 """
 import os
+import tempfile
 from pathlib import Path
+import dj_database_url
 import django_heroku
 
 
@@ -29,6 +31,9 @@ DEBUG = True
 
 ALLOWED_HOSTS = ['*']
 
+# Part of every ETag, so a new release invalidates pages rendered by the previous templates.
+RELEASE_VERSION = os.environ.get('HEROKU_RELEASE_VERSION', 'dev')
+
 
 # Application definition
 
@@ -40,12 +45,17 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'markdown_deux',
-    'issues',
-    'triage'
+    'issues.apps.IssuesConfig',
+    'triage.apps.TriageConfig'
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    # Answers the static files before the request timing, profiling and database routing.
+    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'iwannacontrib.profiling.ProfilingMiddleware',
+    'iwannacontrib.metrics.ServerTimingMiddleware',
+    'iwannacontrib.replicas.ReplicaRoutingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -58,7 +68,8 @@ ROOT_URLCONF = 'iwannacontrib.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates, timing every render for the Server-Timing header and the request metrics.
+        'BACKEND': 'iwannacontrib.metrics.TimedDjangoTemplates',
         'DIRS': [],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -82,9 +93,25 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'TEST': {
+            # A file database lets concurrency tests wait on SQLite locks instead of failing on them.
+            'NAME': BASE_DIR / 'test_db.sqlite3',
+        },
     }
 }
 
+# Read replicas, as comma separated database URLs. A local try is two SQLite files kept in sync by replicate_sqlite:
+# DATABASE_REPLICA_URLS=sqlite:////tmp/replica.sqlite3 python manage.py replicate_sqlite --lag 2
+for index, url in enumerate(filter(None, os.environ.get('DATABASE_REPLICA_URLS', '').split(','))):
+    DATABASES[f'replica_{index}'] = dict(dj_database_url.parse(url), TEST={'MIRROR': 'default'})
+
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['iwannacontrib.replicas.ReplicaRouter']
+
+# How far the replicas may be behind. A client that wrote reads from the primary for this long, and search pages
+# rendered from a replica are only cached for this long.
+REPLICA_MAX_LAG_SECONDS = 5
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.1/ref/settings/#auth-password-validators
@@ -119,10 +146,130 @@ USE_L10N = True
 USE_TZ = True
 
 
+# Cache
+# https://docs.djangoproject.com/en/3.1/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'search_results': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'search_results',
+        'TIMEOUT': 600,
+    },
+    'fragments': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'fragments',
+        'TIMEOUT': 24 * 60 * 60,
+        'OPTIONS': {
+            'MAX_ENTRIES': 50000,
+        },
+    },
+    # Rendered sitemaps are kept on disk, so every worker process of a machine shares them.
+    'sitemaps': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('SITEMAP_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'iwannacontrib-sitemaps')),
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    },
+    'github': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'github',
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    },
+}
+
+
+# Github
+
+GITHUB_API_URL = os.environ.get('GITHUB_API_URL', 'https://api.github.com')
+GITHUB_TOKEN = os.environ.get('GITHUB_TOKEN')
+GITHUB_POOL_SIZE = 10
+GITHUB_TIMEOUT = 10
+GITHUB_LANGUAGES_TTL = 24 * 60 * 60
+GITHUB_WEBHOOK_SECRET = os.environ.get('GITHUB_WEBHOOK_SECRET')
+
+
+# Github issue webhook
+
+ISSUE_WEBHOOK_BATCH_SIZE = 100
+ISSUE_WEBHOOK_FLUSH_SECONDS = 1
+
+
+# Rating
+
+# When enabled, votes are appended to a buffer and merged into the issue aggregates in batches.
+RATE_BUFFER_ENABLED = False
+RATE_BUFFER_BATCH_SIZE = 200
+RATE_BUFFER_FLUSH_SECONDS = 2
+
+
+# Issue creation jobs
+
+ISSUE_JOBS_EAGER = False
+ISSUE_JOBS_MAX_ATTEMPTS = 5
+ISSUE_JOBS_BACKOFF_SECONDS = 2
+ISSUE_JOBS_LEASE_SECONDS = 5 * 60
+ISSUE_JOBS_PENDING_REFRESH_SECONDS = 2
+
+
+# Search
+
+SEARCH_RESULTS_PAGE_SIZE = 50
+SEARCH_API_CHUNK_SIZE = 500
+
+
+# Sitemaps
+
+SITEMAP_SECTION_SIZE = 10000
+SITEMAP_REFRESH_SECONDS = 60
+SITEMAP_CACHE_SECONDS = 24 * 60 * 60
+# The sitemaps list absolute URLs, built from this setting rather than from the Host header of the request.
+# Required outside DEBUG, the sitemaps fail rather than list localhost URLs.
+SITEMAP_BASE_URL = os.environ.get('SITEMAP_BASE_URL', 'http://localhost:8000' if DEBUG else None)
+# Longer than the slowest write transaction, a row committed later than this after its updated_at can be missed.
+SITEMAP_REFRESH_WINDOW_SECONDS = 60
+
+
+# Lookup tables
+
+# How long a worker serves its copy of the languages and rates before checking the table version again.
+LOOKUP_CACHE_SECONDS = 5
+
+
+# Metrics
+
+# Every process writes its request histograms there, /metrics sums them. Keep it on the machine's local disk.
+METRICS_DIR = os.environ.get('METRICS_DIR', os.path.join(tempfile.gettempdir(), 'iwannacontrib-metrics'))
+METRICS_WRITE_SECONDS = 1
+
+
+# Profiling
+
+# Requests slower than this are sampled and kept as profiles, None only profiles requests with a profiling token.
+PROFILING_THRESHOLD_SECONDS = None
+PROFILING_INTERVAL_SECONDS = 0.005
+# The profiles of every process are kept in the profiles directory of METRICS_DIR, the most recent of them all.
+PROFILING_MAX_PROFILES = 20
+PROFILING_TOKEN_MAX_AGE = 60 * 60
+
+
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/3.1/howto/static-files/
 
 STATIC_URL = '/static/'
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+# collectstatic minifies the stylesheets, names every file after its content and precompresses it. WhiteNoise serves
+# the hashed names with a far-future immutable Cache-Control. The test runner keeps the plain names, the tests don't
+# run collectstatic.
+STATICFILES_STORAGE = 'iwannacontrib.staticfiles.MinifiedCompressedManifestStorage'
+
+TEST_RUNNER = 'iwannacontrib.test_runner.TestRunner'
 
 if not os.environ.get('CI'):
-    django_heroku.settings(locals())
+    django_heroku.settings(locals(), staticfiles=False, test_runner=False)
@@ -0,0 +1,21 @@
+import tempfile
+
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+from iwannacontrib.staticfiles import UNCOLLECTED_STORAGE
+
+
+class TestRunner(DiscoverRunner):
+    # The tests don't run collectstatic, so they link the plain names of the static files whatever the environment.
+    # Their metrics go to a directory of their own, away from the ones of a server running on the same machine.
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._metrics_dir = tempfile.TemporaryDirectory()
+        self._settings = override_settings(STATICFILES_STORAGE=UNCOLLECTED_STORAGE, METRICS_DIR=self._metrics_dir.name)
+        self._settings.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._settings.disable()
+        self._metrics_dir.cleanup()
+        super().teardown_test_environment(**kwargs)
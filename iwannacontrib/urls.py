@@ -1,10 +1,21 @@
 from django.contrib import admin
 from django.urls import path, include
 
-from triage.views import home
+from issues.views import sitemap_index, sitemap_section
+from iwannacontrib.metrics import metrics
+from iwannacontrib.profiling import profiles, collapsed_profile
+from triage.views import home, results, search_api, search_cache_stats
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('issues/', include('issues.urls', namespace='issues')),
+    path('sitemap.xml', sitemap_index, name='sitemap'),
+    path('sitemap-issues-<int:number>.xml', sitemap_section, name='sitemap_section'),
+    path('results', results, name='results'),
+    path('api/search.ndjson', search_api, name='search_api'),
+    path('search-cache-stats', search_cache_stats, name='search_cache_stats'),
+    path('metrics', metrics, name='metrics'),
+    path('profiles', profiles, name='profiles'),
+    path('profiles/<slug:profile_id>.folded', collapsed_profile, name='collapsed_profile'),
     path('', home, name='home')
 ]
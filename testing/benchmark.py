@@ -0,0 +1,239 @@
+import json
+import os
+import time
+import tracemalloc
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from random import Random
+from typing import List
+
+from django.core.cache import caches
+from django.db import connection
+from django.db.models import Max
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from issues.models import Issue
+from testing.catalog import LANGUAGE_WEIGHTS, CatalogGenerator
+from testing.fake_github import FakeGithub
+from triage.cache import SEARCH_RESULTS_CACHE
+from triage.models import COMPLEXITY_LEVEL
+
+SCENARIOS = ['home', 'show_issue', 'rate', 'create_issue']
+# The pages answer 200, the forms redirect. Anything else is an error measured as a fast request.
+EXPECTED_STATUSES = {'home': 200, 'show_issue': 200, 'rate': 302, 'create_issue': 302}
+BASELINES_PATH = os.path.join(os.path.dirname(__file__), 'benchmark_baselines.json')
+
+GITHUB_OWNER = 'fake-github-owner'
+GITHUB_REPOSITORY = 'created-issues'
+
+
+def seed_catalog(size: int, seed: int = 0) -> int:
+    # Only adds the issues missing to reach `size`, so a kept benchmark database is seeded once per size.
+    generator = CatalogGenerator(seed=seed, prefix='benchmark-')
+    missing = size - generator.existing_issues()
+
+    if missing <= 0:
+        return 0
+
+    generator.generate(missing)
+    return missing
+
+
+def percentile(values: list, fraction: float) -> float:
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)] if values else 0
+
+
+class ScenarioResult:
+    def __init__(self, name: str, latencies: list, queries: list, statuses: Counter, elapsed: float,
+                 peak_memory: int):
+        self.name = name
+        self.latencies = latencies
+        self.queries = queries
+        self.statuses = statuses
+        self.elapsed = elapsed
+        self.peak_memory = peak_memory
+
+    @property
+    def requests_per_second(self) -> float:
+        return len(self.latencies) / self.elapsed if self.elapsed else 0
+
+    @property
+    def queries_per_request(self) -> float:
+        return sum(self.queries) / len(self.queries) if self.queries else 0
+
+    def latency_ms(self, fraction: float) -> float:
+        return percentile(self.latencies, fraction) * 1000
+
+    def as_baseline(self) -> dict:
+        return {
+            'p95_ms': round(self.latency_ms(0.95), 2),
+            'queries_per_request': round(self.queries_per_request, 2),
+            'peak_memory_kib': round(self.peak_memory / 1024, 1),
+        }
+
+
+class BenchmarkSuite:
+    # Drives the views through Django's test client from several threads, each request on its own connection
+    # like the server does with CONN_MAX_AGE = 0. Issue creation goes through the fake Github.
+    def __init__(self, fake: FakeGithub, requests: int = 200, concurrency: int = 8, memory_requests: int = 20,
+                 seed: int = 0):
+        self.fake = fake
+        self.requests = requests
+        self.concurrency = concurrency
+        self.memory_requests = memory_requests
+        self.random = Random(seed)
+
+    def run(self, scenarios: List[str] = None) -> List[ScenarioResult]:
+        return [self.run_scenario(name) for name in scenarios or SCENARIOS]
+
+    def run_scenario(self, name: str) -> ScenarioResult:
+        planned = getattr(self, f'_plan_{name}')(self.requests + self.memory_requests)
+        caches[SEARCH_RESULTS_CACHE].clear()
+
+        started_at = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            responses = list(executor.map(self._send, planned[:self.requests]))
+
+        elapsed = time.perf_counter() - started_at
+
+        # Measured apart from the timed run, tracing allocations slows every request down.
+        tracemalloc.start()
+        try:
+            for request in planned[self.requests:]:
+                self._send(request)
+            _, peak_memory = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        return ScenarioResult(
+            name=name,
+            latencies=[latency for _, latency, _ in responses],
+            queries=[queries for _, _, queries in responses],
+            statuses=Counter(status for status, _, _ in responses),
+            elapsed=elapsed,
+            peak_memory=peak_memory,
+        )
+
+    @staticmethod
+    def _send(request) -> tuple:
+        method, path, data = request
+        client = Client(raise_request_exception=False)
+
+        try:
+            with CaptureQueriesContext(connection) as queries:
+                started_at = time.perf_counter()
+                response = getattr(client, method)(path, data)
+
+                if response.streaming:
+                    b''.join(response.streaming_content)
+
+                latency = time.perf_counter() - started_at
+
+            return response.status_code, latency, len(queries)
+        finally:
+            connection.close()
+
+    def _sample_issues(self, count: int) -> list:
+        bounds = Issue.objects.aggregate(last=Max('id'))
+        ids = [self.random.randint(1, bounds['last'] or 1) for _ in range(count * 2)]
+        issues = list(Issue.objects.filter(id__in=ids).select_related('repository'))
+
+        return [self.random.choice(issues) for _ in range(count)] if issues else []
+
+    def _plan_home(self, count: int) -> list:
+        levels = ['all', ''] + [str(level) for level, _ in COMPLEXITY_LEVEL]
+
+        return [
+            ('get', reverse('home'), {
+                'language': self.random.choice(list(LANGUAGE_WEIGHTS)),
+                'rate': self.random.choice(levels),
+            })
+            for _ in range(count)
+        ]
+
+    def _plan_show_issue(self, count: int) -> list:
+        return [('get', issue.get_url(), {}) for issue in self._sample_issues(count)]
+
+    def _plan_rate(self, count: int) -> list:
+        return [
+            ('post', issue.get_rate_url(), {'rate': self.random.randint(1, len(COMPLEXITY_LEVEL))})
+            for issue in self._sample_issues(count)
+        ]
+
+    def _plan_create_issue(self, count: int) -> list:
+        last_number = Issue.objects.filter(
+            repository__owner__owner=GITHUB_OWNER, repository__name=GITHUB_REPOSITORY
+        ).aggregate(last=Max('number'))['last'] or 0
+        numbers = range(last_number + 1, last_number + count + 1)
+
+        for number in numbers:
+            self.fake.add_issue(GITHUB_OWNER, GITHUB_REPOSITORY, number, title=f'Benchmark issue {number}')
+
+        return [
+            ('post', reverse('issues:create'), {
+                'url': f'https://github.com/{GITHUB_OWNER}/{GITHUB_REPOSITORY}/issues/{number}',
+            })
+            for number in numbers
+        ]
+
+
+def load_baselines(path: str = BASELINES_PATH) -> dict:
+    if not os.path.exists(path):
+        return {}
+
+    with open(path) as baselines:
+        return json.load(baselines)
+
+
+def save_baselines(results: List[ScenarioResult], size: int, path: str = BASELINES_PATH):
+    baselines = load_baselines(path)
+    baselines.update({baseline_key(result.name, size): result.as_baseline() for result in results})
+
+    with open(path, 'w') as output:
+        json.dump(baselines, output, indent=2, sort_keys=True)
+        output.write('\n')
+
+
+def baseline_key(name: str, size: int) -> str:
+    return f'{name}@{size}'
+
+
+def unexpected_statuses(results: List[ScenarioResult]) -> List[str]:
+    return [
+        f'{result.name} answered {status} to {count} requests, it should answer {EXPECTED_STATUSES[result.name]}'
+        for result in results
+        for status, count in sorted(result.statuses.items())
+        if status != EXPECTED_STATUSES[result.name]
+    ]
+
+
+def find_regressions(results: List[ScenarioResult], baselines: dict, size: int, tolerance: float) -> List[str]:
+    regressions = unexpected_statuses(results)
+
+    for result in results:
+        baseline = baselines.get(baseline_key(result.name, size))
+
+        if baseline is None:
+            continue
+
+        current = result.as_baseline()
+
+        # Latency and memory vary between runs, so they get some slack. Query counts should not move at all.
+        limits = {
+            'p95_ms': baseline['p95_ms'] * (1 + tolerance),
+            'queries_per_request': baseline['queries_per_request'] + 0.5,
+            'peak_memory_kib': baseline['peak_memory_kib'] * (1 + tolerance),
+        }
+
+        for metric, limit in limits.items():
+            if current[metric] > limit:
+                regressions.append(
+                    f'{baseline_key(result.name, size)} {metric} is {current[metric]}, the baseline is '
+                    f'{baseline[metric]}'
+                )
+
+    return regressions
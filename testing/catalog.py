@@ -0,0 +1,179 @@
+import time
+from bisect import bisect
+from html import escape
+from itertools import accumulate
+from random import Random
+
+from django.db.models import Max
+
+from issues.models import Issue, Owner, Repository
+from issues.rendering import RENDERER_VERSION
+from triage.facets import reconcile_facet_counts
+from triage.lookups import languages, rates
+from triage.models import COMPLEXITY_LEVEL
+
+# Roughly the share of issues per language on Github.
+LANGUAGE_WEIGHTS = {
+    'JavaScript': 20, 'Python': 17, 'Java': 11, 'TypeScript': 9, 'Go': 7, 'C++': 6, 'Ruby': 5, 'PHP': 5,
+    'C': 4, 'C#': 4, 'Rust': 3, 'Kotlin': 2, 'Swift': 2, 'Shell': 2, 'Other': 3,
+}
+WORDS = ('the a to of and in is it for on with when not this crash error fails parser docs typo timeout unicode '
+         'windows linux memory leak release test cache login search upload theme migration api refactor slow '
+         'flaky build install config plugin version support request response null value missing update').split()
+CORPUS_SIZE = 200000
+ISSUES_PER_REPOSITORY = 20
+REPOSITORIES_PER_OWNER = 3
+MEDIAN_BODY_SIZE = 600
+MAX_BODY_SIZE = 20000
+OPEN_SHARE = 0.85
+UNRATED_SHARE = 0.6
+
+
+class CatalogReport:
+    def __init__(self, owners: int, repositories: int, issues: int, elapsed: float):
+        self.owners = owners
+        self.repositories = repositories
+        self.issues = issues
+        self.elapsed = elapsed
+
+    @property
+    def issues_per_minute(self) -> float:
+        return self.issues * 60 / self.elapsed if self.elapsed else 0
+
+
+class CatalogGenerator:
+    # Writes synthetic issues with bulk_create. The same seed always produces the same catalog.
+    # Owners and repositories follow a long tail, a repository has one language and most issues have no votes.
+    def __init__(self, seed: int = 0, batch_size: int = 5000, prefix: str = 'generated-'):
+        self.seed = seed
+        self.batch_size = batch_size
+        self.prefix = prefix
+
+    def existing_issues(self) -> int:
+        return Issue.objects.filter(repository__owner__owner__startswith=self.prefix).count()
+
+    def generate(self, issues: int, repositories: int = None) -> CatalogReport:
+        started_at = time.perf_counter()
+        existing = self.existing_issues()
+        random = Random(f'{self.seed}:{existing}')
+        repositories = repositories or max(1, (existing + issues) // ISSUES_PER_REPOSITORY)
+        owners = -(-repositories // REPOSITORIES_PER_OWNER)
+
+        repository_rows, repository_weights = self._repositories(owners, repositories)
+        last_numbers = dict(
+            Issue.objects.filter(repository__owner__owner__startswith=self.prefix).values('repository_id').annotate(
+                last=Max('number')
+            ).values_list('repository_id', 'last')
+        )
+        repository_languages = self._repository_languages(repository_rows)
+        rate_ids = {level: rates.get_or_create(level).id for level, _ in COMPLEXITY_LEVEL}
+        corpus = self._corpus(random)
+
+        for start in range(0, issues, self.batch_size):
+            batch = random.choices(repository_rows, cum_weights=repository_weights,
+                                   k=min(self.batch_size, issues - start))
+
+            # Ids instead of instances skip the related descriptors, which matters at this many rows.
+            Issue.objects.bulk_create([
+                self._issue(repository.id, repository_languages[repository.id], last_numbers, rate_ids, corpus, random)
+                for repository in batch
+            ])
+
+        reconcile_facet_counts(Issue.objects.open())
+        return CatalogReport(owners, repositories, issues, time.perf_counter() - started_at)
+
+    def _repositories(self, owners: int, repositories: int):
+        # Weights come from a generator of their own, so growing a catalog keeps the weight of every repository.
+        weights = Random(self.seed)
+        owner_weights = list(accumulate(weights.paretovariate(1.2) for _ in range(owners)))
+        owner_names = [f'{self.prefix}owner-{index}' for index in range(owners)]
+
+        Owner.objects.bulk_create([Owner(owner=name) for name in owner_names], ignore_conflicts=True)
+        Repository.objects.bulk_create(
+            [
+                Repository(owner_id=owner_names[self._owner_index(owner_weights, index)],
+                           name=f'{self.prefix}repository-{index}')
+                for index in range(repositories)
+            ],
+            ignore_conflicts=True
+        )
+
+        rows = {
+            repository.name: repository
+            for repository in Repository.objects.filter(owner__owner__startswith=self.prefix)
+        }
+        weights = Random(self.seed + 1)
+        ordered = [rows[f'{self.prefix}repository-{index}'] for index in range(repositories)]
+
+        return ordered, list(accumulate(weights.paretovariate(1.1) for _ in ordered))
+
+    def _owner_index(self, owner_weights: list, index: int) -> int:
+        # The owner depends on the repository index alone, so growing a catalog never moves a repository.
+        # A repository picks among the owners that existed when it was the last one, with a generator of its own.
+        candidates = index // REPOSITORIES_PER_OWNER + 1
+        picked = Random(f'{self.seed}:repository-{index}').random() * owner_weights[candidates - 1]
+
+        return min(bisect(owner_weights, picked, 0, candidates), candidates - 1)
+
+    def _repository_languages(self, repository_rows: list) -> dict:
+        names = list(LANGUAGE_WEIGHTS)
+        language_rows = {name: languages.get_or_create(name) for name in names}
+        chooser = Random(self.seed + 2)
+
+        return {
+            repository.id: language_rows[chooser.choices(names, weights=list(LANGUAGE_WEIGHTS.values()))[0]].id
+            for repository in repository_rows
+        }
+
+    @staticmethod
+    def _corpus(random: Random) -> str:
+        # Bodies are slices of one long text, which is much faster than joining words for every issue.
+        words = []
+        size = 0
+
+        while size < CORPUS_SIZE + MAX_BODY_SIZE:
+            word = random.choice(WORDS)
+            words.append(word)
+            size += len(word) + 1
+
+        return ' '.join(words)
+
+    @staticmethod
+    def _issue(repository_id: int, language_id: int, last_numbers: dict, rate_ids: dict, corpus: str,
+               random: Random) -> Issue:
+        # Pull requests share the numbering with issues, so the numbers of a repository have gaps.
+        number = last_numbers.get(repository_id, 0) + 1 + int(random.expovariate(0.5))
+        last_numbers[repository_id] = number
+
+        body_size = min(int(random.lognormvariate(0, 1) * MEDIAN_BODY_SIZE), MAX_BODY_SIZE)
+        body_start = random.randrange(CORPUS_SIZE)
+        body = corpus[body_start:body_start + body_size]
+        title_start = random.randrange(CORPUS_SIZE)
+        title = corpus[title_start:title_start + random.randint(20, 80)].strip().capitalize()
+
+        histogram = {level: 0 for level, _ in COMPLEXITY_LEVEL}
+
+        if random.random() >= UNRATED_SHARE:
+            # Few issues get many votes, and voters agree around the medium levels.
+            for _ in range(1 + int(random.paretovariate(1.5))):
+                histogram[round(random.triangular(1, 5, 2.5))] += 1
+
+        rate_votes = sum(histogram.values())
+        rate_sum = sum(level * votes for level, votes in histogram.items())
+        current_rate_level = round(rate_sum / rate_votes) if rate_votes else None
+
+        return Issue(
+            repository_id=repository_id,
+            number=number,
+            name=title,
+            body=body,
+            body_html=f'<p>{escape(body)}</p>',
+            body_html_version=RENDERER_VERSION,
+            state=Issue.OPEN if random.random() < OPEN_SHARE else Issue.CLOSED,
+            main_language_id=language_id,
+            current_rate_id=rate_ids.get(current_rate_level),
+            current_rate_level=current_rate_level,
+            rate_sum=rate_sum,
+            rate_votes=rate_votes,
+            **{Issue.rate_votes_field(level): votes for level, votes in histogram.items()}
+        )
@@ -0,0 +1,171 @@
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from urllib.parse import parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.core.cache import caches
+
+from issues.services.github_client import GithubClient, GITHUB_CACHE
+
+ISSUE_PATH = re.compile(r'^/repos/(?P<owner>[^/]+)/(?P<repository>[^/]+)/issues/(?P<number>\d+)$')
+REPOSITORY_ISSUES_PATH = re.compile(r'^/repos/(?P<owner>[^/]+)/(?P<repository>[^/]+)/issues$')
+LANGUAGES_PATH = re.compile(r'^/repos/(?P<owner>[^/]+)/(?P<repository>[^/]+)/languages$')
+
+
+class FakeGithubHandler(BaseHTTPRequestHandler):
+    server: 'FakeGithubServer'
+
+    def do_GET(self):
+        fake = self.server.fake
+        path, _, query = self.path.partition('?')
+        fake.record(path)
+
+        if fake.latency:
+            time.sleep(fake.latency)
+
+        issue_match = ISSUE_PATH.match(path)
+        if issue_match:
+            return self._respond(fake.issue_payload(
+                issue_match.group('owner'),
+                issue_match.group('repository'),
+                int(issue_match.group('number'))
+            ))
+
+        repository_issues_match = REPOSITORY_ISSUES_PATH.match(path)
+        if repository_issues_match:
+            return self._respond(fake.repository_issues_payload(
+                repository_issues_match.group('owner'),
+                repository_issues_match.group('repository'),
+                {name: values[0] for name, values in parse_qs(query).items()}
+            ))
+
+        languages_match = LANGUAGES_PATH.match(path)
+        if languages_match:
+            return self._respond(fake.languages.get(
+                (languages_match.group('owner'), languages_match.group('repository'))
+            ))
+
+        self._respond(None)
+
+    def _respond(self, payload):
+        body = json.dumps(payload if payload is not None else {'message': 'Not Found'}).encode()
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'
+
+        if payload is not None and self.headers.get('If-None-Match') == etag:
+            self.server.fake.record_not_modified()
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+
+        self.send_response(200 if payload is not None else 404)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        if payload is not None:
+            self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeGithubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, fake: 'FakeGithub'):
+        super().__init__(('127.0.0.1', 0), FakeGithubHandler)
+        self.fake = fake
+
+
+class FakeGithub:
+    def __init__(self, latency: float = 0):
+        self.latency = latency
+        self.issues = {}
+        self.languages = {}
+        self.requests = Counter()
+        self.not_modified = 0
+        self._lock = threading.Lock()
+        self._server = None
+
+    def add_issue(self, owner: str, repository: str, number: int, title='any title', body='any body',
+                  state='open', languages=None, updated_at: datetime = None):
+        updated_at = (updated_at or datetime.now(timezone.utc)).astimezone(timezone.utc)
+
+        self.issues[(owner, repository, number)] = dict(
+            title=title,
+            body=body,
+            state=state,
+            updated_at=updated_at.strftime('%Y-%m-%dT%H:%M:%SZ'),
+        )
+        self.languages.setdefault((owner, repository), languages or {'Python': 100})
+
+    def repository_issues_payload(self, owner: str, repository: str, params: dict):
+        if (owner, repository) not in self.languages:
+            return None
+
+        since = params.get('since', '')
+        per_page = int(params.get('per_page', 30))
+        page = int(params.get('page', 1))
+
+        issues = sorted(
+            (
+                self.issue_payload(owner, repository, number)
+                for issue_owner, issue_repository, number in self.issues
+                if (issue_owner, issue_repository) == (owner, repository)
+            ),
+            key=lambda issue: (issue['updated_at'], issue['number'])
+        )
+        issues = [issue for issue in issues if issue['updated_at'] >= since]
+
+        return issues[(page - 1) * per_page:page * per_page]
+
+    def issue_payload(self, owner: str, repository: str, number: int):
+        issue = self.issues.get((owner, repository, number))
+
+        if issue is None:
+            return None
+
+        return dict(
+            url=f'{self.base_url}/repos/{owner}/{repository}/issues/{number}',
+            html_url=f'https://github.com/{owner}/{repository}/issues/{number}',
+            number=number,
+            **issue
+        )
+
+    def record(self, path: str):
+        with self._lock:
+            self.requests[path] += 1
+
+    def record_not_modified(self):
+        with self._lock:
+            self.not_modified += 1
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address
+        return f'http://{host}:{port}'
+
+    def client(self, **kwargs) -> GithubClient:
+        return GithubClient(base_url=self.base_url, **kwargs)
+
+    def start(self) -> 'FakeGithub':
+        caches[GITHUB_CACHE].clear()
+        self._server = FakeGithubServer(self)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> 'FakeGithub':
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
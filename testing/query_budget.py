@@ -0,0 +1,30 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class QueryBudget(CaptureQueriesContext):
+    def __init__(self, budget: int):
+        super().__init__(connection)
+        self.budget = budget
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        super().__exit__(exc_type, exc_value, traceback)
+
+        if exc_type is not None:
+            return
+
+        if len(self) > self.budget:
+            queries = '\n'.join(f'{index}. {query["sql"]}' for index, query in enumerate(self.captured_queries, 1))
+            raise QueryBudgetExceeded(
+                f'{len(self)} queries executed, the budget is {self.budget}:\n{queries}'
+            )
+
+
+class QueryBudgetTestCase(TestCase):
+    def assertQueryBudget(self, budget: int) -> QueryBudget:
+        return QueryBudget(budget)
@@ -0,0 +1,36 @@
+import re
+
+from django.db import connection
+from django.test import TestCase
+
+FULL_SCAN_PATTERNS = {
+    'sqlite': r'\bSCAN (?P<table>\w+)(?! USING (COVERING )?INDEX)(?!\w)',
+    'postgresql': r'Seq Scan on (?P<table>\w+)',
+    'mysql': r'\btype=ALL\b',
+}
+
+FILESORT_PATTERNS = {
+    'sqlite': r'USE TEMP B-TREE FOR (ORDER BY|RIGHT PART OF ORDER BY|LAST TERM OF ORDER BY)',
+    'postgresql': r'^\s*(->\s*)?(Incremental )?Sort\b',
+    'mysql': r'Using filesort',
+}
+
+
+class QueryPlanTestCase(TestCase):
+    def explain(self, queryset) -> str:
+        return queryset.explain()
+
+    def assertIndexRangeScan(self, queryset, table: str):
+        plan = self.assertNoFullScan(queryset, table)
+
+        if re.search(FILESORT_PATTERNS[connection.vendor], plan, re.MULTILINE):
+            self.fail(f'Sort without index:\n{plan}')
+
+    def assertNoFullScan(self, queryset, table: str) -> str:
+        plan = self.explain(queryset)
+
+        for match in re.finditer(FULL_SCAN_PATTERNS[connection.vendor], plan, re.MULTILINE):
+            if match.groupdict().get('table', table) == table:
+                self.fail(f'Full scan on {table}:\n{plan}')
+
+        return plan
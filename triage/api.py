@@ -0,0 +1,45 @@
+import json
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.urls import reverse
+
+from triage.forms import SearchForm
+
+# Emitted field -> column, rows are read with values() so no Issue instance is built.
+API_FIELDS = {
+    'id': 'id',
+    'number': 'number',
+    'title': 'name',
+    'state': 'state',
+    'owner': 'repository__owner_id',
+    'repository': 'repository__name',
+    'language': 'main_language__name',
+    'rate': 'current_rate_level',
+    'created_at': 'created_at',
+    'updated_at': 'updated_at',
+}
+
+
+def search_ndjson(form: SearchForm):
+    encoder = DjangoJSONEncoder()
+    cursor_class = form.cursor_class
+
+    for rows in form.iterate_rows(API_FIELDS.values(), settings.SEARCH_API_CHUNK_SIZE):
+        yield ''.join(encoder.encode(_serialize(row, cursor_class)) + '\n' for row in rows)
+
+
+def errors_json(form: SearchForm) -> str:
+    return json.dumps({'errors': form.errors.get_json_data()})
+
+
+def _serialize(row: dict, cursor_class) -> dict:
+    issue = {field: row[column] for field, column in API_FIELDS.items()}
+    issue['url'] = reverse('issues:show', kwargs={
+        'owner': issue['owner'],
+        'repository': issue['repository'],
+        'number': issue['number'],
+    })
+    issue['cursor'] = cursor_class.after_row(row).encode()
+
+    return issue
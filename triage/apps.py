@@ -1,5 +1,23 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save, post_migrate
+
+
+def clear_lookups(**kwargs):
+    from triage.lookups import LOOKUPS
+
+    # A migrate or a flush can change the tables without sending post_save, so every cached copy is dropped.
+    for lookup in LOOKUPS.values():
+        lookup.clear()
 
 
 class TriageConfig(AppConfig):
     name = 'triage'
+
+    def ready(self):
+        from triage.lookups import LOOKUPS, invalidate_lookup
+
+        for model in LOOKUPS:
+            post_save.connect(invalidate_lookup, sender=model)
+            post_delete.connect(invalidate_lookup, sender=model)
+
+        post_migrate.connect(clear_lookups, sender=self)
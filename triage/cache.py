@@ -0,0 +1,73 @@
+import atexit
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.db.models import F
+
+from iwannacontrib.metrics import ProcessCounters
+from triage.models import SearchGeneration
+
+SEARCH_RESULTS_CACHE = 'search_results'
+LATEST_KEY = 'latest'
+ALL_RATES_KEY = 'all'
+NOT_RATED_KEY = 'not-rated'
+
+
+def rate_key(rate) -> str:
+    if rate == ALL_RATES_KEY:
+        return ALL_RATES_KEY
+
+    if not rate:
+        return NOT_RATED_KEY
+
+    return str(rate)
+
+
+def search_key(language_id: int, rate) -> str:
+    return f'{language_id}:{rate_key(rate)}'
+
+
+search_cache_counters = ProcessCounters('search_cache')
+atexit.register(search_cache_counters.write)
+
+
+# Pages are namespaced by a generation per (language, rate) search. Invalidating a search bumps its
+# generation, so every cached page of that search (one per cursor) is orphaned at once and expires on its own.
+# The pages are kept per process, the generations live in the database so a write in any process (a web worker,
+# the job worker, a sync) reaches them all.
+class SearchResultsCache:
+    def __init__(self):
+        self.cache = caches[SEARCH_RESULTS_CACHE]
+
+    def get_or_render(self, key: str, cursor: str, render, timeout=DEFAULT_TIMEOUT) -> str:
+        generation = self._generation(key)
+        page_key = f'search-results:{key}:{generation}:{cursor or ""}'
+
+        html = self.cache.get(page_key)
+
+        if html is not None:
+            search_cache_counters.incr('hits')
+            return html
+
+        search_cache_counters.incr('misses')
+        html = render()
+        self.cache.set(page_key, html, timeout)
+        return html
+
+    def invalidate_issue(self, language_id: int, *rates):
+        # Sorted, so concurrent invalidations lock the rows in the same order.
+        keys = sorted({LATEST_KEY, search_key(language_id, ALL_RATES_KEY)} |
+                      {search_key(language_id, rate) for rate in rates})
+
+        SearchGeneration.objects.bulk_create([SearchGeneration(key=key) for key in keys], ignore_conflicts=True)
+        SearchGeneration.objects.filter(key__in=keys).update(generation=F('generation') + 1)
+
+    @staticmethod
+    def stats() -> dict:
+        # Summed over every process, the pages themselves stay per process.
+        totals = search_cache_counters.totals()
+        return {'hits': totals['hits'], 'misses': totals['misses']}
+
+    @staticmethod
+    def _generation(key: str) -> int:
+        return SearchGeneration.objects.filter(key=key).values_list('generation', flat=True).first() or 0
@@ -0,0 +1,113 @@
+from collections import Counter
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+
+from triage.models import IssueFacetCount, ProgrammingLanguage, COMPLEXITY_LEVEL, NOT_RATED
+
+
+def facet_level(rate_level) -> int:
+    return rate_level or NOT_RATED
+
+
+class FacetCounts:
+    def __init__(self):
+        self.deltas = Counter()
+
+    def add(self, language_id: int, rate_level, delta: int = 1):
+        self.deltas[(language_id, facet_level(rate_level))] += delta
+
+    def move(self, language_id: int, from_rate_level, to_rate_level):
+        self.add(language_id, from_rate_level, -1)
+        self.add(language_id, to_rate_level)
+
+    def save(self):
+        # Rows are always touched in the same order, so concurrent writers cannot deadlock on them.
+        for (language_id, rate_level), delta in sorted(self.deltas.items()):
+            if delta:
+                _increment(language_id, rate_level, delta)
+
+        self.deltas.clear()
+
+
+def _increment(language_id: int, rate_level: int, delta: int):
+    counts = IssueFacetCount.objects.filter(language_id=language_id, rate_level=rate_level)
+
+    if counts.update(count=F('count') + delta):
+        return
+
+    try:
+        with transaction.atomic():
+            IssueFacetCount.objects.create(language_id=language_id, rate_level=rate_level, count=delta)
+    except IntegrityError:
+        counts.update(count=F('count') + delta)
+
+
+class SearchFacets:
+    def __init__(self, language: ProgrammingLanguage = None):
+        self.language = language
+        self._rows = list(IssueFacetCount.objects.filter(count__gt=0).select_related('language'))
+
+    @property
+    def languages(self):
+        counts = Counter()
+
+        for row in self._rows:
+            counts[row.language] += row.count
+
+        return sorted(counts.items(), key=lambda item: (-item[1], item[0].name))
+
+    @property
+    def levels(self):
+        counts = Counter()
+
+        for row in self._rows:
+            if self.language is None or row.language_id == self.language.id:
+                counts[row.rate_level] += row.count
+
+        return [(level, label, counts[level]) for level, label in COMPLEXITY_LEVEL]
+
+
+class FacetDrift:
+    def __init__(self, language: ProgrammingLanguage, rate_level: int, stored: int, actual: int):
+        self.language = language
+        self.rate_level = rate_level
+        self.stored = stored
+        self.actual = actual
+
+
+@transaction.atomic
+def reconcile_facet_counts(open_issues, fix: bool = True) -> list:
+    actual = Counter({
+        (row['main_language_id'], facet_level(row['current_rate_level'])): row['count']
+        for row in open_issues.values('main_language_id', 'current_rate_level').annotate(
+            count=Count('id')
+        ).order_by()
+    })
+    stored = {
+        (row.language_id, row.rate_level): row
+        for row in IssueFacetCount.objects.select_for_update()
+    }
+    languages = ProgrammingLanguage.objects.in_bulk({language_id for language_id, _ in actual.keys() | stored.keys()})
+    drifts = []
+
+    for key in sorted(actual.keys() | stored.keys()):
+        language_id, rate_level = key
+        row = stored.get(key)
+        stored_count = row.count if row is not None else 0
+
+        if stored_count == actual[key]:
+            continue
+
+        drifts.append(FacetDrift(languages[language_id], rate_level, stored_count, actual[key]))
+
+        if not fix:
+            continue
+
+        if row is None:
+            IssueFacetCount.objects.create(language_id=language_id, rate_level=rate_level, count=actual[key])
+        else:
+            row.count = actual[key]
+            row.save(update_fields=['count'])
+
+    return drifts
@@ -1,7 +1,17 @@
+from urllib.parse import urlencode
+
 from django import forms
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.forms.models import ModelChoiceIterator
+from django.utils.functional import cached_property
 
+from issues.fulltext import search_terms
 from issues.models import Issue
-from triage.models import ProgrammingLanguage, COMPLEXITY_LEVEL
+from triage.cache import LATEST_KEY, search_key
+from triage.lookups import LookupCache, languages
+from triage.models import COMPLEXITY_LEVEL
+from triage.pagination import Cursor, RankCursor, InvalidCursorException, paginate, page_queryset, iterate_rows
 
 COMPLEXITY_LEVEL_WITH_EMPTY = [
     (None, 'Not Rated'),
@@ -9,15 +19,136 @@ COMPLEXITY_LEVEL_WITH_EMPTY = [
 ] + COMPLEXITY_LEVEL
 
 
+class LookupChoiceIterator(ModelChoiceIterator):
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ('', self.field.empty_label)
+
+        for instance in self.field.lookup.all():
+            yield self.choice(instance)
+
+    def __len__(self):
+        return len(self.field.lookup.all()) + (self.field.empty_label is not None)
+
+    def __bool__(self):
+        return self.field.empty_label is not None or bool(self.field.lookup.all())
+
+
+class LookupChoiceField(forms.ModelChoiceField):
+    # Choices and validation are served by the process lookup cache instead of querying the table on every form.
+    iterator = LookupChoiceIterator
+
+    def __init__(self, lookup: LookupCache, **kwargs):
+        self.lookup = lookup
+        super().__init__(queryset=lookup.model.objects.all(), to_field_name=lookup.key_field, **kwargs)
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+
+        if isinstance(value, self.lookup.model):
+            value = getattr(value, self.lookup.key_field)
+
+        instance = self.lookup.get(value)
+
+        if instance is None:
+            raise ValidationError(self.error_messages['invalid_choice'], code='invalid_choice')
+
+        return instance
+
+
 class SearchForm(forms.Form):
-    language = forms.ModelChoiceField(queryset=ProgrammingLanguage.objects.all(), to_field_name='name', required=True)
+    language = LookupChoiceField(languages, required=True)
     rate = forms.ChoiceField(choices=COMPLEXITY_LEVEL_WITH_EMPTY, required=False, label="Difficult Level", initial='all')
+    q = forms.CharField(required=False, max_length=200, label='Keywords')
+
+    def __init__(self, *args, cursor: str = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cursor = cursor
+
+    def clean(self):
+        cleaned_data = super().clean()
+
+        if not self.cursor:
+            cleaned_data['cursor'] = None
+            return cleaned_data
+
+        try:
+            cleaned_data['cursor'] = self._cursor_class(cleaned_data).decode(self.cursor)
+        except InvalidCursorException as e:
+            raise ValidationError(f"Invalid page cursor. Found: {e.cursor}")
+
+        return cleaned_data
 
     @property
     def results(self):
+        return self._page[0]
+
+    @property
+    def next_cursor(self):
+        return self._page[1]
+
+    @property
+    def next_page_query(self):
+        if self.next_cursor is None:
+            return None
+
+        query = dict(
+            language=self.cleaned_data.get('language').name,
+            rate=self.cleaned_data.get('rate'),
+        )
+
+        if self._search_terms:
+            query.update(q=self.cleaned_data.get('q'))
+
+        return urlencode(dict(query, cursor=self.next_cursor.encode()))
+
+    @property
+    def cache_key(self) -> str:
+        if not self.is_valid():
+            return LATEST_KEY
+
+        return search_key(self.cleaned_data.get('language').id, self.cleaned_data.get('rate'))
+
+    @property
+    def page_key(self):
+        if not self.is_valid():
+            return None
+
+        if self._search_terms:
+            return urlencode(dict(q=' '.join(self._search_terms), cursor=self.cursor or ''))
+
+        return self.cursor
+
+    @property
+    def queryset(self):
         if not self.is_valid():
-            return Issue.objects.all().order_by('-created_at')[:20]
+            return Issue.objects.open().with_relations().order_by('-created_at', '-id')[:20]
 
+        return page_queryset(self._search_queryset(), self.cleaned_data.get('cursor'), self.page_size,
+                             self.cursor_class)
+
+    @property
+    def page_size(self) -> int:
+        return settings.SEARCH_RESULTS_PAGE_SIZE
+
+    @property
+    def cursor_class(self):
+        return self._cursor_class(self.cleaned_data)
+
+    def iterate_rows(self, fields, chunk_size: int):
+        return iterate_rows(self._search_queryset(), self.cleaned_data.get('cursor'), fields, chunk_size,
+                            self.cursor_class)
+
+    @cached_property
+    def _page(self):
+        if not self.is_valid():
+            return list(self.queryset), None
+
+        return paginate(self._search_queryset(), self.cleaned_data.get('cursor'), self.page_size,
+                        self.cursor_class)
+
+    def _search_queryset(self):
         rate = self._get_rate()
 
         query = dict(
@@ -25,9 +156,14 @@ class SearchForm(forms.Form):
         )
 
         if rate != 'all':
-            query.update(current_rate__rate=rate)
+            query.update(current_rate_level=rate)
+
+        issues = Issue.objects.open().with_relations().filter(**query)
+
+        if self._search_terms:
+            issues = issues.search(self.cleaned_data.get('q'))
 
-        return Issue.objects.filter(**query).order_by('-created_at')[:1000]
+        return issues
 
     @property
     def search_title(self):
@@ -52,3 +188,11 @@ class SearchForm(forms.Form):
             return None
 
         return rate
+
+    @property
+    def _search_terms(self):
+        return search_terms(self.cleaned_data.get('q'))
+
+    @staticmethod
+    def _cursor_class(cleaned_data):
+        return RankCursor if search_terms(cleaned_data.get('q')) else Cursor
@@ -0,0 +1,51 @@
+from issues.freshness import build_etag, has_pending_messages
+from issues.models import Issue
+
+
+def search_etag(request):
+    return _etag(request, _search_updated_at(request))
+
+
+def search_last_modified(request):
+    return _last_modified(request, _search_updated_at(request))
+
+
+# The home page also shows the facet counts of every language, so any issue change makes it stale.
+def home_etag(request):
+    return _etag(request, _updated_at(request, None))
+
+
+def home_last_modified(request):
+    return _last_modified(request, _updated_at(request, None))
+
+
+def _etag(request, updated_at):
+    if updated_at is None or has_pending_messages(request):
+        return None
+
+    return build_etag(f'search:{request.get_full_path()}', updated_at)
+
+
+def _last_modified(request, updated_at):
+    if has_pending_messages(request):
+        return None
+
+    return updated_at
+
+
+def _search_updated_at(request):
+    return _updated_at(request, request.GET.get('language'))
+
+
+def _updated_at(request, language):
+    memo = request.__dict__.setdefault('_search_updated_at', {})
+
+    if language not in memo:
+        issues = Issue.objects.all()
+
+        if language:
+            issues = issues.filter(main_language__name=language)
+
+        memo[language] = issues.order_by('-updated_at').values_list('updated_at', flat=True).first()
+
+    return memo[language]
@@ -0,0 +1,117 @@
+import threading
+import time
+from typing import Optional
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F
+
+from triage.models import IssueRate, LookupVersion, ProgrammingLanguage
+
+
+def table_version(table: str) -> int:
+    return LookupVersion.objects.filter(table=table).values_list('version', flat=True).first() or 0
+
+
+def bump_version(table: str):
+    if LookupVersion.objects.filter(table=table).update(version=F('version') + 1):
+        return
+
+    try:
+        with transaction.atomic():
+            LookupVersion.objects.create(table=table, version=1)
+    except IntegrityError:
+        LookupVersion.objects.filter(table=table).update(version=F('version') + 1)
+
+
+class LookupCache:
+    # A process local copy of a small table, keyed by one of its unique fields. Each process asks for the table
+    # version at most every LOOKUP_CACHE_SECONDS and reloads the rows when another process has changed them.
+    # Cached instances are shared between requests, so they must be treated as read only.
+    def __init__(self, model, key_field: str):
+        self.model = model
+        self.key_field = key_field
+        self.table = model._meta.db_table
+        self._rows = None
+        self._version = None
+        self._checked_at = None
+        self._lock = threading.Lock()
+
+    def get(self, key) -> Optional:
+        rows = self._current_rows()
+
+        if rows is None:
+            return self.model.objects.filter(**{self.key_field: key}).first()
+
+        return rows.get(key)
+
+    def get_many(self, keys) -> dict:
+        rows = self._current_rows()
+
+        if rows is None:
+            return {
+                getattr(row, self.key_field): row
+                for row in self.model.objects.filter(**{f'{self.key_field}__in': keys})
+            }
+
+        return {key: rows[key] for key in keys if key in rows}
+
+    def get_or_create(self, key):
+        rows = self._current_rows()
+
+        if rows is not None and key in rows:
+            return rows[key]
+
+        # Creating a row sends post_save, which invalidates every copy of the table.
+        return self.model.objects.get_or_create(**{self.key_field: key})[0]
+
+    def all(self) -> list:
+        rows = self._current_rows()
+
+        if rows is None:
+            return list(self.model.objects.order_by(self.key_field))
+
+        return [rows[key] for key in sorted(rows)]
+
+    def invalidate(self):
+        # Other processes see the new version once the change is committed, this one reloads on its next access.
+        transaction.on_commit(lambda: bump_version(self.table))
+        self._version = None
+        self._checked_at = None
+
+    def clear(self):
+        with self._lock:
+            self._rows = None
+            self._version = None
+            self._checked_at = None
+
+    def _current_rows(self) -> Optional[dict]:
+        # Rows read inside a transaction could still be rolled back, so they are never loaded from there.
+        if connection.in_atomic_block:
+            return self._rows
+
+        now = time.monotonic()
+
+        if self._checked_at is not None and now - self._checked_at < settings.LOOKUP_CACHE_SECONDS:
+            return self._rows
+
+        with self._lock:
+            if self._checked_at is None or now - self._checked_at >= settings.LOOKUP_CACHE_SECONDS:
+                version = table_version(self.table)
+
+                if self._rows is None or version != self._version:
+                    self._rows = {getattr(row, self.key_field): row for row in self.model.objects.all()}
+                    self._version = version
+
+                self._checked_at = now
+
+            return self._rows
+
+
+languages = LookupCache(ProgrammingLanguage, 'name')
+rates = LookupCache(IssueRate, 'rate')
+LOOKUPS = {ProgrammingLanguage: languages, IssueRate: rates}
+
+
+def invalidate_lookup(sender, **kwargs):
+    LOOKUPS[sender].invalidate()
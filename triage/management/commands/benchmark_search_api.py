@@ -0,0 +1,68 @@
+import re
+import time
+import tracemalloc
+from html import unescape
+
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+
+from triage.cache import SEARCH_RESULTS_CACHE
+from triage.views import home, search_api
+
+NEXT_PAGE = re.compile(r'data-next="[^"]*\?([^"]+)"')
+
+
+class Command(BaseCommand):
+    help = 'Compares the memory and throughput of the NDJSON search API with paging through the home page.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--language', required=True)
+        parser.add_argument('--rate', default='all')
+        parser.add_argument('--q', default='')
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def handle(self, *args, **options):
+        query = dict(language=options['language'], rate=options['rate'], q=options['q'])
+        factory = RequestFactory()
+
+        for name, run in [('ndjson api', self._stream_api), ('home html', self._page_home)]:
+            seconds = []
+
+            for _ in range(options['repeat']):
+                caches[SEARCH_RESULTS_CACHE].clear()
+                started_at = time.perf_counter()
+                rows = run(factory, query)
+                seconds.append(time.perf_counter() - started_at)
+
+            caches[SEARCH_RESULTS_CACHE].clear()
+            tracemalloc.start()
+            run(factory, query)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            best = min(seconds)
+            self.stdout.write(
+                f'{name:<12} {rows:>8} rows  {best:8.3f}s  {rows / best if best else 0:10.1f} rows/s  '
+                f'peak {peak / 1024:10.1f} KiB'
+            )
+
+    @staticmethod
+    def _stream_api(factory: RequestFactory, query: dict) -> int:
+        response = search_api(factory.get('/api/search.ndjson', query))
+        return sum(chunk.count(b'\n') for chunk in response.streaming_content)
+
+    @staticmethod
+    def _page_home(factory: RequestFactory, query: dict) -> int:
+        rows = 0
+        response = home(factory.get('/', query))
+
+        while True:
+            content = response.content.decode()
+            rows += content.count('class="result-item"')
+            next_page = NEXT_PAGE.search(content)
+
+            if next_page is None:
+                return rows
+
+            response = home(factory.get('/?' + unescape(next_page.group(1))))
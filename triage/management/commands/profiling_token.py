@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from iwannacontrib.profiling import TOKEN_HEADER, profiling_token
+
+
+class Command(BaseCommand):
+    help = 'Prints a token that profiles the requests sending it and gives access to the stored profiles.'
+
+    def handle(self, *args, **options):
+        token = profiling_token()
+        self.stdout.write(f'{TOKEN_HEADER}: {token}')
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from issues.models import Issue
+from triage.facets import reconcile_facet_counts
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the search facet counts from the open issues and reports the drift found.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only report the drift.')
+
+    def handle(self, *args, **options):
+        drifts = reconcile_facet_counts(Issue.objects.open(), fix=not options['dry_run'])
+
+        for drift in drifts:
+            self.stdout.write(
+                f'{drift.language.name} level {drift.rate_level}: stored {drift.stored}, actual {drift.actual}'
+            )
+
+        if not drifts:
+            self.stdout.write(self.style.SUCCESS('No drift found'))
+        elif options['dry_run']:
+            self.stdout.write(self.style.WARNING(f'{len(drifts)} facet counts drifted'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'{len(drifts)} facet counts drifted and were fixed'))
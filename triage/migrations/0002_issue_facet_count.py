@@ -0,0 +1,45 @@
+# Generated by Django 3.1 on 2026-10-18 07:21
+
+from django.db import migrations, models
+from django.db.models import Count
+import django.db.models.deletion
+
+
+def backfill_facet_counts(apps, schema_editor):
+    Issue = apps.get_model('issues', 'Issue')
+    IssueFacetCount = apps.get_model('triage', 'IssueFacetCount')
+
+    IssueFacetCount.objects.bulk_create([
+        IssueFacetCount(
+            language_id=row['main_language_id'],
+            rate_level=row['current_rate_level'] or 0,
+            count=row['count']
+        )
+        for row in Issue.objects.filter(state='open').values('main_language_id', 'current_rate_level').annotate(
+            count=Count('id')
+        ).order_by()
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('triage', '0001_initial'),
+        ('issues', '0010_issue_fulltext'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IssueFacetCount',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rate_level', models.PositiveSmallIntegerField(default=0)),
+                ('count', models.IntegerField(default=0)),
+                ('language', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='triage.programminglanguage')),
+            ],
+            options={
+                'unique_together': {('language', 'rate_level')},
+            },
+        ),
+        migrations.RunPython(backfill_facet_counts, migrations.RunPython.noop),
+    ]
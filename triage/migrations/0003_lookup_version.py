@@ -0,0 +1,20 @@
+# Generated by Django 3.1 on 2026-10-18 07:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('triage', '0002_issue_facet_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LookupVersion',
+            fields=[
+                ('table', models.CharField(max_length=100, primary_key=True, serialize=False)),
+                ('version', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 3.1 on 2026-10-18 08:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('triage', '0003_lookup_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchGeneration',
+            fields=[
+                ('key', models.CharField(max_length=100, primary_key=True, serialize=False)),
+                ('generation', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+    ]
@@ -13,7 +13,8 @@ class ProgrammingLanguage(models.Model):
 
     @staticmethod
     def get_other_default_language():
-        return ProgrammingLanguage.objects.get_or_create(name='Other')[0]
+        from triage.lookups import languages
+        return languages.get_or_create('Other')
 
 
 COMPLEXITY_LEVEL = [
@@ -27,3 +28,28 @@ COMPLEXITY_LEVEL = [
 
 class IssueRate(models.Model):
     rate = models.IntegerField(choices=COMPLEXITY_LEVEL)
+
+
+NOT_RATED = 0
+
+
+class IssueFacetCount(models.Model):
+    language = models.ForeignKey(ProgrammingLanguage, on_delete=models.CASCADE)
+    # Not rated issues are counted under NOT_RATED, a NULL level would not be covered by the unique constraint.
+    rate_level = models.PositiveSmallIntegerField(default=NOT_RATED)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = (("language", "rate_level"),)
+
+
+class LookupVersion(models.Model):
+    # Bumped whenever a cached lookup table changes, so every worker process knows to reload its copy.
+    table = models.CharField(max_length=100, primary_key=True)
+    version = models.PositiveIntegerField(default=0)
+
+
+class SearchGeneration(models.Model):
+    # Bumped when a write changes the results of a search, so every process stops serving its cached pages.
+    key = models.CharField(max_length=100, primary_key=True)
+    generation = models.PositiveIntegerField(default=0)
@@ -0,0 +1,110 @@
+import base64
+import binascii
+from datetime import datetime
+
+from django.db.models import Q
+
+
+class InvalidCursorException(Exception):
+    def __init__(self, cursor: str):
+        self.cursor = cursor
+        super()
+
+
+class Cursor:
+    ORDERING = ('-created_at', '-id')
+    KEY_FIELDS = ('created_at', 'id')
+
+    def __init__(self, created_at: datetime, issue_id: int):
+        self.created_at = created_at
+        self.issue_id = issue_id
+
+    @staticmethod
+    def after(issue) -> 'Cursor':
+        return Cursor(issue.created_at, issue.id)
+
+    @staticmethod
+    def after_row(row: dict) -> 'Cursor':
+        return Cursor(row['created_at'], row['id'])
+
+    @staticmethod
+    def decode(cursor: str) -> 'Cursor':
+        try:
+            created_at, issue_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+            return Cursor(datetime.fromisoformat(created_at), int(issue_id))
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            raise InvalidCursorException(cursor)
+
+    def encode(self) -> str:
+        return base64.urlsafe_b64encode(f'{self.created_at.isoformat()}|{self.issue_id}'.encode()).decode()
+
+    def as_filter(self) -> Q:
+        # The leading created_at bound lets the database range scan the recency indexes.
+        return Q(created_at__lte=self.created_at) & (
+            Q(created_at__lt=self.created_at) | Q(id__lt=self.issue_id)
+        )
+
+
+class RankCursor:
+    ORDERING = ('-search_rank', '-id')
+    KEY_FIELDS = ('search_rank', 'id')
+
+    def __init__(self, rank: float, issue_id: int):
+        self.rank = rank
+        self.issue_id = issue_id
+
+    @staticmethod
+    def after(issue) -> 'RankCursor':
+        return RankCursor(issue.search_rank, issue.id)
+
+    @staticmethod
+    def after_row(row: dict) -> 'RankCursor':
+        return RankCursor(row['search_rank'], row['id'])
+
+    @staticmethod
+    def decode(cursor: str) -> 'RankCursor':
+        try:
+            rank, issue_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+            return RankCursor(float(rank), int(issue_id))
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            raise InvalidCursorException(cursor)
+
+    def encode(self) -> str:
+        # repr round-trips the float, so the next page starts exactly after the last ranked row.
+        return base64.urlsafe_b64encode(f'{self.rank!r}|{self.issue_id}'.encode()).decode()
+
+    def as_filter(self) -> Q:
+        return Q(search_rank__lt=self.rank) | Q(search_rank=self.rank, id__lt=self.issue_id)
+
+
+def page_queryset(queryset, cursor, page_size: int, cursor_class=Cursor):
+    if cursor is not None:
+        queryset = queryset.filter(cursor.as_filter())
+
+    return queryset.order_by(*cursor_class.ORDERING)[:page_size + 1]
+
+
+def paginate(queryset, cursor, page_size: int, cursor_class=Cursor):
+    rows = list(page_queryset(queryset, cursor, page_size, cursor_class))
+
+    if len(rows) > page_size:
+        return rows[:page_size], cursor_class.after(rows[page_size - 1])
+
+    return rows, None
+
+
+def iterate_rows(queryset, cursor, fields, chunk_size: int, cursor_class=Cursor):
+    # Each chunk is its own keyset query, so no database cursor stays open while the rows are consumed.
+    queryset = queryset.values(*dict.fromkeys([*fields, *cursor_class.KEY_FIELDS])).order_by(*cursor_class.ORDERING)
+
+    while True:
+        page = queryset.filter(cursor.as_filter()) if cursor is not None else queryset
+        rows = list(page[:chunk_size])
+
+        if rows:
+            yield rows
+
+        if len(rows) < chunk_size:
+            return
+
+        cursor = cursor_class.after_row(rows[-1])
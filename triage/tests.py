@@ -1,7 +1,35 @@
-from django.test import TestCase
+import io
+import json
+import os
+import re
+import tempfile
+import time
+from unittest import mock
 
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from issues.models import Repository, Owner, Issue
 from issues.testing.test_fixture import IssueFixture
+from iwannacontrib.metrics import ProcessCounters, RequestMetrics, RequestTiming, TimedTemplate, current_timing, timed
+from iwannacontrib.profiling import StackSampler, profiling_token
+from iwannacontrib.staticfiles import minify_css
+from testing.fake_github import FakeGithub
+from testing.query_budget import QueryBudgetTestCase, QueryBudgetExceeded
+from testing.query_plan import QueryPlanTestCase
+from triage.cache import SEARCH_RESULTS_CACHE, SearchResultsCache, LATEST_KEY, search_key
+from triage.facets import FacetCounts, reconcile_facet_counts
 from triage.forms import SearchForm
+from triage.lookups import LookupCache, bump_version, languages, rates
+from triage.models import ProgrammingLanguage, IssueRate, IssueFacetCount, COMPLEXITY_LEVEL
+from triage.pagination import Cursor
 
 
 class SearchFormTesting(TestCase):
@@ -58,3 +86,878 @@ class SearchFormTesting(TestCase):
 
         self.assertEquals(len(form.results), 20)
         self.assertEquals(list(form.results), list(reversed(all_issues))[0:20])
+
+
+class HomeQueryBudgetTesting(QueryBudgetTestCase):
+    # One of them reads the search generation, shared by every process through the database.
+    HOME_QUERY_BUDGET = 6
+
+    def setUp(self) -> None:
+        caches[SEARCH_RESULTS_CACHE].clear()
+        fixture = IssueFixture()
+
+        for index in range(30):
+            repository = Repository.objects.create(
+                name=f'repository-{index}',
+                owner=Owner.objects.get_or_create(owner=f'owner-{index}')[0]
+            )
+            issue = fixture.add(language_name='Python', repository=repository)
+            issue.rate(index % 5 + 1)
+            issue.save()
+
+    def test_default_home_fits_the_query_budget(self):
+        with self.assertQueryBudget(self.HOME_QUERY_BUDGET):
+            response = self.client.get('/')
+
+        self.assertEquals(response.status_code, 200)
+
+    def test_search_fits_the_query_budget(self):
+        with self.assertQueryBudget(self.HOME_QUERY_BUDGET):
+            response = self.client.get('/', {'language': 'Python', 'rate': 'all'})
+
+        self.assertContains(response, 'class="result-item"', count=30)
+
+    def test_search_by_rate_fits_the_query_budget(self):
+        with self.assertQueryBudget(self.HOME_QUERY_BUDGET):
+            response = self.client.get('/', {'language': 'Python', 'rate': 1})
+
+        self.assertContains(response, 'class="result-item"', count=6)
+
+    @override_settings(SEARCH_RESULTS_PAGE_SIZE=10)
+    def test_deep_pages_fit_the_query_budget(self):
+        cursor = Cursor.after(Issue.objects.order_by('created_at', 'id')[5]).encode()
+
+        with self.assertQueryBudget(self.HOME_QUERY_BUDGET):
+            response = self.client.get('/results', {'language': 'Python', 'rate': 'all', 'cursor': cursor})
+
+        self.assertContains(response, 'class="result-item"', count=5)
+
+    def test_it_fails_when_the_budget_is_exceeded(self):
+        with self.assertRaises(QueryBudgetExceeded):
+            with self.assertQueryBudget(0):
+                self.client.get('/')
+
+
+@override_settings(SEARCH_RESULTS_PAGE_SIZE=10)
+class SearchPaginationTesting(TestCase):
+    def setUp(self) -> None:
+        fixture = IssueFixture()
+        caches[SEARCH_RESULTS_CACHE].clear()
+        self.all_issues = list(reversed([fixture.add(language_name='Python') for i in range(25)]))
+        self.language = self.all_issues[0].main_language
+
+    def test_it_returns_the_first_page(self):
+        form = SearchForm({"language": self.language, "rate": 'all'})
+
+        self.assertEquals(form.results, self.all_issues[0:10])
+        self.assertIsNotNone(form.next_cursor)
+
+    def test_it_follows_the_cursor_until_the_last_page(self):
+        pages = []
+        cursor = None
+
+        while True:
+            form = SearchForm({"language": self.language, "rate": 'all'}, cursor=cursor)
+            pages.append(form.results)
+
+            if form.next_cursor is None:
+                break
+
+            cursor = form.next_cursor.encode()
+
+        self.assertEquals([len(page) for page in pages], [10, 10, 5])
+        self.assertEquals([issue for page in pages for issue in page], self.all_issues)
+
+    def test_it_is_invalid_given_a_broken_cursor(self):
+        form = SearchForm({"language": self.language, "rate": 'all'}, cursor='broken')
+
+        self.assertFalse(form.is_valid())
+
+    def test_it_breaks_created_at_ties_by_id(self):
+        Issue.objects.update(created_at=self.all_issues[0].created_at)
+
+        form = SearchForm({"language": self.language, "rate": 'all'})
+        next_form = SearchForm({"language": self.language, "rate": 'all'}, cursor=form.next_cursor.encode())
+
+        self.assertEquals(
+            [issue.id for issue in form.results + next_form.results],
+            sorted([issue.id for issue in self.all_issues], reverse=True)[0:20]
+        )
+
+    def test_results_endpoint_renders_only_the_next_rows(self):
+        form = SearchForm({"language": self.language, "rate": 'all'})
+
+        response = self.client.get('/results', {
+            'language': 'Python',
+            'rate': 'all',
+            'cursor': form.next_cursor.encode()
+        })
+
+        self.assertNotContains(response, '<html')
+        self.assertContains(response, 'class="result-item"', count=10)
+        self.assertContains(response, 'class="load-more"')
+
+    def test_last_page_has_no_load_more_link(self):
+        last_issue = self.all_issues[19]
+        cursor = Cursor.after(last_issue).encode()
+
+        response = self.client.get('/results', {'language': 'Python', 'rate': 'all', 'cursor': cursor})
+
+        self.assertContains(response, 'class="result-item"', count=5)
+        self.assertNotContains(response, 'class="load-more"')
+
+
+class SearchQueryPlanTesting(QueryPlanTestCase):
+    ISSUES_PER_LANGUAGE = 3000
+
+    @classmethod
+    def setUpTestData(cls):
+        repository = Repository.objects.create(name='query-plan', owner=Owner.objects.create(owner='query-plan'))
+        rates = {level: IssueRate.objects.create(rate=level) for level, _ in COMPLEXITY_LEVEL}
+        number = 0
+
+        for language_name in ['Python', 'Java', 'Rust']:
+            language = ProgrammingLanguage.objects.create(name=language_name)
+            issues = []
+
+            for index in range(cls.ISSUES_PER_LANGUAGE):
+                number += 1
+                level = index % 6 or None
+                issues.append(Issue(
+                    repository=repository,
+                    number=number,
+                    name=f'issue {number}',
+                    body='any body',
+                    main_language=language,
+                    current_rate=rates.get(level),
+                    current_rate_level=level,
+                ))
+
+            Issue.objects.bulk_create(issues, batch_size=500)
+
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+        cls.cursor = Cursor.after(Issue.objects.order_by('-created_at')[cls.ISSUES_PER_LANGUAGE // 2]).encode()
+
+    def test_default_search_uses_the_recency_index(self):
+        self.assertIndexRangeScan(SearchForm().queryset, 'issues_issue')
+
+    def test_all_rates_uses_an_index_range_scan(self):
+        self.assert_search_uses_an_index_range_scan('all')
+
+    def test_specific_rate_uses_an_index_range_scan(self):
+        for level, _ in COMPLEXITY_LEVEL:
+            self.assert_search_uses_an_index_range_scan(level)
+
+    def test_not_rated_uses_an_index_range_scan(self):
+        self.assert_search_uses_an_index_range_scan('')
+
+    def test_it_detects_a_sort_without_index(self):
+        with self.assertRaises(AssertionError):
+            self.assertIndexRangeScan(Issue.objects.filter(main_language__name='Python').order_by('name'), 'issues_issue')
+
+    def test_it_detects_a_full_scan(self):
+        with self.assertRaises(AssertionError):
+            self.assertIndexRangeScan(Issue.objects.filter(body__contains='any'), 'issues_issue')
+
+    def test_keyword_search_is_driven_by_the_fulltext_index(self):
+        for rate in ['all', 3]:
+            form = SearchForm({"language": 'Python', "rate": rate, "q": 'issue 42'})
+            self.assertTrue(form.is_valid(), form.errors)
+            self.assertNoFullScan(form.queryset, 'issues_issue')
+
+    def assert_search_uses_an_index_range_scan(self, rate):
+        for cursor in [None, self.cursor]:
+            form = SearchForm({"language": 'Python', "rate": rate}, cursor=cursor)
+            self.assertTrue(form.is_valid(), form.errors)
+            self.assertIndexRangeScan(form.queryset, 'issues_issue')
+
+
+class FullTextSearchTesting(TestCase):
+    def setUp(self) -> None:
+        caches[SEARCH_RESULTS_CACHE].clear()
+        self.fixture = IssueFixture()
+
+    def search(self, q, language='Python', rate='all', cursor=None) -> SearchForm:
+        form = SearchForm({"language": language, "rate": rate, "q": q}, cursor=cursor)
+        self.assertTrue(form.is_valid(), form.errors)
+        return form
+
+    def test_it_matches_stemmed_words_of_titles_and_bodies(self):
+        title_issue = self.fixture.add(name='Write a faster parser')
+        body_issue = self.fixture.add(body='The parsers are slow')
+        self.fixture.add(name='Improve the documentation')
+
+        self.assertEquals(set(self.search('parser').results), {title_issue, body_issue})
+
+    def test_title_matches_rank_above_body_matches(self):
+        body_issue = self.fixture.add(body='Needs documentation')
+        title_issue = self.fixture.add(name='Documentation')
+
+        self.assertEquals(self.search('documentation').results, [title_issue, body_issue])
+
+    def test_it_requires_every_keyword(self):
+        both = self.fixture.add(name='Parser documentation')
+        self.fixture.add(name='Parser')
+
+        self.assertEquals(self.search('parser docs documentation').results, [])
+        self.assertEquals(self.search('parser documentation').results, [both])
+
+    def test_it_combines_with_the_language_and_rate_filters(self):
+        python_issue = self.fixture.add(name='Parser', language_name='Python')
+        rated_issue = self.fixture.add(name='Parser', language_name='Python')
+        self.fixture.add(name='Parser', language_name='Java')
+        rated_issue.rate(3)
+
+        self.assertEquals(set(self.search('parser').results), {python_issue, rated_issue})
+        self.assertEquals(self.search('parser', rate=3).results, [rated_issue])
+        self.assertEquals(self.search('parser', rate='').results, [python_issue])
+
+    def test_closed_issues_are_not_found(self):
+        self.fixture.add(name='Parser', state=Issue.CLOSED)
+
+        self.assertEquals(self.search('parser').results, [])
+
+    def test_the_index_follows_updates(self):
+        issue = self.fixture.add(name='Parser')
+
+        Issue.objects.filter(pk=issue.pk).update(name='Tokenizer')
+
+        self.assertEquals(self.search('parser').results, [])
+        self.assertEquals(self.search('tokenizer').results, [issue])
+
+    @override_settings(SEARCH_RESULTS_PAGE_SIZE=2)
+    def test_it_paginates_ranked_results(self):
+        issues = [self.fixture.add(name='Parser', body='parser ' * index) for index in range(5)]
+        pages = []
+        cursor = None
+
+        while True:
+            form = self.search('parser', cursor=cursor)
+            pages.append(form.results)
+
+            if form.next_cursor is None:
+                break
+
+            cursor = form.next_cursor.encode()
+
+        self.assertEquals([len(page) for page in pages], [2, 2, 1])
+        self.assertEquals(sorted(issue.id for page in pages for issue in page), [issue.id for issue in issues])
+
+    def test_a_recency_cursor_is_invalid_for_a_keyword_search(self):
+        issue = self.fixture.add(name='Parser')
+
+        form = SearchForm({"language": 'Python', "rate": 'all', "q": 'parser'}, cursor=Cursor.after(issue).encode())
+
+        self.assertFalse(form.is_valid())
+
+    def test_the_home_page_renders_the_keyword_results(self):
+        self.fixture.add(name='Write a faster parser')
+        self.fixture.add(name='Improve the documentation')
+
+        response = self.client.get('/', {'language': 'Python', 'rate': 'all', 'q': 'parser'})
+
+        self.assertContains(response, 'class="result-item"', count=1)
+        self.assertContains(response, 'Write a faster parser')
+
+
+class SearchApiTesting(TestCase):
+    def setUp(self) -> None:
+        self.fixture = IssueFixture()
+        self.issues = list(reversed([self.fixture.add(language_name='Python') for _ in range(5)]))
+        self.fixture.add(language_name='Java')
+
+    def stream(self, **query):
+        response = self.client.get('/api/search.ndjson', dict(dict(language='Python', rate='all'), **query))
+
+        self.assertEquals(response['Content-Type'], 'application/x-ndjson')
+        self.assertTrue(response.streaming)
+        return [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+
+    def test_it_streams_every_matching_issue(self):
+        rows = self.stream()
+
+        self.assertEquals([row['id'] for row in rows], [issue.id for issue in self.issues])
+        self.assertEquals(rows[0]['title'], self.issues[0].name)
+        self.assertEquals(rows[0]['language'], 'Python')
+        self.assertEquals(rows[0]['url'], self.issues[0].get_url())
+
+    @override_settings(SEARCH_API_CHUNK_SIZE=2)
+    def test_it_reads_the_rows_in_keyset_chunks_without_building_issues(self):
+        with mock.patch.object(Issue, 'from_db') as from_db, CaptureQueriesContext(connection) as queries:
+            rows = self.stream()
+
+        self.assertEquals(len(rows), 5)
+        self.assertEquals(len([query for query in queries if 'issues_issue' in query['sql']]), 3)
+        from_db.assert_not_called()
+
+    def test_it_resumes_from_the_cursor_of_a_row(self):
+        rows = self.stream()
+
+        self.assertEquals(self.stream(cursor=rows[1]['cursor']), rows[2:])
+
+    def test_it_streams_ranked_keyword_results(self):
+        body_issue = self.fixture.add(language_name='Python', body='Needs a parser')
+        title_issue = self.fixture.add(language_name='Python', name='Parser')
+
+        rows = self.stream(q='parser')
+
+        self.assertEquals([row['id'] for row in rows], [title_issue.id, body_issue.id])
+        self.assertEquals(self.stream(q='parser', cursor=rows[0]['cursor']), rows[1:])
+
+    def test_it_rejects_an_invalid_search(self):
+        response = self.client.get('/api/search.ndjson', {'language': 'Cobol'})
+
+        self.assertEquals(response.status_code, 400)
+        self.assertIn('language', response.json()['errors'])
+
+    def test_the_benchmark_compares_the_api_with_the_home_page(self):
+        stdout = io.StringIO()
+
+        call_command('benchmark_search_api', language='Python', repeat=1, stdout=stdout)
+
+        self.assertRegex(stdout.getvalue(), r'ndjson api\s+5 rows')
+        self.assertRegex(stdout.getvalue(), r'home html\s+5 rows')
+
+
+class SearchFacetsTesting(TestCase):
+    def setUp(self) -> None:
+        self.fixture = IssueFixture()
+
+    def add_issue(self, language_name='Python', **rewrite):
+        issue = self.fixture.add(language_name=language_name, **rewrite)
+
+        facets = FacetCounts()
+        facets.add(issue.main_language_id, issue.current_rate_level)
+        facets.save()
+
+        return issue
+
+    def counts(self) -> dict:
+        return {
+            (row.language.name, row.rate_level): row.count
+            for row in IssueFacetCount.objects.select_related('language').filter(count__gt=0)
+        }
+
+    def test_rating_moves_the_issue_between_levels(self):
+        issue = self.add_issue()
+
+        issue.rate(3)
+        self.assertEquals(self.counts(), {('Python', 3): 1})
+
+        issue.rate(5)
+        issue.rate(5)
+        self.assertEquals(self.counts(), {('Python', 4): 1})
+
+    def test_a_vote_that_keeps_the_level_does_not_touch_the_counts(self):
+        issue = self.add_issue()
+        issue.rate(3)
+
+        with CaptureQueriesContext(connection) as queries:
+            issue.rate(3)
+
+        self.assertFalse([query for query in queries if 'triage_issuefacetcount' in query['sql']])
+        self.assertEquals(self.counts(), {('Python', 3): 1})
+
+    def test_the_home_page_shows_the_counts(self):
+        self.add_issue('Python').rate(2)
+        self.add_issue('Python')
+        self.add_issue('Java')
+
+        response = self.client.get('/', {'language': 'Python', 'rate': 'all'})
+
+        self.assertEquals([(language.name, count) for language, count in response.context['facets'].languages],
+                          [('Python', 2), ('Java', 1)])
+        self.assertEquals(response.context['facets'].levels,
+                          [(1, 'Very Easy', 0), (2, 'Easy', 1), (3, 'Medium', 0), (4, 'Hard', 0), (5, 'Very Hard', 0)])
+        self.assertContains(response, '<a href="/?language=Python&rate=2#search-section-form">Easy</a>')
+
+    def test_reconcile_reports_and_fixes_the_drift(self):
+        self.add_issue('Python').rate(2)
+        self.fixture.add(language_name='Java')
+        self.add_issue('Python', state=Issue.CLOSED)
+
+        stdout = io.StringIO()
+        call_command('reconcile_facet_counts', '--dry-run', stdout=stdout)
+
+        self.assertIn('Java level 0: stored 0, actual 1', stdout.getvalue())
+        self.assertIn('Python level 0: stored 1, actual 0', stdout.getvalue())
+        self.assertEquals(self.counts(), {('Python', 2): 1, ('Python', 0): 1})
+
+        call_command('reconcile_facet_counts', stdout=io.StringIO())
+
+        self.assertEquals(self.counts(), {('Python', 2): 1, ('Java', 0): 1})
+        self.assertEquals(reconcile_facet_counts(Issue.objects.open()), [])
+
+
+class SearchResultsCacheTesting(TestCase):
+    def setUp(self) -> None:
+        caches[SEARCH_RESULTS_CACHE].clear()
+        metrics_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(metrics_dir.cleanup)
+
+        metrics_dir_override = override_settings(METRICS_DIR=metrics_dir.name)
+        metrics_dir_override.enable()
+        self.addCleanup(metrics_dir_override.disable)
+        counters = mock.patch('triage.cache.search_cache_counters', ProcessCounters('search_cache'))
+        counters.start()
+        self.addCleanup(counters.stop)
+
+        fixture = IssueFixture()
+        self.python_issue = fixture.add(language_name='Python')
+        self.java_issue = fixture.add(language_name='Java')
+
+    def test_it_serves_the_second_request_from_the_cache(self):
+        self.client.get('/', {'language': 'Python', 'rate': 'all'})
+
+        with self.assertNumQueries(5):
+            response = self.client.get('/', {'language': 'Python', 'rate': 'all'})
+
+        self.assertContains(response, 'class="result-item"', count=1)
+        self.assertEquals(self.client.get('/search-cache-stats', {'token': profiling_token()}).json(),
+                          {'hits': 1, 'misses': 1})
+
+    def test_the_stats_sum_the_counters_of_every_worker_process(self):
+        self.client.get('/', {'language': 'Python', 'rate': 'all'})
+        other_worker = ProcessCounters('search_cache')
+        other_worker.incr('hits')
+        other_worker.write()
+
+        self.assertEquals(SearchResultsCache().stats(), {'hits': 1, 'misses': 1})
+
+    def test_the_stats_require_a_profiling_token(self):
+        self.assertEquals(self.client.get('/search-cache-stats').status_code, 403)
+
+    def test_rating_invalidates_the_searches_of_the_issue_language(self):
+        self.client.get('/', {'language': 'Python', 'rate': 'all'})
+        self.client.get('/', {'language': 'Python', 'rate': 3})
+
+        self.client.post(self.python_issue.get_rate_url(), {'rate': 3})
+
+        self.assertContains(self.client.get('/', {'language': 'Python', 'rate': 'all'}), 'Medium')
+        self.assertContains(self.client.get('/', {'language': 'Python', 'rate': 3}), 'class="result-item"', count=1)
+        self.assertEquals(SearchResultsCache().stats(), {'hits': 0, 'misses': 4})
+
+    def test_rating_invalidates_the_search_the_issue_leaves(self):
+        self.client.post(self.python_issue.get_rate_url(), {'rate': 3})
+        self.client.get('/', {'language': 'Python', 'rate': 3})
+
+        self.client.post(self.python_issue.get_rate_url(), {'rate': 5})
+        self.client.post(self.python_issue.get_rate_url(), {'rate': 5})
+
+        self.assertNotContains(self.client.get('/', {'language': 'Python', 'rate': 3}), 'class="result-item"')
+
+    def test_rating_keeps_the_searches_of_other_languages(self):
+        self.client.get('/', {'language': 'Java', 'rate': 'all'})
+
+        self.client.post(self.python_issue.get_rate_url(), {'rate': 3})
+        self.client.get('/', {'language': 'Java', 'rate': 'all'})
+
+        self.assertEquals(SearchResultsCache().stats(), {'hits': 1, 'misses': 1})
+
+    def test_invalidations_from_another_process_reach_the_cached_pages(self):
+        self.client.get('/', {'language': 'Python', 'rate': 'all'})
+
+        # A process of its own has its own page cache and only shares the database.
+        other_process = SearchResultsCache()
+        other_process.cache = LocMemCache('other-process', {})
+        Issue.objects.filter(pk=self.python_issue.pk).update(name='Renamed elsewhere', updated_at=timezone.now())
+        other_process.invalidate_issue(self.python_issue.main_language_id, None)
+
+        self.assertContains(self.client.get('/', {'language': 'Python', 'rate': 'all'}), 'Renamed elsewhere')
+
+    def test_created_issues_invalidate_the_latest_and_not_rated_searches(self):
+        search_cache = SearchResultsCache()
+        language_id = self.python_issue.main_language_id
+        render = mock.Mock(return_value='rendered')
+
+        for key in [LATEST_KEY, search_key(language_id, ''), search_key(language_id, 'all')]:
+            search_cache.get_or_render(key, None, render)
+
+        search_cache.invalidate_issue(language_id, None)
+
+        for key in [LATEST_KEY, search_key(language_id, ''), search_key(language_id, 'all')]:
+            search_cache.get_or_render(key, None, render)
+
+        self.assertEquals(render.call_count, 6)
+
+
+class HomeConditionalGetTesting(TestCase):
+    def setUp(self) -> None:
+        caches[SEARCH_RESULTS_CACHE].clear()
+
+        fixture = IssueFixture()
+        self.python_issue = fixture.add(language_name='Python')
+        self.java_issue = fixture.add(language_name='Java')
+
+    def test_it_returns_not_modified_after_a_single_query(self):
+        etag = self.client.get('/', {'language': 'Python', 'rate': 'all'})['ETag']
+
+        with self.assertNumQueries(1):
+            response = self.client.get('/', {'language': 'Python', 'rate': 'all'}, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEquals(response.status_code, 304)
+
+    def test_the_validator_depends_on_the_search(self):
+        etag = self.client.get('/', {'language': 'Python', 'rate': 'all'})['ETag']
+
+        response = self.client.get('/', {'language': 'Python', 'rate': 1}, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEquals(response.status_code, 200)
+
+    def test_rating_an_issue_of_the_language_changes_the_validator(self):
+        etag = self.client.get('/', {'language': 'Python', 'rate': 'all'})['ETag']
+
+        self.python_issue.rate(3)
+        response = self.client.get('/', {'language': 'Python', 'rate': 'all'}, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEquals(response.status_code, 200)
+
+    def test_rating_an_issue_of_another_language_keeps_the_results_validator(self):
+        etag = self.client.get('/results', {'language': 'Python', 'rate': 'all'})['ETag']
+
+        self.java_issue.rate(3)
+        response = self.client.get('/results', {'language': 'Python', 'rate': 'all'}, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEquals(response.status_code, 304)
+
+    def test_rating_an_issue_of_another_language_changes_the_home_facets_validator(self):
+        etag = self.client.get('/', {'language': 'Python', 'rate': 'all'})['ETag']
+
+        self.java_issue.rate(3)
+        response = self.client.get('/', {'language': 'Python', 'rate': 'all'}, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEquals(response.status_code, 200)
+
+    def test_the_latest_issues_validator_changes_with_any_issue(self):
+        etag = self.client.get('/')['ETag']
+
+        self.java_issue.rate(3)
+        response = self.client.get('/', HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEquals(response.status_code, 200)
+
+
+class LookupCacheTesting(TransactionTestCase):
+    # The lookup cache only loads committed rows, so these tests run outside of a test transaction.
+    def setUp(self):
+        languages.clear()
+        rates.clear()
+
+    def tearDown(self):
+        languages.clear()
+        rates.clear()
+
+    def test_it_serves_known_rows_without_queries(self):
+        python = ProgrammingLanguage.objects.create(name='Python')
+        languages.all()
+
+        with self.assertNumQueries(0):
+            self.assertEquals(languages.get_or_create('Python'), python)
+            self.assertEquals(languages.get('Java'), None)
+            self.assertEquals(languages.all(), [python])
+
+    def test_it_reloads_when_another_worker_changes_the_table(self):
+        ProgrammingLanguage.objects.create(name='Python')
+        other_worker = LookupCache(ProgrammingLanguage, 'name')
+
+        with override_settings(LOOKUP_CACHE_SECONDS=0):
+            self.assertEquals([language.name for language in languages.all()], ['Python'])
+
+            other_worker.get_or_create('Java')
+
+            self.assertEquals([language.name for language in languages.all()], ['Java', 'Python'])
+
+    def test_it_keeps_serving_its_copy_until_the_version_is_checked(self):
+        ProgrammingLanguage.objects.create(name='Python')
+        languages.all()
+
+        # Another worker adds a language without this process being told about it.
+        ProgrammingLanguage.objects.bulk_create([ProgrammingLanguage(name='Java')])
+        bump_version(ProgrammingLanguage._meta.db_table)
+
+        self.assertEquals([language.name for language in languages.all()], ['Python'])
+
+        with override_settings(LOOKUP_CACHE_SECONDS=0), self.assertNumQueries(2):
+            self.assertEquals([language.name for language in languages.all()], ['Java', 'Python'])
+
+    def test_it_does_not_query_the_rates_when_voting(self):
+        IssueRate.objects.bulk_create([IssueRate(rate=level) for level, _ in COMPLEXITY_LEVEL])
+        issue = IssueFixture().add(language_name='Python')
+        issue.rate(1)
+
+        with CaptureQueriesContext(connection) as context:
+            issue.rate(3)
+
+        self.assertEquals(issue.current_rate.rate, 2)
+        self.assertFalse([query for query in context.captured_queries if 'triage_issuerate"' in query['sql']])
+
+    def test_the_search_form_reads_languages_from_the_cache(self):
+        ProgrammingLanguage.objects.create(name='Python')
+        ProgrammingLanguage.objects.create(name='Java')
+        languages.all()
+
+        with self.assertNumQueries(0):
+            form = SearchForm({'language': 'Python', 'rate': 'all'})
+            choices = [value for value, _ in form.fields['language'].choices]
+            language = form.fields['language'].clean('Python')
+
+        self.assertEquals(choices, ['', 'Java', 'Python'])
+        self.assertEquals(language.name, 'Python')
+        self.assertFalse(SearchForm({'language': 'Cobol', 'rate': 'all'}).is_valid())
+
+
+class RequestMetricsTesting(TestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_override = override_settings(METRICS_DIR=directory.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def metric(self, name: str) -> float:
+        match = re.search(rf'^{re.escape(name)} (\S+)$', self.client.get('/metrics').content.decode(), re.MULTILINE)
+        return float(match.group(1)) if match else 0
+
+    def test_it_sends_the_server_timing_of_the_request(self):
+        IssueFixture().add()
+
+        response = self.client.get('/', {'language': 'Python', 'rate': 'all'})
+
+        self.assertRegex(response['Server-Timing'], r'^db;dur=[\d.]+;desc="[1-9]\d* queries", template;dur=[\d.]+, '
+                                                    r'total;dur=[\d.]+$')
+
+    def test_markdown_rendered_in_a_template_is_not_counted_as_template_time(self):
+        issue = IssueFixture().add(body='# Title', body_html_version='stale')
+
+        response = self.client.get(issue.get_url())
+
+        self.assertRegex(response['Server-Timing'], r'template;dur=[\d.]+, markdown;dur=[\d.]+')
+
+    def test_it_aggregates_the_requests_per_url_name(self):
+        count = self.metric('iwannacontrib_request_duration_seconds_count{view="home"}')
+        queries = self.metric('iwannacontrib_request_db_queries_sum{view="home"}')
+
+        self.client.get('/')
+
+        self.assertEquals(self.metric('iwannacontrib_request_duration_seconds_count{view="home"}'), count + 1)
+        self.assertGreater(self.metric('iwannacontrib_request_db_queries_sum{view="home"}'), queries)
+        self.assertEquals(
+            self.metric('iwannacontrib_request_db_queries_bucket{view="home",le="+Inf"}'),
+            self.metric('iwannacontrib_request_db_queries_count{view="home"}')
+        )
+
+    def test_it_sums_the_requests_of_every_worker_process(self):
+        self.client.get('/')
+        count = self.metric('iwannacontrib_request_duration_seconds_count{view="home"}')
+        fast = self.metric('iwannacontrib_request_duration_seconds_bucket{view="home",le="0.1"}')
+        other_worker = RequestMetrics()
+
+        other_worker.observe('home', RequestTiming().observations(0.2))
+        other_worker.observe('home', RequestTiming().observations(0.2))
+        # The worker stops, its requests are still counted.
+        other_worker.write()
+        del other_worker
+
+        self.assertEquals(self.metric('iwannacontrib_request_duration_seconds_count{view="home"}'), count + 2)
+        self.assertEquals(self.metric('iwannacontrib_request_duration_seconds_bucket{view="home",le="0.1"}'), fast)
+
+    def test_a_worker_writes_its_histograms_at_most_once_per_interval(self):
+        count = self.metric('iwannacontrib_request_duration_seconds_count{view="home"}')
+        other_worker = RequestMetrics()
+
+        with override_settings(METRICS_WRITE_SECONDS=60):
+            other_worker.observe('home', RequestTiming().observations(0.2))
+            other_worker.observe('home', RequestTiming().observations(0.2))
+
+        self.assertEquals(self.metric('iwannacontrib_request_duration_seconds_count{view="home"}'), count + 1)
+
+    def test_nested_timers_only_count_their_own_time(self):
+        timing = RequestTiming()
+        token = current_timing.set(timing)
+
+        try:
+            with timed('template'):
+                time.sleep(0.01)
+                with timed('db'):
+                    time.sleep(0.02)
+        finally:
+            current_timing.reset(token)
+
+        self.assertGreaterEqual(timing.seconds['db'], 0.02)
+        self.assertLess(timing.seconds['template'], 0.02)
+
+    def test_it_times_the_github_calls(self):
+        timing = RequestTiming()
+        token = current_timing.set(timing)
+
+        try:
+            with FakeGithub(latency=0.01) as fake:
+                fake.add_issue('owner', 'repository', 1)
+                fake.client().get_issue('owner', 'repository', 1)
+        finally:
+            current_timing.reset(token)
+
+        self.assertGreaterEqual(timing.seconds['github'], 0.01)
+
+
+class ProfilingTesting(TestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_override = override_settings(METRICS_DIR=directory.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def profile(self, sampler: StackSampler):
+        request = sampler.watch(forced=True)
+        time.sleep(0.02)
+        return sampler.finish(request, 'GET', '/', 'home', 200)
+
+    def slow_home(self, seconds: float = 0.1):
+        render = TimedTemplate.render
+
+        def slow_render(template, *args, **kwargs):
+            time.sleep(seconds)
+            return render(template, *args, **kwargs)
+
+        return mock.patch.object(TimedTemplate, 'render', autospec=True, side_effect=slow_render)
+
+    def test_requests_with_a_token_are_profiled(self):
+        token = profiling_token()
+
+        with self.slow_home():
+            response = self.client.get('/', HTTP_X_PROFILE_TOKEN=token)
+
+        profile_id = response['X-Profile-Id']
+        summaries = self.client.get('/profiles', HTTP_X_PROFILE_TOKEN=token).json()['profiles']
+        collapsed = self.client.get(f'/profiles/{profile_id}.folded', {'token': token}).content.decode()
+
+        self.assertEquals(summaries[0]['id'], profile_id)
+        self.assertEquals(summaries[0]['view'], 'home')
+        self.assertTrue(summaries[0]['forced'])
+        self.assertRegex(collapsed, re.compile(r'^\S*triage/views\.py:home;\S*tests\.py:slow_render \d+$', re.M))
+
+    def test_requests_without_a_token_skip_the_profiler(self):
+        with mock.patch('iwannacontrib.profiling.get_stack_sampler') as get_stack_sampler:
+            response = self.client.get('/')
+            self.client.get('/', HTTP_X_PROFILE_TOKEN='tampered')
+
+        get_stack_sampler.assert_not_called()
+        self.assertNotIn('X-Profile-Id', response)
+
+    def test_requests_over_the_threshold_are_profiled(self):
+        with override_settings(PROFILING_THRESHOLD_SECONDS=0.02), self.slow_home(0.1):
+            slow = self.client.get('/')
+
+        with override_settings(PROFILING_THRESHOLD_SECONDS=10):
+            fast = self.client.get('/')
+
+        self.assertIn('X-Profile-Id', slow)
+        self.assertNotIn('X-Profile-Id', fast)
+
+    def test_profiles_need_a_token(self):
+        self.assertEquals(self.client.get('/profiles').status_code, 403)
+        self.assertEquals(self.client.get('/profiles', {'token': 'tampered'}).status_code, 403)
+        self.assertEquals(self.client.get('/profiles/1-ab-1.folded', {'token': profiling_token()}).status_code, 404)
+
+    def test_it_keeps_the_most_recent_profiles(self):
+        sampler = StackSampler(interval=0.001, max_profiles=2)
+
+        profiles = [self.profile(sampler) for _ in range(3)]
+
+        self.assertEquals([profile.id for profile in sampler.recent()], [profiles[2].id, profiles[1].id])
+
+    def test_every_worker_sees_the_profiles_of_the_others(self):
+        # Two samplers stand for two worker processes sharing METRICS_DIR.
+        first_worker = StackSampler(interval=0.001, max_profiles=2)
+        second_worker = StackSampler(interval=0.001, max_profiles=2)
+
+        first = self.profile(first_worker)
+        second = self.profile(second_worker)
+        third = self.profile(first_worker)
+
+        self.assertEquals(len({first.id, second.id, third.id}), 3)
+        self.assertEquals([profile.id for profile in second_worker.recent()], [third.id, second.id])
+        self.assertEquals(second_worker.get(third.id).collapsed(), third.collapsed())
+        self.assertIsNone(first_worker.get(first.id))
+
+
+class StaticAssetsTesting(TestCase):
+    # The home page was 12 KB with its stylesheets inline and is 7 KB without them.
+    HOME_HTML_BUDGET = 8 * 1024
+
+    def setUp(self) -> None:
+        caches[SEARCH_RESULTS_CACHE].clear()
+        IssueFixture().add()
+
+    def collect_static(self):
+        static_root = tempfile.TemporaryDirectory()
+        self.addCleanup(static_root.cleanup)
+
+        collected = override_settings(
+            STATIC_ROOT=static_root.name,
+            STATICFILES_STORAGE='iwannacontrib.staticfiles.MinifiedCompressedManifestStorage'
+        )
+        collected.enable()
+        self.addCleanup(collected.disable)
+
+        call_command('collectstatic', interactive=False, verbosity=0, ignore_patterns=['admin'])
+        return static_root.name
+
+    def test_the_home_page_links_its_stylesheets(self):
+        response = self.client.get('/')
+
+        self.assertNotContains(response, '<style')
+        self.assertContains(response, '<link rel="stylesheet" href="/static/issues/css/base.css">')
+        self.assertContains(response, '<link rel="stylesheet" href="/static/triage/css/home.css">')
+        self.assertLess(len(response.content), self.HOME_HTML_BUDGET)
+
+    def test_collectstatic_writes_hashed_minified_and_compressed_stylesheets(self):
+        static_root = self.collect_static()
+        hashed_name = staticfiles_storage.stored_name('triage/css/home.css')
+
+        with open(finders.find('triage/css/home.css')) as source, open(os.path.join(static_root, hashed_name)) as css:
+            self.assertEquals(css.read(), minify_css(source.read()))
+
+        self.assertRegex(hashed_name, r'^triage/css/home\.[0-9a-f]{12}\.css$')
+        self.assertTrue(os.path.exists(os.path.join(static_root, hashed_name + '.gz')))
+        self.assertTrue(os.path.exists(os.path.join(static_root, hashed_name + '.br')))
+        self.assertContains(self.client_class().get('/'), f'href="/static/{hashed_name}"')
+
+    def test_the_pages_link_the_hashed_stylesheets_with_debug_on(self):
+        self.collect_static()
+        hashed_name = staticfiles_storage.stored_name('issues/css/base.css')
+
+        with override_settings(DEBUG=True):
+            response = self.client_class().get('/')
+
+        self.assertContains(response, f'href="/static/{hashed_name}"')
+
+    def test_stylesheets_collectstatic_never_saw_keep_their_plain_names_with_debug_on(self):
+        static_root = tempfile.TemporaryDirectory()
+        self.addCleanup(static_root.cleanup)
+
+        with override_settings(DEBUG=True, STATIC_ROOT=static_root.name,
+                               STATICFILES_STORAGE='iwannacontrib.staticfiles.MinifiedCompressedManifestStorage'):
+            response = self.client_class().get('/')
+
+        self.assertContains(response, 'href="/static/issues/css/base.css"')
+
+    def test_the_hashed_stylesheets_are_served_compressed_and_immutable(self):
+        self.collect_static()
+        client = self.client_class()
+
+        response = client.get(staticfiles_storage.url('issues/css/base.css'), HTTP_ACCEPT_ENCODING='gzip, br')
+
+        self.assertEquals(response.status_code, 200)
+        self.assertEquals(response['Content-Encoding'], 'br')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertNotIn('immutable', client.get('/static/issues/css/base.css')['Cache-Control'])
+
+    def test_minify_css_keeps_strings_and_descendant_selectors(self):
+        css = '/* title */\n.issue-title :hover,\na > b {\n    font-family: "Raleway  Bold", Verdana;\n' \
+              '    margin: 0 auto;\n}\n'
+
+        self.assertEquals(minify_css(css), '.issue-title :hover,a>b{font-family:"Raleway  Bold",Verdana;margin:0 auto}')
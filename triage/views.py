@@ -1,14 +1,65 @@
+from django.conf import settings
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.shortcuts import render
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+from django.views.decorators.http import condition
 
+from iwannacontrib.profiling import requires_profiling_token
+from iwannacontrib.replicas import reading_from_replica, reads_from_replica
+
+from triage.api import search_ndjson, errors_json
+from triage.cache import SearchResultsCache
+from triage.facets import SearchFacets
 from triage.forms import SearchForm
+from triage.freshness import search_etag, search_last_modified, home_etag, home_last_modified
 
 
+@reads_from_replica
+@condition(etag_func=home_etag, last_modified_func=home_last_modified)
 def home(request):
-    form = SearchForm()
-
-    if request.GET.get('language'):
-        form = SearchForm(request.GET)
+    form = _search_form(request)
 
     return render(request, 'triage/home.html', {
         "form": form,
+        "results": _render_results(request, form),
+        "facets": SearchFacets(form.cleaned_data.get('language') if form.is_valid() else None),
     })
+
+
+@reads_from_replica
+@condition(etag_func=search_etag, last_modified_func=search_last_modified)
+def results(request):
+    return HttpResponse(_render_results(request, _search_form(request)))
+
+
+def search_api(request):
+    form = SearchForm(request.GET, cursor=request.GET.get('cursor'))
+
+    if not form.is_valid():
+        return HttpResponse(errors_json(form), status=400, content_type='application/json')
+
+    return StreamingHttpResponse(search_ndjson(form), content_type='application/x-ndjson')
+
+
+@requires_profiling_token
+def search_cache_stats(request):
+    return JsonResponse(SearchResultsCache().stats())
+
+
+def _search_form(request) -> SearchForm:
+    if request.GET.get('language'):
+        return SearchForm(request.GET, cursor=request.GET.get('cursor'))
+
+    return SearchForm()
+
+
+def _render_results(request, form: SearchForm) -> str:
+    # A replica may not have the write that invalidated this page yet, so its pages are not kept for long.
+    return mark_safe(SearchResultsCache().get_or_render(
+        form.cache_key,
+        form.page_key,
+        lambda: render_to_string('triage/partials/results.html', {"form": form}, request),
+        settings.REPLICA_MAX_LAG_SECONDS if reading_from_replica() else DEFAULT_TIMEOUT
+    ))